@@ -0,0 +1 @@
+from .mock_github import mockGitHubServer, syntheticRepo
@@ -0,0 +1,262 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .mock_github import mockGitHubServer, syntheticRepo
+from .synthetic_git import syntheticHistory
+
+PUBLIC_METHODS = [
+    'extract_general_overview',
+    'extract_aggregate_metrics',
+    'extract_data_commit_contributor',
+    'extract_data_pr'
+]
+
+# Methods that read the git history, the others only talk to the API
+GIT_METHODS = {'extract_data_commit_contributor'}
+
+SCALES = {
+    'small': {'prs': 100, 'commits': 1000},
+    'medium': {'prs': 1000, 'commits': 10000},
+    'large': {'prs': 10000, 'commits': 100000}
+}
+
+# Commit counts for comparing the commit traversal engines on their own
+COMMIT_SCALES = [10000, 100000, 1000000]
+
+COMMIT_ENGINES = ['pydriller', 'git-log']
+
+OWNER = 'bench'
+
+
+def fixture_mirror_dir(fixture_dir: str, repo_name: str, commits: int, seed: int = 0) -> str:
+    '''
+    Returns a mirror_dir holding {OWNER}/{repo_name}.git with a synthetic history of the given number of commits,
+    building it once. The history has topic branch merges, renames and Java method churn
+    '''
+    mirror_dir = os.path.join(os.path.abspath(fixture_dir), f"commits-{commits}-seed-{seed}")
+    git_dir = os.path.join(mirror_dir, OWNER, f"{repo_name}.git")
+    if not os.path.isdir(git_dir):
+        os.makedirs(os.path.dirname(git_dir), exist_ok=True)
+        print(f"Building a git fixture with {commits} commits")
+        syntheticHistory(commits, merge_every=50, rename_rate=0.02, seed=seed).build(git_dir)
+    return mirror_dir
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(method: str, repo_name: str, api_base_url: str, mirror_dir: str, work_dir: str) -> dict:
+    '''
+    Runs one public method in a fresh process, so its peak RSS is its own. Outputs go to work_dir
+    '''
+    from ..src.unified_extractor import dataExtraction
+
+    os.chdir(work_dir)
+    extraction = dataExtraction([repo_name], [OWNER], ['bench-token'], mirror_dir=mirror_dir,
+                                api_base_url=api_base_url, git_base_url=mirror_dir or api_base_url)
+
+    start = time.perf_counter()
+    getattr(extraction, method)()
+    wall_seconds = time.perf_counter() - start
+
+    # Every published output has a sidecar manifest with its row count, the API cost reports are not extracted rows
+    rows = 0
+    for manifest_path in glob.glob(os.path.join('ExtractedData', '*.manifest.json')):
+        if os.path.basename(manifest_path).startswith('api_'):
+            continue
+        with open(manifest_path, 'r') as manifest_file:
+            rows += json.load(manifest_file)['rows']
+
+    request_stats = extraction.get_request_stats()
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'api_requests': request_stats['Total Requests'],
+        'network_calls': request_stats['Network Calls'],
+        'rows': rows,
+        'rows_per_second': round(rows / wall_seconds, 1) if wall_seconds > 0 else None
+    }
+
+
+def run_suite(methods: list, scales: list, fixture_dir: str, latency: float = 0.0, seed: int = 0) -> dict:
+    '''
+    Runs every method at every scale against the mock server and the git fixtures, returning the results
+    '''
+    results = []
+    context = multiprocessing.get_context('spawn')
+
+    for scale in scales:
+        prs, commits = SCALES[scale]['prs'], SCALES[scale]['commits']
+        repo_name = f"synthetic-{scale}"
+        repo = syntheticRepo(OWNER, repo_name, prs=prs, seed=seed)
+        with mockGitHubServer([repo], latency=latency, rate_limit=10 ** 9) as server:
+            for method in methods:
+                mirror_dir = fixture_mirror_dir(fixture_dir, repo_name, commits, seed) if method in GIT_METHODS else None
+                server.reset_stats()
+                print(f"Benchmarking {method} at {scale} scale ({prs} PRs, {commits} commits)")
+
+                with tempfile.TemporaryDirectory() as work_dir:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        result = executor.submit(run_benchmark, method, repo_name, server.url, mirror_dir,
+                                                 work_dir).result()
+
+                result.update({'method': method, 'scale': scale, 'prs': prs,
+                               'commits': commits if method in GIT_METHODS else None,
+                               'server_requests': server.stats()['Requests']})
+                if prs and method not in GIT_METHODS:
+                    result['requests_per_pr'] = round(result['server_requests'] / prs, 2)
+                results.append(result)
+
+    return {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latency': latency,
+        'seed': seed,
+        'results': results
+    }
+
+
+def git_log_totals(git_dir: str) -> dict:
+    '''
+    The commit, line and contributor totals of the extractor from a single streamed git log --numstat,
+    the cost of reading the history with no per-commit objects
+    '''
+    totals = {'commits': 0, 'lines': 0, 'size': 0, 'contributors': set()}
+    log = subprocess.Popen(['git', '--git-dir', git_dir, 'log', '--no-renames', '--numstat', '--format=%x00%an'],
+                           stdout=subprocess.PIPE, text=True, errors='replace')
+    for line in log.stdout:
+        if line.startswith('\0'):
+            totals['commits'] += 1
+            totals['contributors'].add(line[1:].rstrip('\n'))
+        elif line.strip():
+            added, deleted = line.split('\t', 2)[:2]
+            if added != '-':
+                totals['lines'] += int(added) + int(deleted)
+                totals['size'] += int(added) - int(deleted)
+    log.wait()
+    totals['contributors'] = len(totals['contributors'])
+    return totals
+
+
+def run_commit_engine(engine: str, repo_name: str, mirror_dir: str, work_dir: str) -> dict:
+    '''
+    Traverses a fixture history with one engine in a fresh process: the extractor's pydriller path,
+    or a plain git log as the baseline
+    '''
+    os.chdir(work_dir)
+    start = time.perf_counter()
+    if engine == 'pydriller':
+        from ..src.unified_extractor import dataExtraction
+
+        extraction = dataExtraction([repo_name], [OWNER], mirror_dir=mirror_dir, git_base_url=mirror_dir)
+        extraction.extract_commit_and_contributor_data(extraction.repo_infos[0])
+        commits = extraction.commit_rollups[(OWNER, repo_name)].commits
+    else:
+        commits = git_log_totals(os.path.join(mirror_dir, OWNER, f"{repo_name}.git"))['commits']
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'commits_traversed': commits,
+        'commits_per_second': round(commits / wall_seconds, 1) if wall_seconds > 0 else None
+    }
+
+
+def run_commit_engines(engines: list, commit_scales: list, fixture_dir: str, seed: int = 0) -> list:
+    '''
+    Runs every commit traversal engine on synthetic histories of each size
+    '''
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for commits in commit_scales:
+        repo_name = f"history-{commits}"
+        mirror_dir = fixture_mirror_dir(fixture_dir, repo_name, commits, seed)
+        for engine in engines:
+            print(f"Benchmarking the {engine} commit engine on {commits} commits")
+            with tempfile.TemporaryDirectory() as work_dir:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_commit_engine, engine, repo_name, mirror_dir, work_dir).result()
+            result.update({'engine': engine, 'commits': commits})
+            results.append(result)
+    return results
+
+
+def compare_results(previous: dict, current: dict) -> list:
+    '''
+    Pairs up the results of two runs by method and scale, with the ratio current / previous of each measure
+    '''
+    previous_results = {(result['method'], result['scale']): result for result in previous['results']}
+    comparisons = []
+    for result in current['results']:
+        before = previous_results.get((result['method'], result['scale']))
+        if before is None:
+            continue
+        comparison = {'method': result['method'], 'scale': result['scale']}
+        for measure in ('wall_seconds', 'peak_rss_mb', 'server_requests', 'rows_per_second'):
+            if before.get(measure) and result.get(measure) is not None:
+                comparison[measure] = round(result[measure] / before[measure], 3)
+        comparisons.append(comparison)
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the public extraction methods against local fixtures')
+    parser.add_argument('--methods', nargs='+', default=PUBLIC_METHODS, choices=PUBLIC_METHODS)
+    parser.add_argument('--scales', nargs='+', default=['small'], choices=list(SCALES))
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the mock server adds to every request')
+    parser.add_argument('--fixtures', default=os.path.join('bench_fixtures'), help='where git fixtures are cached')
+    parser.add_argument('--output', default=None, help='JSON file for the results')
+    parser.add_argument('--compare', default=None, help='results JSON of an earlier run to compare with')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--commit-engines', nargs='*', default=None, choices=COMMIT_ENGINES,
+                        help='also compare commit traversal engines, all of them when none are named')
+    parser.add_argument('--commit-scales', nargs='+', type=int, default=COMMIT_SCALES[:1])
+    args = parser.parse_args()
+
+    report = run_suite(args.methods, args.scales, args.fixtures, args.latency, args.seed)
+    if args.commit_engines is not None:
+        report['commit_engines'] = run_commit_engines(args.commit_engines or COMMIT_ENGINES, args.commit_scales,
+                                                      args.fixtures, args.seed)
+
+    for result in report['results']:
+        print(f"{result['method']:<34} {result['scale']:<7} {result['wall_seconds']:>9.2f}s "
+              f"{result['peak_rss_mb']:>8.1f} MB {result['server_requests']:>8} requests "
+              f"{result['rows_per_second'] or 0:>10.1f} rows/s")
+    for result in report.get('commit_engines', []):
+        print(f"{result['engine']:<12} {result['commits']:>9} commits {result['wall_seconds']:>9.2f}s "
+              f"{result['peak_rss_mb']:>8.1f} MB {result['commits_per_second'] or 0:>10.1f} commits/s")
+
+    output = args.output or os.path.join('bench_results',
+                                         datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as previous_file:
+            previous = json.load(previous_file)
+        for comparison in compare_results(previous, report):
+            ratios = ', '.join(f"{measure} x{ratio}" for measure, ratio in comparison.items()
+                               if measure not in ('method', 'scale'))
+            print(f"{comparison['method']} ({comparison['scale']}): {ratios}")
+
+
+if __name__ == '__main__':
+    main()
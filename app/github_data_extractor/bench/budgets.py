@@ -0,0 +1,190 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from .benchmarks import (GIT_METHODS, OWNER, PUBLIC_METHODS, fixture_mirror_dir, peak_rss_mb, run_benchmark,
+                         run_commit_engine)
+from .mock_github import mockGitHubServer, syntheticRepo
+
+# Measures a budget can bound. Throughputs are minimums, everything else is a maximum
+MEASURES = {
+    'requests_per_pr': 'max',
+    'seconds_per_pr': 'max',
+    'wall_seconds': 'max',
+    'peak_rss_mb': 'max',
+    'rows_per_second': 'min',
+    'commits_per_second': 'min'
+}
+
+COMMIT_TRAVERSAL = 'commit_traversal'
+
+# History size for a budget of a git method that only sets prs, as in the benchmark scales
+COMMITS_PER_PR = 10
+
+
+class performanceBudget:
+    def __init__(self, target: str, measure: str, limit: float, prs: int = None, commits: int = None):
+        '''
+        A limit on one measure of one target, at a given number of PRs or commits. The target is an extractor,
+        a public method or commit_traversal
+        '''
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure: {measure}. Choose one of {list(MEASURES)}")
+
+        self.target = target
+        self.measure = measure
+        self.limit = limit
+        self.prs = prs
+        self.commits = commits
+
+    def check(self, value) -> bool:
+        if value is None:
+            return False
+        return value <= self.limit if MEASURES[self.measure] == 'max' else value >= self.limit
+
+    def describe(self) -> str:
+        operator = '<=' if MEASURES[self.measure] == 'max' else '>='
+        scale = f"{self.prs} PRs" if self.prs else f"{self.commits} commits"
+        return f"{self.target} {self.measure} {operator} {self.limit} at {scale}"
+
+
+# Request budgets catch N+1 fetches, time budgets at large scales catch quadratic joins
+BUDGETS = [
+    performanceBudget('extract_file_data_per_pr', 'requests_per_pr', 1.1, prs=1000),
+    performanceBudget('extract_commit_data_per_pr', 'requests_per_pr', 3.7, prs=1000),
+    performanceBudget('calculate_pr_quality', 'requests_per_pr', 4.1, prs=1000),
+    performanceBudget('get_linked_issue_from_pr', 'requests_per_pr', 1.1, prs=1000),
+    performanceBudget('extract_issue_tracking_data', 'requests_per_pr', 0.1, prs=1000),
+    performanceBudget('extract_pull_request_data', 'requests_per_pr', 4.8, prs=1000),
+    performanceBudget('extract_aggregate_metrics', 'requests_per_pr', 9.0, prs=1000),
+    performanceBudget('extract_data_pr', 'seconds_per_pr', 0.02, prs=10000),
+    performanceBudget('extract_data_pr', 'peak_rss_mb', 250, prs=10000),
+    performanceBudget(COMMIT_TRAVERSAL, 'commits_per_second', 40, commits=2000)
+]
+
+
+def load_budgets(path: str) -> list:
+    '''
+    Reads budgets from a JSON list of objects with the performanceBudget arguments
+    '''
+    with open(path, 'r') as budget_file:
+        return [performanceBudget(**budget) for budget in json.load(budget_file)]
+
+
+def run_extractor(extractor: str, repo_name: str, api_base_url: str, work_dir: str) -> dict:
+    '''
+    Runs one extractor on its own in a fresh process. Outputs go to work_dir
+    '''
+    from ..src.unified_extractor import dataExtraction
+
+    os.chdir(work_dir)
+    extraction = dataExtraction([repo_name], [OWNER], ['bench-token'], api_base_url=api_base_url,
+                                git_base_url=api_base_url)
+    repo_info = extraction.repo_infos[0]
+
+    start = time.perf_counter()
+    if extractor == 'extract_pull_request_data':
+        rows = extraction.extract_pull_request_data(repo_info, 'budget', True)
+    else:
+        rows = getattr(extraction, extractor)(repo_info)
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'rows_per_second': round((len(rows) - 1) / wall_seconds, 1) if wall_seconds > 0 else None
+    }
+
+
+def measure_target(target: str, prs: int, commits: int, server, fixture_dir: str, seed: int = 0) -> dict:
+    '''
+    Measures a target once in a fresh process and returns every measure it has
+    '''
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as work_dir:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            if target == COMMIT_TRAVERSAL:
+                repo_name = f"history-{commits}"
+                mirror_dir = fixture_mirror_dir(fixture_dir, repo_name, commits, seed)
+                return executor.submit(run_commit_engine, 'pydriller', repo_name, mirror_dir, work_dir).result()
+
+            server.reset_stats()
+            repo_name = f"budget-{prs}"
+            if target in PUBLIC_METHODS:
+                mirror_dir = None
+                if target in GIT_METHODS:
+                    mirror_dir = fixture_mirror_dir(fixture_dir, repo_name, commits or prs * COMMITS_PER_PR, seed)
+                result = executor.submit(run_benchmark, target, repo_name, server.url, mirror_dir, work_dir).result()
+            else:
+                result = executor.submit(run_extractor, target, repo_name, server.url, work_dir).result()
+
+    result['requests_per_pr'] = round(server.stats()['Requests'] / prs, 3)
+    result['seconds_per_pr'] = round(result['wall_seconds'] / prs, 5)
+    return result
+
+
+def check_budgets(budgets: list, fixture_dir: str, latency: float = 0.0, seed: int = 0,
+                  measurements: dict = None) -> list:
+    '''
+    Measures each target and scale the budgets name once and checks every budget against it.
+    Returns (budget, measured value, passed) for each budget. Passing the same measurements dict
+    to several calls shares the measurements between them
+    '''
+    measurements = {} if measurements is None else measurements
+    servers = {}
+    try:
+        for budget in budgets:
+            key = (budget.target, budget.prs, budget.commits)
+            if key in measurements:
+                continue
+
+            server = None
+            if budget.target != COMMIT_TRAVERSAL:
+                if budget.prs not in servers:
+                    repo = syntheticRepo(OWNER, f"budget-{budget.prs}", prs=budget.prs, seed=seed)
+                    servers[budget.prs] = mockGitHubServer([repo], latency=latency, rate_limit=10 ** 9).start()
+                server = servers[budget.prs]
+
+            print(f"Measuring {budget.target} at {budget.prs or budget.commits} {'PRs' if budget.prs else 'commits'}")
+            measurements[key] = measure_target(budget.target, budget.prs, budget.commits, server, fixture_dir, seed)
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    return [(budget, measurements[(budget.target, budget.prs, budget.commits)].get(budget.measure),
+             budget.check(measurements[(budget.target, budget.prs, budget.commits)].get(budget.measure)))
+            for budget in budgets]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the performance budgets against the mock server and '
+                                                 'synthetic repositories')
+    parser.add_argument('--budgets', default=None, help='JSON file of budgets to check instead of the defaults')
+    parser.add_argument('--targets', nargs='+', default=None, help='only check the budgets of these targets')
+    parser.add_argument('--fixtures', default='bench_fixtures', help='where git fixtures are cached')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    budgets = load_budgets(args.budgets) if args.budgets else BUDGETS
+    if args.targets:
+        budgets = [budget for budget in budgets if budget.target in args.targets]
+
+    results = check_budgets(budgets, args.fixtures, args.latency, args.seed)
+    failures = [result for result in results if not result[2]]
+    for budget, value, passed in results:
+        print(f"{'PASS' if passed else 'FAIL'}  {budget.describe()}: measured {value}")
+
+    if failures:
+        print(f"{len(failures)} of {len(results)} performance budgets exceeded")
+        sys.exit(1)
+    print(f"All {len(results)} performance budgets met")
+
+
+if __name__ == '__main__':
+    main()
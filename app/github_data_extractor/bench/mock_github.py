@@ -0,0 +1,496 @@
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+
+BASE_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+FILE_STATUSES = ['added', 'modified', 'modified', 'modified', 'removed', 'renamed']
+
+
+def timestamp(hours: float) -> str:
+    return (BASE_DATE + timedelta(hours=hours)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class syntheticRepo:
+    def __init__(self, owner: str, name: str, prs: int = 100, commits_per_pr: int = 3, files_per_pr: int = 4,
+                 reviews_per_pr: int = 2, comments_per_pr: int = 3, issues: int = None, branches: int = 10,
+                 authors: int = 20, seed: int = 0):
+        '''
+        A synthetic repository whose payloads are generated on request from the seed, so even very large
+        repositories take no memory. Per-PR counts vary around the given averages, deterministically
+        '''
+        self.owner = owner
+        self.name = name
+        self.prs = prs
+        self.commits_per_pr = commits_per_pr
+        self.files_per_pr = files_per_pr
+        self.reviews_per_pr = reviews_per_pr
+        self.comments_per_pr = comments_per_pr
+        self.issues = prs // 2 if issues is None else issues
+        self.branches = branches
+        self.authors = authors
+        self.seed = seed
+
+    def rng(self, *key) -> random.Random:
+        return random.Random('/'.join(str(part) for part in (self.seed, self.owner, self.name) + key))
+
+    def count(self, average: int, *key) -> int:
+        # Between half and one and a half times the average
+        return self.rng('count', *key).randint(average // 2, average + average // 2) if average else 0
+
+    def api_url(self, base_url: str, path: str = '') -> str:
+        return f"{base_url}/repos/{self.owner}/{self.name}{path}"
+
+    def user(self, base_url: str, user_id: int) -> dict:
+        login = f"user{user_id}"
+        return {
+            'login': login, 'id': user_id, 'node_id': f"U_{user_id}", 'type': 'User', 'site_admin': False,
+            'avatar_url': f"https://avatars.example.com/u/{user_id}?v=4",
+            'url': f"{base_url}/users/{login}", 'html_url': f"https://github.com/{login}"
+        }
+
+    def repository(self, base_url: str) -> dict:
+        '''
+        Repository object, as embedded in every PR's head and base. It is large, like GitHub's
+        '''
+        repository = {
+            'id': int(hashlib.sha1(f"{self.owner}/{self.name}".encode()).hexdigest()[:7], 16),
+            'node_id': f"R_{self.owner}_{self.name}",
+            'name': self.name, 'full_name': f"{self.owner}/{self.name}", 'private': False,
+            'owner': self.user(base_url, 0), 'html_url': f"https://github.com/{self.owner}/{self.name}",
+            'description': f"Synthetic repository {self.owner}/{self.name}", 'fork': False,
+            'created_at': timestamp(0), 'updated_at': timestamp(self.prs), 'pushed_at': timestamp(self.prs),
+            'size': 1000 + self.prs, 'stargazers_count': 0, 'watchers_count': 0, 'language': 'Python',
+            'forks_count': 0, 'open_issues_count': self.issues // 3, 'open_issues': self.issues // 3,
+            'default_branch': 'main', 'visibility': 'public'
+        }
+        for resource in ['forks', 'keys', 'collaborators', 'teams', 'hooks', 'issue_events', 'events', 'assignees',
+                         'branches', 'tags', 'blobs', 'git_tags', 'git_refs', 'trees', 'statuses', 'languages',
+                         'stargazers', 'contributors', 'subscribers', 'subscription', 'commits', 'git_commits',
+                         'comments', 'issue_comment', 'contents', 'compare', 'merges', 'archive', 'downloads',
+                         'issues', 'pulls', 'milestones', 'notifications', 'labels', 'releases', 'deployments']:
+            repository[f"{resource}_url"] = self.api_url(base_url, f"/{resource}")
+        return repository
+
+    def pull(self, base_url: str, number: int) -> dict:
+        rng = self.rng('pull', number)
+        merged = rng.random() < 0.7
+        closed = merged or rng.random() < 0.3
+        created_hours = number * 6
+        merged_hours = created_hours + rng.randint(1, 24 * 60)
+        repository = self.repository(base_url)
+        labels = [{'id': label, 'name': f"label-{label}", 'color': 'ededed', 'default': False}
+                  for label in sorted(rng.sample(range(8), rng.randint(0, 3)))]
+        milestone = None
+        if rng.random() < 0.4:
+            milestone = {'number': number % 5 + 1, 'title': f"v{number % 5 + 1}",
+                         'open_issues': rng.randint(0, 20), 'closed_issues': rng.randint(0, 50)}
+
+        return {
+            'url': self.api_url(base_url, f"/pulls/{number}"), 'id': number, 'node_id': f"PR_{number}",
+            'html_url': f"https://github.com/{self.owner}/{self.name}/pull/{number}", 'number': number,
+            'state': 'closed' if closed else 'open', 'locked': False,
+            'title': ('Revert ' if rng.random() < 0.05 else '') + f"Change number {number}",
+            'user': self.user(base_url, rng.randint(1, self.authors)),
+            'body': f"Synthetic pull request {number}. " * rng.randint(1, 20),
+            'created_at': timestamp(created_hours), 'updated_at': timestamp(merged_hours),
+            'closed_at': timestamp(merged_hours) if closed else None,
+            'merged_at': timestamp(merged_hours) if merged else None,
+            'merge_commit_sha': self.commit_sha(number, 0) if merged else None,
+            'assignees': [self.user(base_url, rng.randint(1, self.authors)) for _ in range(rng.randint(0, 2))],
+            'requested_reviewers': [self.user(base_url, rng.randint(1, self.authors)) for _ in range(rng.randint(0, 2))],
+            'requested_teams': [], 'labels': labels, 'milestone': milestone, 'draft': False,
+            'head': {'label': f"{self.owner}:feature-{number}", 'ref': f"feature-{number}",
+                     'sha': self.commit_sha(number, 0), 'user': self.user(base_url, 0), 'repo': repository},
+            'base': {'label': f"{self.owner}:main", 'ref': 'main', 'sha': self.commit_sha(0, number),
+                     'user': self.user(base_url, 0), 'repo': repository},
+            'author_association': 'CONTRIBUTOR'
+        }
+
+    def pull_detail(self, base_url: str, number: int) -> dict:
+        files = self.pull_files(base_url, number)
+        detail = self.pull(base_url, number)
+        detail.update({
+            'additions': sum(file['additions'] for file in files),
+            'deletions': sum(file['deletions'] for file in files),
+            'changed_files': len(files), 'commits': self.count(self.commits_per_pr, 'commits', number),
+            'comments': self.count(self.comments_per_pr, 'comments', number),
+            'review_comments': 0, 'merged': detail['merged_at'] is not None, 'mergeable': None
+        })
+        return detail
+
+    def commit_sha(self, number: int, index: int) -> str:
+        # The PR number and commit index are encoded in the sha, so commit details need no lookup table
+        return f"{number:024x}{index:016x}"
+
+    def pull_commits(self, base_url: str, number: int) -> list:
+        rng = self.rng('commits', number)
+        commits = []
+        for index in range(self.count(self.commits_per_pr, 'commits', number)):
+            author = self.user(base_url, rng.randint(1, self.authors)) if rng.random() < 0.95 else None
+            sha = self.commit_sha(number, index)
+            commits.append({
+                'sha': sha, 'node_id': f"C_{sha}", 'url': self.api_url(base_url, f"/commits/{sha}"),
+                'commit': {
+                    'author': {'name': author['login'] if author else 'ghost', 'date': timestamp(number * 6)},
+                    'committer': {'name': 'GitHub', 'date': timestamp(number * 6)},
+                    'message': f"Commit {index} of PR {number}", 'comment_count': rng.randint(0, 2)
+                },
+                'author': author, 'committer': author, 'parents': []
+            })
+        return commits
+
+    def commit(self, base_url: str, index: int) -> dict:
+        # The repository history lists commits_per_pr commits for each PR
+        number, position = index // max(self.commits_per_pr, 1) + 1, index % max(self.commits_per_pr, 1)
+        sha = self.commit_sha(number, position)
+        return {'sha': sha, 'url': self.api_url(base_url, f"/commits/{sha}"),
+                'commit': {'message': f"Commit {position} of PR {number}", 'comment_count': 0}}
+
+    def commit_detail(self, base_url: str, sha: str) -> dict or None:
+        try:
+            number, index = int(sha[:24], 16), int(sha[24:], 16)
+        except ValueError:
+            return None
+        if not 1 <= number <= self.prs:
+            return None
+
+        rng = self.rng('commit', sha)
+        files = [{'filename': f"src/module_{rng.randint(0, 200)}.py", 'status': rng.choice(FILE_STATUSES),
+                  'additions': rng.randint(0, 80), 'deletions': rng.randint(0, 40)}
+                 for _ in range(rng.randint(1, max(1, self.files_per_pr)))]
+        for file in files:
+            file['changes'] = file['additions'] + file['deletions']
+        additions = sum(file['additions'] for file in files)
+        deletions = sum(file['deletions'] for file in files)
+        return {
+            'sha': sha, 'url': self.api_url(base_url, f"/commits/{sha}"),
+            'commit': {'message': f"Commit {index} of PR {number}", 'comment_count': 0},
+            'stats': {'total': additions + deletions, 'additions': additions, 'deletions': deletions},
+            'files': files
+        }
+
+    def pull_files(self, base_url: str, number: int) -> list:
+        rng = self.rng('files', number)
+        files = []
+        for index in range(self.count(self.files_per_pr, 'files', number)):
+            directory = 'tests' if rng.random() < 0.2 else 'src'
+            additions, deletions = rng.randint(0, 200), rng.randint(0, 100)
+            files.append({
+                'sha': hashlib.sha1(f"{number}/{index}".encode()).hexdigest(),
+                'filename': f"{directory}/module_{rng.randint(0, 200)}.py", 'status': rng.choice(FILE_STATUSES),
+                'additions': additions, 'deletions': deletions, 'changes': additions + deletions,
+                'patch': '@@ -1 +1 @@\n' + '+line\n' * min(additions, 20)
+            })
+        return files
+
+    def pull_reviews(self, base_url: str, number: int) -> list:
+        rng = self.rng('reviews', number)
+        return [{'id': number * 100 + index, 'user': self.user(base_url, rng.randint(1, self.authors)),
+                 'body': 'Looks good.\n' * rng.randint(0, 4), 'state': rng.choice(['APPROVED', 'COMMENTED']),
+                 'submitted_at': timestamp(number * 6 + index)}
+                for index in range(self.count(self.reviews_per_pr, 'reviews', number))]
+
+    def pull_comments(self, base_url: str, number: int) -> list:
+        rng = self.rng('comments', number)
+        return [{'id': number * 1000 + index, 'user': self.user(base_url, rng.randint(1, self.authors)),
+                 'body': f"Comment {index}", 'path': 'src/module.py', 'created_at': timestamp(number * 6 + index)}
+                for index in range(self.count(self.comments_per_pr, 'comments', number))]
+
+    def issue(self, base_url: str, number: int) -> dict:
+        rng = self.rng('issue', number)
+        state = 'open' if rng.random() < 0.3 else 'closed'
+        created_hours = number * 3
+        return {
+            'url': self.api_url(base_url, f"/issues/{number}"), 'id': number, 'number': number,
+            'title': f"Issue number {number}", 'state': state, 'user': self.user(base_url, rng.randint(1, self.authors)),
+            'labels': [{'name': rng.choice(['bug', 'enhancement', 'question', 'docs'])}] if rng.random() < 0.6 else [],
+            'created_at': timestamp(created_hours),
+            'updated_at': timestamp(created_hours + rng.randint(0, 100)) if rng.random() < 0.5 else timestamp(created_hours),
+            'closed_at': timestamp(created_hours + 100) if state == 'closed' else None,
+            'body': f"Synthetic issue {number}. " * rng.randint(1, 10)
+        }
+
+    def issue_timeline(self, base_url: str, number: int) -> list:
+        events = [{'event': 'labeled', 'created_at': timestamp(number * 6)},
+                  {'event': 'commented', 'created_at': timestamp(number * 6 + 1)}]
+        # Every third PR references an issue
+        if number % 3 == 0 and self.issues:
+            events.append({'event': 'cross-referenced', 'created_at': timestamp(number * 6 + 2),
+                           'source': {'type': 'issue', 'issue': self.issue(base_url, number % self.issues + 1)}})
+        return events
+
+    def branch(self, index: int) -> dict:
+        name = 'main' if index == 0 else f"feature-{index}"
+        return {'name': name, 'commit': {'sha': self.commit_sha(0, index)}, 'protected': index == 0}
+
+
+class mockGitHubServer:
+    def __init__(self, repos: list, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 rate_limit: int = 5000, secondary_limit: tuple = None, default_per_page: int = 30):
+        '''
+        Local stand-in for api.github.com serving syntheticRepo payloads. It paginates with Link headers, answers
+        If-None-Match with 304, sends rate-limit headers and, with secondary_limit=(requests, seconds), throttles
+        bursts with 403 and Retry-After. Every request waits latency seconds first
+        '''
+        self.repos = {(repo.owner, repo.name): repo for repo in repos}
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.secondary_limit = secondary_limit
+        self.default_per_page = default_per_page
+
+        self.lock = threading.Lock()
+        self.remaining = {}
+        self.reset_at = int(time.time()) + 3600
+        self.recent_requests = deque()
+        self.request_counts = Counter()
+        self.throttled_requests = 0
+        self.server = None
+        self.thread = None
+
+        self.routes = [
+            (re.compile(r'/rate_limit'), 'rate_limit', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)'), 'repository', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/pulls'), 'pull_list', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/pulls/(\d+)'), 'pull_detail', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/pulls/(\d+)/commits'), 'pull_commits', syntheticRepo.pull_commits),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/pulls/(\d+)/files'), 'pull_files', syntheticRepo.pull_files),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/pulls/(\d+)/reviews'), 'pull_reviews', syntheticRepo.pull_reviews),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/pulls/(\d+)/comments'), 'pull_comments', syntheticRepo.pull_comments),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/commits'), 'commit_list', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/commits/([0-9a-f]+)'), 'commit_detail', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/issues'), 'issues', None),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/issues/(\d+)/timeline'), 'issue_timeline', syntheticRepo.issue_timeline),
+            (re.compile(r'/repos/([^/]+)/([^/]+)/branches'), 'branches', None)
+        ]
+
+    @property
+    def url(self) -> str:
+        '''
+        Base URL to pass to dataExtraction as api_base_url
+        '''
+        return f"http://{self.host}:{self.server.server_address[1]}"
+
+    def start(self):
+        server = self
+
+        class handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body are sent separately, without this Nagle's algorithm delays every response
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                status, headers, body = server.handle(self.path, self.headers)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='mock-github', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def stats(self) -> dict:
+        '''
+        Returns the number of requests served per endpoint and how many were throttled
+        '''
+        with self.lock:
+            return {'Requests': sum(self.request_counts.values()), 'Throttled': self.throttled_requests,
+                    'By Endpoint': dict(self.request_counts)}
+
+    def reset_stats(self):
+        with self.lock:
+            self.request_counts = Counter()
+            self.throttled_requests = 0
+            self.remaining = {}
+
+    def handle(self, raw_path: str, headers) -> tuple:
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = urlsplit(raw_path)
+        query = dict(parse_qsl(parts.query))
+        path = parts.path.rstrip('/')
+
+        route = None
+        for pattern, name, generator in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                route = (name, generator, match.groups())
+                break
+        if route is None:
+            return self.respond(404, {'message': 'Not Found'})
+        name, generator, groups = route
+
+        token = headers.get('Authorization')
+        with self.lock:
+            self.request_counts[name] += 1
+            if name != 'rate_limit':
+                throttled = self.throttle()
+                if throttled is not None:
+                    return throttled
+            remaining = self.remaining.get(token, self.rate_limit)
+
+        if name == 'rate_limit':
+            return self.respond(200, {'rate': {'limit': self.rate_limit, 'remaining': remaining, 'used':
+                                               self.rate_limit - remaining, 'reset': self.reset_at},
+                                      'resources': {'core': {'limit': self.rate_limit, 'remaining': remaining,
+                                                             'reset': self.reset_at}}})
+        if remaining <= 0:
+            return self.respond(403, {'message': 'API rate limit exceeded'}, self.rate_headers(0))
+
+        repo = self.repos.get(groups[:2])
+        if repo is None:
+            return self.respond(404, {'message': 'Not Found'})
+
+        status, payload, link = self.payload(repo, name, generator, groups, query, parts.path)
+        body = json.dumps(payload).encode()
+        etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+
+        # Conditional requests that match are not charged, as on GitHub
+        if status == 200 and headers.get('If-None-Match') == etag:
+            return 304, dict(self.rate_headers(remaining), ETag=etag), b''
+
+        with self.lock:
+            remaining = self.remaining.get(token, self.rate_limit) - 1
+            self.remaining[token] = remaining
+
+        response_headers = dict(self.rate_headers(remaining), ETag=etag)
+        if link:
+            response_headers['Link'] = link
+        return self.respond(status, payload, response_headers, body)
+
+    def throttle(self):
+        '''
+        Secondary rate limit over a sliding window. Called with the lock held
+        '''
+        if self.secondary_limit is None:
+            return None
+
+        max_requests, window = self.secondary_limit
+        now = time.monotonic()
+        while self.recent_requests and self.recent_requests[0] <= now - window:
+            self.recent_requests.popleft()
+
+        if len(self.recent_requests) >= max_requests:
+            self.throttled_requests += 1
+            retry_after = max(1, math.ceil(self.recent_requests[0] + window - now))
+            return self.respond(403, {'message': 'You have exceeded a secondary rate limit.'},
+                                {'Retry-After': str(retry_after)})
+
+        self.recent_requests.append(now)
+        return None
+
+    def rate_headers(self, remaining: int) -> dict:
+        return {
+            'X-RateLimit-Limit': str(self.rate_limit), 'X-RateLimit-Remaining': str(max(remaining, 0)),
+            'X-RateLimit-Used': str(self.rate_limit - max(remaining, 0)), 'X-RateLimit-Reset': str(self.reset_at),
+            'X-RateLimit-Resource': 'core'
+        }
+
+    def respond(self, status: int, payload, headers: dict = None, body: bytes = None) -> tuple:
+        headers = dict(headers or {}, **{'Content-Type': 'application/json; charset=utf-8'})
+        return status, headers, body if body is not None else json.dumps(payload).encode()
+
+    def payload(self, repo: syntheticRepo, name: str, generator, groups: tuple, query: dict, path: str) -> tuple:
+        '''
+        Returns the status, payload and Link header of a request
+        '''
+        if name == 'repository':
+            return 200, repo.repository(self.url), None
+        if name == 'pull_detail':
+            number = int(groups[2])
+            if not 1 <= number <= repo.prs:
+                return 404, {'message': 'Not Found'}, None
+            return 200, repo.pull_detail(self.url, number), None
+        if name == 'commit_detail':
+            detail = repo.commit_detail(self.url, groups[2])
+            return (200, detail, None) if detail is not None else (422, {'message': 'No commit found'}, None)
+
+        # Paginated collections, items are generated for the requested page only
+        if name == 'pull_list':
+            total, item = repo.prs, lambda index: repo.pull(self.url, index + 1)
+        elif name == 'issues':
+            total, item = repo.issues, lambda index: repo.issue(self.url, index + 1)
+        elif name == 'commit_list':
+            total, item = repo.prs * repo.commits_per_pr, lambda index: repo.commit(self.url, index)
+        elif name == 'branches':
+            total, item = repo.branches, repo.branch
+        else:
+            number = int(groups[2])
+            if not 1 <= number <= repo.prs:
+                return 404, {'message': 'Not Found'}, None
+            items = generator(repo, self.url, number)
+            total, item = len(items), items.__getitem__
+
+        page = max(1, int(query.get('page', 1)))
+        per_page = min(100, max(1, int(query.get('per_page', self.default_per_page))))
+        start = (page - 1) * per_page
+        items = [item(index) for index in range(start, min(total, start + per_page))]
+        return 200, items, self.link_header(path, query, page, per_page, total)
+
+    def link_header(self, path: str, query: dict, page: int, per_page: int, total: int) -> str or None:
+        last_page = max(1, math.ceil(total / per_page))
+        links = []
+        for rel, target in (('next', page + 1), ('last', last_page), ('first', 1), ('prev', page - 1)):
+            if (rel in ('next', 'last') and page >= last_page) or (rel in ('first', 'prev') and page <= 1):
+                continue
+            link_query = urlencode(dict(query, page=target, per_page=per_page))
+            links.append(f'<{self.url}{path}?{link_query}>; rel="{rel}"')
+        return ', '.join(links) or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve synthetic GitHub repositories locally')
+    parser.add_argument('--repos', nargs='+', default=['octo/synthetic'], help='owner/name of each repository')
+    parser.add_argument('--prs', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    repos = [syntheticRepo(*name.split('/', 1), prs=args.prs, seed=args.seed) for name in args.repos]
+    with mockGitHubServer(repos, port=args.port, latency=args.latency) as server:
+        print(f"Serving {len(repos)} synthetic repositories at {server.url}. Use it as api_base_url")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+from datetime import datetime, timezone
+import argparse
+import json
+import random
+import subprocess
+
+JAVA_TEMPLATE = "package synthetic.{package};\n\npublic class {name} {{\n{methods}}}\n"
+
+METHOD_TEMPLATE = "    public int {name}(int value) {{\n        return value * {factor} + {offset};\n    }}\n\n"
+
+
+class syntheticFile:
+    def __init__(self, path: str):
+        '''
+        One file of a synthetic history. Java files are a class whose methods are added, removed and
+        changed by commits, other files are lines of text
+        '''
+        self.path = path
+        self.java = path.endswith('.java')
+        self.methods = {}
+        self.lines = []
+        self.next_method = 0
+
+    def change(self, rng: random.Random, method_churn: int):
+        if self.java:
+            for _ in range(rng.randint(1, method_churn)):
+                action = rng.random()
+                if action < 0.5 or not self.methods:
+                    self.methods[f"method{self.next_method}"] = (rng.randint(1, 9), rng.randint(0, 99))
+                    self.next_method += 1
+                elif action < 0.75:
+                    del self.methods[rng.choice(list(self.methods))]
+                else:
+                    self.methods[rng.choice(list(self.methods))] = (rng.randint(1, 9), rng.randint(0, 99))
+        else:
+            for _ in range(rng.randint(1, 5)):
+                if rng.random() < 0.6 or not self.lines:
+                    self.lines.insert(rng.randint(0, len(self.lines)), f"value_{rng.randint(0, 10 ** 6)}")
+                else:
+                    del self.lines[rng.randrange(len(self.lines))]
+
+    def content(self) -> bytes:
+        if self.java:
+            package, name = self.path.split('/')[-2], self.path.split('/')[-1][:-len('.java')]
+            methods = ''.join(METHOD_TEMPLATE.format(name=method, factor=factor, offset=offset)
+                              for method, (factor, offset) in self.methods.items())
+            return JAVA_TEMPLATE.format(package=package, name=name, methods=methods).encode()
+        return ''.join(line + '\n' for line in self.lines).encode()
+
+
+class syntheticHistory:
+    def __init__(self, commits: int = 10000, authors: int = 20, files_per_commit: int = 3, merge_every: int = 0,
+                 branch_length: int = 3, rename_rate: float = 0.0, java_ratio: float = 0.5, method_churn: int = 3,
+                 directories: int = 10, max_files: int = 2000, seed: int = 0):
+        '''
+        Describes the shape of a generated git history. Every merge_every commits a topic branch of branch_length
+        commits forks from main, advances alongside it and is merged back. rename_rate is the chance a main line
+        commit also renames a file, java_ratio the share of .java files and method_churn the most methods one
+        change adds, removes or edits. The same settings and seed always give the same commits and hashes
+        '''
+        self.commits = commits
+        self.authors = authors
+        self.files_per_commit = files_per_commit
+        self.merge_every = merge_every
+        self.branch_length = branch_length
+        self.rename_rate = rename_rate
+        self.java_ratio = java_ratio
+        self.method_churn = method_churn
+        self.directories = directories
+        self.max_files = max_files
+        self.seed = seed
+
+    def settings(self) -> dict:
+        return dict(vars(self))
+
+    def build(self, git_dir: str) -> dict:
+        '''
+        Writes the history into a new bare repository at git_dir with a single git fast-import pass.
+        Returns counts of what was generated
+        '''
+        subprocess.run(['git', 'init', '--quiet', '--bare', git_dir], check=True)
+        importer = subprocess.Popen(['git', '--git-dir', git_dir, 'fast-import', '--quiet', '--done'],
+                                    stdin=subprocess.PIPE)
+        try:
+            summary = self.write_stream(importer.stdin)
+            importer.stdin.write(b"done\n")
+            importer.stdin.close()
+        except BrokenPipeError:
+            pass
+        if importer.wait() != 0:
+            raise RuntimeError(f"git fast-import failed for {git_dir}")
+
+        subprocess.run(['git', '--git-dir', git_dir, 'symbolic-ref', 'HEAD', 'refs/heads/main'], check=True)
+        return summary
+
+    def write_stream(self, stream) -> dict:
+        rng = random.Random(self.seed)
+        # Authors follow a long tail, the first few make most of the commits
+        author_weights = [1 / rank for rank in range(1, self.authors + 1)]
+        timestamp = int(datetime(2015, 1, 1, tzinfo=timezone.utc).timestamp())
+        files = {}
+        paths = []  # Same keys as files, for constant time random picks
+        locked = set()  # Paths owned by the open topic branch until it is merged
+        marks = {'main': None}
+        summary = {'commits': 0, 'merges': 0, 'renames': 0, 'files': 0}
+        mark = 0
+
+        def new_file():
+            directory = f"module{rng.randrange(self.directories)}"
+            extension = '.java' if rng.random() < self.java_ratio else '.txt'
+            name = f"File{summary['files']}" if extension == '.java' else f"file{summary['files']}"
+            summary['files'] += 1
+            path = f"src/{directory}/{name}{extension}"
+            files[path] = syntheticFile(path)
+            paths.append(path)
+            return path
+
+        def pick_path(exclude):
+            # Another path when the pick is excluded, None after a few misses so a new file is added instead
+            for _ in range(8):
+                path = paths[rng.randrange(len(paths))]
+                if path not in exclude:
+                    return path
+            return None
+
+        def pick_paths(count, exclude):
+            picked = []
+            for _ in range(count):
+                path = None
+                if paths and (len(files) >= self.max_files or rng.random() >= 0.15):
+                    path = pick_path(exclude)
+                picked.append(path or new_file())
+            return list(dict.fromkeys(picked))
+
+        def commit(branch, operations, message, parents):
+            nonlocal mark, timestamp
+            mark += 1
+            timestamp += rng.randint(600, 6 * 3600)
+            author = rng.choices(range(1, self.authors + 1), weights=author_weights)[0]
+            identity = f"Author {author} <author{author}@example.com> {timestamp} +0000"
+            message = message.encode()
+            chunks = [f"commit refs/heads/{branch}\nmark :{mark}\nauthor {identity}\ncommitter {identity}\n"
+                      f"data {len(message)}\n".encode(), message, b"\n"]
+            if parents:
+                chunks.append(f"from :{parents[0]}\n".encode())
+                chunks += [f"merge :{parent}\n".encode() for parent in parents[1:]]
+            chunks += operations
+            chunks.append(b"\n")
+            stream.write(b''.join(chunks))
+            summary['commits'] += 1
+            return mark
+
+        def modify(path, content):
+            return [f"M 100644 inline {path}\ndata {len(content)}\n".encode(), content, b"\n"]
+
+        def change(paths, contents=None):
+            operations = []
+            for path in paths:
+                files[path].change(rng, self.method_churn)
+                content = files[path].content()
+                if contents is not None:
+                    contents[path] = content
+                operations += modify(path, content)
+            return operations
+
+        def main_commit():
+            changed = pick_paths(rng.randint(1, self.files_per_commit), locked)
+            operations = change(changed)
+            if self.rename_rate and rng.random() < self.rename_rate:
+                # A pure rename of a file this commit leaves unchanged, so git detects it as a rename
+                old_path = pick_path(locked.union(changed))
+                if old_path is not None:
+                    new_path = f"src/module{rng.randrange(self.directories)}/Renamed{summary['renames']}" \
+                               f"{old_path.rsplit('/', 1)[1]}"
+                    files[new_path] = files.pop(old_path)
+                    files[new_path].path = new_path
+                    paths[paths.index(old_path)] = new_path
+                    operations.append(f"R {old_path} {new_path}\n".encode())
+                    summary['renames'] += 1
+            marks['main'] = commit('main', operations, f"Change {summary['commits'] + 1}\n",
+                                   [marks['main']] if marks['main'] else [])
+
+        since_merge = 0
+        while summary['commits'] < self.commits:
+            remaining = self.commits - summary['commits']
+            branch_commits = 2 * self.branch_length + 1
+            if (self.merge_every and marks['main'] and since_merge >= self.merge_every
+                    and remaining >= branch_commits):
+                # Fork a topic branch, advance it and main in turn on separate files, then merge it with --no-ff
+                branch = f"topic-{summary['merges'] + 1}"
+                topic = marks['main']
+                locked.update(pick_paths(self.files_per_commit, locked))
+                topic_contents = {}
+                for index in range(self.branch_length):
+                    operations = change(rng.sample(sorted(locked), rng.randint(1, len(locked))), topic_contents)
+                    topic = commit(branch, operations, f"Topic change {index + 1} on {branch}\n", [topic])
+                    main_commit()
+                operations = []
+                for path, content in topic_contents.items():
+                    operations += modify(path, content)
+                marks['main'] = commit('main', operations, f"Merge branch '{branch}'\n", [marks['main'], topic])
+                stream.write(f"reset refs/heads/{branch}\nfrom 0000000000000000000000000000000000000000\n\n"
+                             .encode())
+                locked.clear()
+                summary['merges'] += 1
+                since_merge = 0
+            else:
+                main_commit()
+                since_merge += 1
+
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a deterministic synthetic git repository')
+    parser.add_argument('git_dir', help='path of the bare repository to create')
+    parser.add_argument('--commits', type=int, default=10000)
+    parser.add_argument('--authors', type=int, default=20)
+    parser.add_argument('--files-per-commit', type=int, default=3)
+    parser.add_argument('--merge-every', type=int, default=0, help='main line commits between topic branch merges')
+    parser.add_argument('--branch-length', type=int, default=3)
+    parser.add_argument('--rename-rate', type=float, default=0.0)
+    parser.add_argument('--java-ratio', type=float, default=0.5)
+    parser.add_argument('--method-churn', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    history = syntheticHistory(args.commits, args.authors, args.files_per_commit, args.merge_every,
+                               args.branch_length, args.rename_rate, args.java_ratio, args.method_churn,
+                               seed=args.seed)
+    print(json.dumps(history.build(args.git_dir)))
+
+
+if __name__ == '__main__':
+    main()
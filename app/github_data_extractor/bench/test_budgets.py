@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from .budgets import BUDGETS, check_budgets
+
+# Shared by the budgets of the same target and scale, so each is measured once per session
+measurements = {}
+
+
+@pytest.fixture(scope='module')
+def fixture_dir(tmp_path_factory):
+    '''
+    Where git fixtures are built. Set BENCH_FIXTURES to reuse them between runs
+    '''
+    return os.environ.get('BENCH_FIXTURES') or str(tmp_path_factory.mktemp('bench_fixtures'))
+
+
+@pytest.mark.parametrize('budget', BUDGETS, ids=[budget.describe() for budget in BUDGETS])
+def test_budget(budget, fixture_dir):
+    [(budget, value, passed)] = check_budgets([budget], fixture_dir, measurements=measurements)
+    assert passed, f"{budget.describe()} exceeded: measured {value}"
@@ -0,0 +1,118 @@
+from collections import deque
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_MODES = ('record', 'replay')
+
+
+def redact_authorization(value: str) -> str:
+    '''
+    Replaces a token with a short digest, so cassettes tell tokens apart without storing them
+    '''
+    if not value:
+        return value
+    scheme, _, secret = value.partition(' ')
+    return f"{scheme} sha256:{hashlib.sha256(secret.encode()).hexdigest()[:12]}"
+
+
+class recordedResponse:
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        '''
+        A response served from a cassette, with the attributes of requests.Response the fetch layer reads
+        '''
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+
+class httpCassette:
+    def __init__(self, path: str, mode: str, flush_every: int = 1000):
+        '''
+        Gzip compressed JSON Lines of every request / response pair of a run, headers included.
+        'record' starts a new cassette and appends a gzip member every flush_every responses, on flush()
+        and when the interpreter exits.
+        'replay' serves requests from the cassette: identical requests get their recorded responses in order,
+        and the last one again once those run out. A request that was never recorded raises LookupError
+        '''
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}. Choose one of {list(CASSETTE_MODES)}")
+
+        self.path = path
+        self.mode = mode
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.pending = []
+        self.responses = {}
+
+        if mode == 'record':
+            folder_path = os.path.dirname(path)
+            if folder_path and not os.path.exists(folder_path):
+                os.makedirs(folder_path)
+            open(path, 'wb').close()
+            atexit.register(self.flush)
+        else:
+            self.load()
+
+    @staticmethod
+    def match_key(url: str, headers: dict) -> tuple:
+        # Accept changes the payload, the token does not, so a replay may use any token or none
+        return (url, headers.get('Accept'))
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as cassette_file:
+            for line in cassette_file:
+                interaction = json.loads(line)
+                request, response = interaction['request'], interaction['response']
+                content = (base64.b64decode(response['body_base64']) if 'body_base64' in response
+                           else response['body'].encode('utf-8'))
+                key = self.match_key(request['url'], request['headers'])
+                self.responses.setdefault(key, deque()).append(
+                    recordedResponse(response['status'], response['headers'], content)
+                )
+
+    def play(self, url: str, headers: dict) -> recordedResponse:
+        key = self.match_key(url, headers)
+        with self.lock:
+            responses = self.responses.get(key)
+            if not responses:
+                raise LookupError(f"No recorded response for {url} in {self.path}")
+            return responses.popleft() if len(responses) > 1 else responses[0]
+
+    def record(self, url: str, headers: dict, response):
+        request_headers = dict(headers)
+        if 'Authorization' in request_headers:
+            request_headers['Authorization'] = redact_authorization(request_headers['Authorization'])
+
+        recorded = {'status': response.status_code, 'headers': dict(response.headers)}
+        try:
+            recorded['body'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            recorded['body_base64'] = base64.b64encode(response.content).decode('ascii')
+
+        line = json.dumps({'request': {'method': 'GET', 'url': url, 'headers': request_headers},
+                           'response': recorded})
+        with self.lock:
+            self.pending.append(line)
+            if len(self.pending) >= self.flush_every:
+                self.write_pending()
+
+    def write_pending(self):
+        # Called with the lock held. Concatenated gzip members read back as one stream
+        if self.pending:
+            with gzip.open(self.path, 'at', encoding='utf-8') as cassette_file:
+                cassette_file.write('\n'.join(self.pending) + '\n')
+            self.pending = []
+
+    def flush(self):
+        '''
+        Appends the responses recorded since the last flush to the cassette file
+        '''
+        with self.lock:
+            self.write_pending()
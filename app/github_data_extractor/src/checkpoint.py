@@ -0,0 +1,99 @@
+import json
+import os
+
+
+class extractionCheckpoint:
+    def __init__(self, folder_path: str, checkpoint_name: str):
+        '''
+        Durable progress of one extraction, kept under {folder_path}/.checkpoints.
+        Progress is recorded one PR list page at a time, so a crash loses at most the page in flight
+        '''
+        checkpoint_dir = os.path.join(folder_path, '.checkpoints')
+        # Concurrent extractors may open their checkpoints at the same time
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        base_path = os.path.join(checkpoint_dir, checkpoint_name)
+        self.state_path = base_path + '.json'
+        self.rows_path = base_path + '.rows.jsonl'
+
+        self.completed_pages = set()
+        self.output_size = None
+        self.finished = False
+        self.rows = []
+
+    def load(self):
+        '''
+        Loads the recorded progress and the rows of every completed page
+        '''
+        if not os.path.exists(self.state_path):
+            return
+
+        with open(self.state_path, 'r') as state_file:
+            state = json.load(state_file)
+
+        self.completed_pages = set(state['completed_pages'])
+        self.output_size = state.get('output_size')
+        self.finished = state['finished']
+
+        # Rows of a page whose state update never landed are dropped, that page is fetched again
+        page_rows = {}
+        if os.path.exists(self.rows_path):
+            with open(self.rows_path, 'r') as rows_file:
+                for line in rows_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line from a crash
+                    if entry['page'] in self.completed_pages:
+                        page_rows.setdefault(entry['page'], []).append(entry['row'])
+
+        self.rows = [row for page_no in sorted(page_rows) for row in page_rows[page_no]]
+
+    def reset(self):
+        '''
+        Discards any recorded progress and starts a fresh checkpoint
+        '''
+        for path in (self.state_path, self.rows_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.completed_pages = set()
+        self.output_size = None
+        self.finished = False
+        self.rows = []
+
+    def record_page(self, page_no: int, rows: list, output_size: int = None):
+        '''
+        Durably records a completed page: its rows are appended and synced before the state is replaced
+        '''
+        with open(self.rows_path, 'a') as rows_file:
+            for row in rows:
+                rows_file.write(json.dumps({'page': page_no, 'row': list(row)}, default=str) + '\n')
+            rows_file.flush()
+            os.fsync(rows_file.fileno())
+
+        self.completed_pages.add(page_no)
+        self.rows.extend(rows)
+        if output_size is not None:
+            self.output_size = output_size
+        self.write_state()
+
+    def mark_finished(self):
+        '''
+        Records that every page has been processed
+        '''
+        self.finished = True
+        self.write_state()
+
+    def write_state(self):
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w') as state_file:
+            json.dump({
+                'completed_pages': sorted(self.completed_pages),
+                'output_size': self.output_size,
+                'finished': self.finished
+            }, state_file)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+
+        os.replace(temp_path, self.state_path)
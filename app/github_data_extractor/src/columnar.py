@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+except ImportError:  # Columnar output is optional, install with the "columnar" extra
+    pa = None
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar output needs pyarrow. Install it with: pip install github_data_extractor[columnar]")
+
+
+# Columns whose type cannot be told from a single batch: rates are 0 (an int) when nothing changed
+FLOAT_COLUMNS = {
+    'Rate of Commits', 'Rate of Lines Changes', 'Rate of Contributors', 'Rate of Comment Count',
+    'PR age', 'Merge Time (seconds)', 'Open Issues Ratio', 'Closed Issues Ratio', 'Updated Issues Ratio',
+    'Churn Rate Over Time Based on Time', 'Churn Rate Over Time Based on Commits', 'Commit Frequency',
+    'Average Commit Size', 'Average Code Complexity'
+}
+
+TIMESTAMP_COLUMNS = {'created_at', 'updated_at', 'closed_at', 'merged_at'}
+
+
+def known_column_type(name: str):
+    '''
+    Returns the declared Arrow type of a known extractor column, or None when it should be inferred
+    '''
+    if name in FLOAT_COLUMNS:
+        return pa.float64()
+    if name in TIMESTAMP_COLUMNS:
+        return pa.timestamp('s', tz='UTC')
+    return None
+
+
+def parse_timestamp(value):
+    if isinstance(value, str) and value:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    return value or None
+
+
+def normalize_value(value):
+    '''
+    Turns the Python values produced by the extractors into values Arrow can store natively.
+    Sets become sorted lists and (key, count) pairs, as returned by Counter.most_common, become structs
+    '''
+    if isinstance(value, (set, frozenset)):
+        return sorted(normalize_value(item) for item in value)
+    if isinstance(value, tuple):
+        if len(value) == 2 and isinstance(value[0], str) and isinstance(value[1], (int, float)):
+            return {'key': value[0], 'count': value[1]}
+        return [normalize_value(item) for item in value]
+    if isinstance(value, list):
+        return [normalize_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): normalize_value(item) for key, item in value.items()}
+    return value
+
+
+def infer_column_type(values: list):
+    '''
+    Infers the Arrow type of a column. Empty strings, used as padding for missing values, count as nulls
+    '''
+    present = [value for value in values if value is not None and value != '']
+    if not present:
+        return pa.null()
+    if all(isinstance(value, bool) for value in present):
+        return pa.bool_()
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return pa.int64()
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return pa.float64()
+    if all(isinstance(value, str) for value in present):
+        return pa.string()
+
+    try:
+        return pa.array(present).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.string()
+
+
+def build_column(values: list, column_type=None):
+    '''
+    Builds a typed Arrow array from a column of extractor values, inferring the type when none is given
+    '''
+    values = [normalize_value(value) for value in values]
+    if column_type is None:
+        column_type = infer_column_type(values)
+
+    if pa.types.is_timestamp(column_type):
+        values = [parse_timestamp(value) for value in values]
+    elif pa.types.is_string(column_type):
+        values = [None if value is None else value if isinstance(value, str) else str(value) for value in values]
+    elif not pa.types.is_null(column_type):
+        values = [None if value == '' else value for value in values]
+
+    return pa.array(values, type=column_type)
+
+
+def unique_column_names(header: list) -> list:
+    '''
+    Columnar formats need unique column names, repeated names get a numeric suffix
+    '''
+    seen = {}
+    names = []
+    for name in header:
+        name = str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name} ({seen[name]})"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def build_record_batch(header: list, rows: list, schema=None):
+    '''
+    Builds an Arrow record batch from a header and rows of extractor values.
+    Without a schema the column types are inferred from the rows
+    '''
+    require_pyarrow()
+    names = unique_column_names(header)
+    columns = [[row[i] if i < len(row) else None for row in rows] for i in range(len(names))]
+
+    if schema is None:
+        arrays = [build_column(column, known_column_type(name)) for column, name in zip(columns, names)]
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+
+    arrays = [build_column(column, field.type) for column, field in zip(columns, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def writable_type(data_type):
+    '''
+    Replaces null types with strings, including those nested in lists, structs and maps, e.g. list<null>
+    '''
+    if pa.types.is_null(data_type):
+        return pa.string()
+    if pa.types.is_list(data_type):
+        return pa.list_(data_type.value_field.with_type(writable_type(data_type.value_type)))
+    if pa.types.is_large_list(data_type):
+        return pa.large_list(data_type.value_field.with_type(writable_type(data_type.value_type)))
+    if pa.types.is_fixed_size_list(data_type):
+        return pa.list_(data_type.value_field.with_type(writable_type(data_type.value_type)), data_type.list_size)
+    if pa.types.is_map(data_type):
+        return pa.map_(writable_type(data_type.key_type), writable_type(data_type.item_type))
+    if pa.types.is_struct(data_type):
+        return pa.struct([field.with_type(writable_type(field.type)) for field in data_type])
+    return data_type
+
+
+def writable_schema(schema):
+    '''
+    Fixes the schema of a file from its first batch. Values that were all null in that batch are stored as strings,
+    whether they are whole columns or the items of a nested column
+    '''
+    return pa.schema([field.with_type(writable_type(field.type)) for field in schema], metadata=schema.metadata)
+
+
+def concat_tables(tables: list):
+    '''
+    Concatenates tables whose column types may differ where a column was all null in one of them
+    '''
+    try:
+        return pa.concat_tables(tables, promote_options='default')
+    except TypeError:  # pyarrow < 14
+        return pa.concat_tables(tables, promote=True)
@@ -0,0 +1,173 @@
+from urllib.parse import parse_qsl, urlsplit
+import math
+import re
+
+# GitHub's default page size, the extractors do not set per_page
+PAGE_SIZE = 30
+
+# Core requests a token may send per rate limit window
+QUOTA_PER_TOKEN = 5000
+QUOTA_WINDOW_SECONDS = 3600
+
+# pydriller traversal rate measured by the commit engine benchmarks
+COMMITS_PER_SECOND = 80
+
+# Typical latency of one GitHub API call, in seconds
+DEFAULT_LATENCY = 0.4
+
+# Bounds of the commits per PR estimated from the repository's commit and PR counts
+COMMITS_PER_PR_RANGE = (1, 10)
+
+ESTIMATE_HEADER = ['Owner', 'Repo', 'PRs', 'Commits', 'Branches', 'Issues', 'API Calls', 'Git Commits']
+
+# Extractors each public method runs. Memoized extractors are only paid for once per repository
+ENTRY_POINT_EXTRACTORS = {
+    'extract_data_commit_contributor': ['extract_commit_and_contributor_data'],
+    'extract_general_overview': ['extract_file_data_per_pr', 'get_linked_issue_from_pr',
+                                 'extract_issue_tracking_data', 'extract_branch_data'],
+    'extract_data_pr': ['extract_commit_data_per_pr', 'extract_file_data_per_pr', 'extract_pull_request_data'],
+    'extract_aggregate_metrics': ['extract_commit_data_per_pr', 'extract_file_data_per_pr', 'calculate_pr_quality',
+                                  'extract_pull_request_data']
+}
+
+LAST_PAGE_PATTERN = re.compile(r'<([^>]+)>;\s*rel="last"')
+
+
+def count_from_link(link_header: str, items_on_page: int, per_page: int = 1) -> int:
+    '''
+    Counts the items of a collection from the Link header of its first page: with per_page=1 the page number
+    of the last page is the number of items. Without a last link the first page holds them all
+    '''
+    match = LAST_PAGE_PATTERN.search(link_header or '')
+    if match is None:
+        return items_on_page
+    last_page = int(dict(parse_qsl(urlsplit(match.group(1)).query)).get('page', 1))
+    return last_page * per_page
+
+
+def list_pages(items: int) -> int:
+    # The PR and issue loops stop on the first empty page, so they fetch one page more than they need
+    return math.ceil(items / PAGE_SIZE) + 1
+
+
+class repoSize:
+    def __init__(self, owner: str, name: str, prs: int, commits: int, branches: int, issues: int,
+                 commits_per_pr: float = None, files_per_pr: float = None):
+        '''
+        Sizes of one repository, usually from probe_repository. issues counts the whole issue list,
+        which on GitHub includes the PRs. commits_per_pr defaults to the commit count over the PR count
+        within COMMITS_PER_PR_RANGE, files_per_pr to one page of files
+        '''
+        self.owner = owner
+        self.name = name
+        self.prs = prs
+        self.commits = commits
+        self.branches = branches
+        self.issues = issues
+        if commits_per_pr is None:
+            commits_per_pr = min(max(commits / prs, COMMITS_PER_PR_RANGE[0]), COMMITS_PER_PR_RANGE[1]) if prs else 0
+        self.commits_per_pr = commits_per_pr
+        self.files_per_pr = files_per_pr
+
+
+def extractor_calls(extractor: str, size: repoSize) -> dict:
+    '''
+    Returns the API calls an extractor makes on a repository of the given size, by endpoint
+    '''
+    prs = size.prs
+    commit_pages = math.ceil(size.commits_per_pr / PAGE_SIZE) if size.commits_per_pr else 1
+    file_pages = math.ceil(size.files_per_pr / PAGE_SIZE) if size.files_per_pr else 1
+
+    if extractor == 'extract_commit_data_per_pr':
+        return {'pull_list': list_pages(prs), 'pull_commits': prs * commit_pages,
+                'commit_detail': round(prs * size.commits_per_pr)}
+    if extractor == 'extract_file_data_per_pr':
+        return {'pull_list': list_pages(prs), 'pull_files': prs * file_pages}
+    if extractor == 'calculate_pr_quality':
+        return {'pull_list': list_pages(prs), 'pull_detail': prs, 'pull_reviews': prs, 'pull_comments': prs,
+                'pull_files': prs}
+    if extractor == 'get_linked_issue_from_pr':
+        return {'pull_list': list_pages(prs), 'issue_timeline': prs}
+    if extractor == 'extract_issue_tracking_data':
+        return {'issues': list_pages(size.issues)}
+    if extractor == 'extract_pull_request_data':
+        # Its commit and file data come from the memoized extractors
+        calls = {'pull_list': list_pages(prs)}
+        for name in ('extract_commit_data_per_pr', 'extract_file_data_per_pr'):
+            for endpoint, count in extractor_calls(name, size).items():
+                calls[endpoint] = calls.get(endpoint, 0) + count
+        return calls
+    # Branches are listed with git ls-remote and commits traversed with pydriller, neither uses the API
+    return {}
+
+
+def entry_point_calls(entry_point: str, size: repoSize) -> dict:
+    '''
+    Returns the API calls a public method makes on a repository, by endpoint. Extractors another one
+    already ran (e.g. the commit data extract_pull_request_data reuses) are counted once
+    '''
+    if entry_point not in ENTRY_POINT_EXTRACTORS:
+        raise ValueError(f"Unknown entry point: {entry_point}. Choose one of {list(ENTRY_POINT_EXTRACTORS)}")
+
+    extractors = ENTRY_POINT_EXTRACTORS[entry_point]
+    calls = {}
+    for extractor in extractors:
+        extractor_total = extractor_calls(extractor, size)
+        if extractor == 'extract_pull_request_data':
+            # Only its own PR list pages when the memoized extractors it calls are already counted
+            reused = [name for name in ('extract_commit_data_per_pr', 'extract_file_data_per_pr') if name in extractors]
+            for name in reused:
+                for endpoint, count in extractor_calls(name, size).items():
+                    extractor_total[endpoint] -= count
+        for endpoint, count in extractor_total.items():
+            calls[endpoint] = calls.get(endpoint, 0) + count
+    return calls
+
+
+def git_commits(entry_point: str, size: repoSize) -> int:
+    '''
+    Returns the commits pydriller traverses for a public method on a repository
+    '''
+    return size.commits if 'extract_commit_and_contributor_data' in ENTRY_POINT_EXTRACTORS[entry_point] else 0
+
+
+def estimate_duration(calls: int, commits: int, tokens: int, concurrency: int, latency: float = DEFAULT_LATENCY,
+                      first_window_quota: int = None) -> dict:
+    '''
+    Estimates how long calls API calls and a traversal of commits take. Calls are bounded by latency over
+    concurrency and by the quota: each window serves QUOTA_PER_TOKEN calls per token, the first one only
+    first_window_quota when the tokens have already been used. Git traversal runs after the API calls
+    '''
+    capacity = QUOTA_PER_TOKEN * max(tokens, 1)
+    first_capacity = capacity if first_window_quota is None else min(first_window_quota, capacity)
+    windows = 1 if calls <= first_capacity else 1 + math.ceil((calls - first_capacity) / capacity)
+
+    request_seconds = calls * latency / max(concurrency, 1)
+    quota_seconds = (windows - 1) * QUOTA_WINDOW_SECONDS
+    git_seconds = commits / COMMITS_PER_SECOND
+    return {
+        'API Calls': calls,
+        'Quota Windows': windows,
+        'Request Seconds': round(request_seconds, 1),
+        'Quota Wait Seconds': quota_seconds,
+        'Git Seconds': round(git_seconds, 1),
+        'Total Hours': round((max(request_seconds, quota_seconds) + git_seconds) / 3600, 2),
+        'Bound By': 'quota' if quota_seconds > request_seconds else 'latency'
+    }
+
+
+def suggest_resources(calls: int, commits: int, target_hours: float, max_concurrency: int,
+                      latency: float = DEFAULT_LATENCY) -> dict:
+    '''
+    Returns the tokens and concurrency that would finish calls API calls and a traversal of commits within
+    target_hours, or None for the concurrency when no level up to max_concurrency is enough
+    '''
+    api_seconds = target_hours * 3600 - commits / COMMITS_PER_SECOND
+    if api_seconds <= 0:
+        return {'Tokens': None, 'Concurrency': None}
+
+    # The first window opens right away and every later one that opens before the deadline adds a full quota
+    windows = math.floor(api_seconds / QUOTA_WINDOW_SECONDS) + 1
+    tokens = max(1, math.ceil(calls / (QUOTA_PER_TOKEN * windows)))
+    concurrency = max(1, math.ceil(calls * latency / api_seconds))
+    return {'Tokens': tokens, 'Concurrency': concurrency if concurrency <= max_concurrency else None}
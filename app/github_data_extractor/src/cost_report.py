@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+from .metric_planner import METRIC_REGISTRY, PR_ENDPOINTS, REPO_ENDPOINTS, column_endpoints
+
+COST_REPORT_HEADER = ['Column', 'Endpoints', 'Calls Needed', 'Attributed Calls', 'Marginal Calls']
+
+QUOTA_REPORT_HEADER = ['Token', 'Requests', 'Remaining', 'Limit', 'Resets At']
+
+ENDPOINT_ORDER = PR_ENDPOINTS + list(REPO_ENDPOINTS)
+
+
+def column_costs(endpoint_calls: dict, columns: list) -> list:
+    '''
+    Attributes the API calls of each endpoint to the given columns that need it.
+    Calls Needed counts every call a column depends on, Attributed Calls splits each call evenly between the columns
+    sharing it, so they add up to the calls the columns need, and Marginal Calls are the calls no other column needs,
+    i.e. what dropping the column would save. Calls no column needs are left out, see overhead_calls.
+    Returns the header followed by one row per column, most expensive first
+    '''
+    needs = {column: column_endpoints(column) for column in columns if column in METRIC_REGISTRY}
+    users = {}
+    for column, endpoints in needs.items():
+        for endpoint in endpoints:
+            users.setdefault(endpoint, []).append(column)
+
+    rows = []
+    for column, endpoints in needs.items():
+        rows.append([
+            column,
+            ','.join(endpoint for endpoint in ENDPOINT_ORDER if endpoint in endpoints),
+            sum(endpoint_calls.get(endpoint, 0) for endpoint in endpoints),
+            round(sum(endpoint_calls.get(endpoint, 0) / len(users[endpoint]) for endpoint in endpoints), 2),
+            sum(endpoint_calls.get(endpoint, 0) for endpoint in endpoints if len(users[endpoint]) == 1)
+        ])
+
+    rows.sort(key=lambda row: (-row[3], row[0]))
+    return [COST_REPORT_HEADER] + rows
+
+
+def overhead_calls(endpoint_calls: dict, columns: list) -> dict:
+    '''
+    Returns the API calls of the endpoints none of the given columns needs, by endpoint
+    '''
+    needed = set()
+    for column in columns:
+        if column in METRIC_REGISTRY:
+            needed |= column_endpoints(column)
+    return {endpoint: calls for endpoint, calls in endpoint_calls.items() if endpoint not in needed and calls}
+
+
+def quota_rows(token_quota: dict) -> list:
+    '''
+    Returns the header followed by the requests sent with each token and its last seen rate limit window
+    '''
+    rows = [QUOTA_REPORT_HEADER]
+    for token, quota in sorted(token_quota.items()):
+        resets_at = (datetime.fromtimestamp(quota['Reset'], timezone.utc).isoformat()
+                     if quota['Reset'] is not None else None)
+        rows.append([token, quota['Requests'], quota['Remaining'], quota['Limit'], resets_at])
+    return rows
@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+import json
+import os
+import threading
+import uuid
+
+from .sinks import parquetSink
+
+MANIFEST_NAME = '_manifest.json'
+STAGING_NAME = '.staging'
+
+# One lock per dataset root, the manifest is rewritten as a whole
+manifest_locks = {}
+manifest_locks_guard = threading.Lock()
+
+
+def partition_path(owner: str, repo: str, family: str) -> str:
+    '''
+    Hive style partition directory, so pyarrow.dataset(root, partitioning='hive') can read the dataset directly
+    '''
+    return os.path.join(f"owner={owner}", f"repo={repo}", f"family={family}")
+
+
+def read_manifest(root: str) -> dict:
+    '''
+    Returns the manifest of a dataset, listing every published partition with its row count and columns
+    '''
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {'partitions': []}
+
+    with open(manifest_path, 'r') as manifest_file:
+        return json.load(manifest_file)
+
+
+def select_partitions(root: str, owner: str = None, repo: str = None, family: str = None) -> list:
+    '''
+    Prunes partitions using only the manifest and returns the data files to read, without opening any of them
+    '''
+    files = []
+    for partition in read_manifest(root)['partitions']:
+        if owner is not None and partition['owner'] != owner:
+            continue
+        if repo is not None and partition['repo'] != repo:
+            continue
+        if family is not None and partition['family'] != family:
+            continue
+        files.extend(os.path.join(root, partition['path'], name) for name in partition['files'])
+    return files
+
+
+class datasetPartitionSink(parquetSink):
+    staged = False  # Parts are staged under .staging and published through the manifest
+    def __init__(self, root: str, owner: str, repo: str, family: str, compression: str = None,
+                 row_group_size: int = 10000):
+        '''
+        Writes one owner/repo/family partition into a staging file and publishes it atomically on close,
+        replacing the previous version of that partition in the manifest
+        '''
+        self.root = root
+        self.owner = owner
+        self.repo = repo
+        self.family = family
+        self.partition = partition_path(owner, repo, family)
+        self.part_name = f"part-{uuid.uuid4().hex}.parquet"
+
+        staging_dir = os.path.join(root, STAGING_NAME)
+        os.makedirs(staging_dir, exist_ok=True)
+        super().__init__(os.path.join(staging_dir, self.part_name), compression=compression,
+                         row_group_size=row_group_size)
+
+    def close(self):
+        if self.header is None or not (self.rows_written or self.buffer):
+            # Nothing was written, so the published partition is kept and only the staging file is removed
+            self.abort()
+            return
+        super().close()
+        self.publish()
+
+    def abort(self):
+        # A failed extraction never replaces the published partition
+        self.finish()
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def publish(self):
+        target_dir = os.path.join(self.root, self.partition)
+        os.makedirs(target_dir, exist_ok=True)
+
+        with manifest_locks_guard:
+            lock = manifest_locks.setdefault(os.path.abspath(self.root), threading.Lock())
+
+        with lock:
+            # The new part is moved in under a fresh name and only becomes visible once the manifest points at it
+            os.replace(self.file_path, os.path.join(target_dir, self.part_name))
+
+            manifest = read_manifest(self.root)
+            retired_files = [
+                name for partition in manifest['partitions'] if partition['path'] == self.partition
+                for name in partition['files']
+            ]
+            manifest['partitions'] = [
+                partition for partition in manifest['partitions'] if partition['path'] != self.partition
+            ]
+            manifest['partitions'].append({
+                'owner': self.owner,
+                'repo': self.repo,
+                'family': self.family,
+                'path': self.partition,
+                'files': [self.part_name],
+                'rows': self.rows_written,
+                'columns': [field.name for field in self.schema],
+                'written_at': datetime.now(timezone.utc).isoformat()
+            })
+            write_manifest(self.root, manifest)
+
+            for name in retired_files:
+                retired_path = os.path.join(target_dir, name)
+                if os.path.exists(retired_path):
+                    os.remove(retired_path)
+
+
+def write_manifest(root: str, manifest: dict):
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+        manifest_file.flush()
+        os.fsync(manifest_file.fileno())
+
+    os.replace(temp_path, manifest_path)
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import numpy as np
+
+LONG_OPEN_SECONDS = 30 * 24 * 3600
+
+
+def to_datetime64(values: list):
+    '''
+    Parses GitHub timestamps such as 2020-01-01T00:00:00Z into a datetime64 array in one pass, missing values become NaT
+    '''
+    return np.array([value.rstrip('Z') if value else 'NaT' for value in values], dtype='datetime64[s]')
+
+
+def to_numbers(values: list):
+    # Counts stay integers, so sums of them are still written as integers
+    array = np.array([value if value is not None else 0 for value in values])
+    return array if array.dtype.kind in 'if' else array.astype(np.float64)
+
+
+def rate(values, files_changed):
+    # Per changed file, 0 when no file changed
+    return np.divide(values, files_changed, out=np.zeros(len(values)), where=files_changed > 0)
+
+
+def hours_since(created_at):
+    # Measured from the current microsecond, like calculate_age, so ages keep their full precision
+    now = np.datetime64(datetime.utcnow(), 'us')
+    return (now - created_at) / np.timedelta64(1, 'h')
+
+
+def merge_seconds(created_at, merged_at):
+    seconds = (merged_at - created_at) / np.timedelta64(1, 's')
+    # Unmerged PRs take 0, as before
+    return np.where(np.isnat(created_at) | np.isnat(merged_at), 0.0, seconds)
+
+
+class derivedColumn:
+    def __init__(self, column: str, inputs: list, compute, timestamps: list = ()):
+        '''
+        Declares a column computed from other columns of the same rows. compute receives one NumPy array per input,
+        inputs named in timestamps are parsed as datetime64 and the others as float64
+        '''
+        self.column = column
+        self.inputs = inputs
+        self.compute = compute
+        self.timestamps = set(timestamps)
+
+
+# Derived columns are computed in this order, so a column may use the ones declared before it
+DERIVED_COLUMNS = {spec.column: spec for spec in [
+    derivedColumn('Rate of Commits', ['Total Commits', 'Total Files Changed'], rate),
+    derivedColumn('Rate of Lines Changes', ['Total Lines Changed', 'Total Files Changed'], rate),
+    derivedColumn('Rate of Contributors', ['Total Contributors', 'Total Files Changed'], rate),
+    derivedColumn('Rate of Comment Count', ['Total Comment Count', 'Total Files Changed'], rate),
+    derivedColumn('PR age', ['created_at'], hours_since, timestamps=['created_at']),
+    derivedColumn('Merge Time (seconds)', ['created_at', 'merged_at'], merge_seconds,
+                  timestamps=['created_at', 'merged_at']),
+    derivedColumn('Long-Open PR', ['Merge Time (seconds)'],
+                  lambda merge_time: (merge_time > LONG_OPEN_SECONDS).astype(np.int64)),
+    derivedColumn('Code Churn', ['additions', 'deletions'], lambda additions, deletions: additions + deletions)
+]}
+
+
+def required_columns(columns: list) -> set:
+    '''
+    Returns the named derived columns and the derived columns they are computed from
+    '''
+    required = set()
+    pending = [column for column in columns if column in DERIVED_COLUMNS]
+    while pending:
+        column = pending.pop()
+        if column not in required:
+            required.add(column)
+            pending.extend(name for name in DERIVED_COLUMNS[column].inputs if name in DERIVED_COLUMNS)
+    return required
+
+
+def derived_inputs(columns: list) -> list:
+    '''
+    Returns the columns, other than derived ones, that the named derived columns are computed from
+    '''
+    inputs = []
+    for column in [column for column in DERIVED_COLUMNS if column in required_columns(columns)]:
+        inputs.extend(name for name in DERIVED_COLUMNS[column].inputs
+                      if name not in DERIVED_COLUMNS and name not in inputs)
+    return inputs
+
+
+def derive_columns(header: list, rows: list, columns: list) -> dict:
+    '''
+    Computes the named derived columns for a batch of rows at once, along with the derived columns they use.
+    Returns the values of each named column as a Python list, in row order
+    '''
+    inputs = {}
+    derived = {}
+    required = required_columns(columns)
+    for column in [column for column in DERIVED_COLUMNS if column in required]:
+        spec = DERIVED_COLUMNS[column]
+        arrays = []
+        for name in spec.inputs:
+            if name in derived:
+                arrays.append(derived[name])
+                continue
+            if name not in inputs:
+                values = [row[header.index(name)] for row in rows]
+                inputs[name] = to_datetime64(values) if name in spec.timestamps else to_numbers(values)
+            arrays.append(inputs[name])
+        derived[column] = spec.compute(*arrays)
+
+    unknown_columns = [column for column in columns if column not in derived]
+    if unknown_columns:
+        raise ValueError(f"Unknown derived columns: {unknown_columns}")
+
+    return {column: derived[column].tolist() for column in columns}
@@ -0,0 +1,205 @@
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import bisect
+import os
+import threading
+import time
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Upper bounds in seconds of the request latency and stage duration histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0, 1800.0)
+
+# Extraction stage each endpoint's requests belong to
+ENDPOINT_STAGES = {
+    'pull_list': 'list_pages',
+    'pull_detail': 'pr_detail',
+    'pull_commits': 'commits',
+    'commit_detail': 'commits',
+    'pull_files': 'files',
+    'pull_reviews': 'reviews',
+    'pull_comments': 'reviews',
+    'issue_timeline': 'timelines',
+    'issues': 'issues',
+    'rate_limit': 'rate_limit'
+}
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class counterMetric:
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values = {}
+
+    def inc(self, labels: tuple, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def exposition(self) -> list:
+        lines = [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.help_text}"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}_total{format_labels(self.label_names, labels)} {format_number(value)}")
+        return lines
+
+
+class histogramMetric:
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # {labels: [count per bucket..., count above the last bucket, sum]}
+        self.values = {}
+
+    def observe(self, labels: tuple, value: float):
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def exposition(self) -> list:
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.help_text}"]
+        for labels, counts in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                bucket_labels = format_labels(self.label_names, labels, f'le="{format_number(float(bound))}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {format_number(counts[-1])}")
+        return lines
+
+
+class metricsRegistry:
+    def __init__(self, prefix: str = 'github_extractor'):
+        '''
+        Counters and histograms of one extraction: requests by endpoint and status, response bytes, latency,
+        retries, cache hits and the time spent in each stage. Exported in the OpenMetrics text format
+        '''
+        self.lock = threading.Lock()
+        self.requests = counterMetric(f"{prefix}_requests", 'GitHub API responses by endpoint and status code',
+                                      ('endpoint', 'status'))
+        self.response_bytes = counterMetric(f"{prefix}_response_bytes", 'Bytes of GitHub API response bodies',
+                                            ('endpoint',))
+        self.request_latency = histogramMetric(f"{prefix}_request_duration_seconds",
+                                               'Latency of GitHub API calls, retries included', ('endpoint',),
+                                               LATENCY_BUCKETS)
+        self.retries = counterMetric(f"{prefix}_retries", 'Requests sent again after a secondary rate limit',
+                                     ('endpoint',))
+        self.cache_hits = counterMetric(f"{prefix}_cache_hits",
+                                        'Requests served by an identical call in flight (coalesced) '
+                                        'and extractor results served from the cache (extractor)', ('cache', 'name'))
+        self.stage_duration = histogramMetric(f"{prefix}_stage_duration_seconds", 'Time spent in each extraction stage',
+                                              ('stage',), STAGE_BUCKETS)
+        self.metrics = [self.requests, self.response_bytes, self.request_latency, self.retries, self.cache_hits,
+                        self.stage_duration]
+        self.server = None
+
+    def observe_request(self, endpoint: str, status, size: int, seconds: float):
+        endpoint = endpoint or 'other'
+        with self.lock:
+            self.requests.inc((endpoint, str(status)))
+            self.response_bytes.inc((endpoint,), size)
+            self.request_latency.observe((endpoint,), seconds)
+
+    def count_retry(self, endpoint: str):
+        with self.lock:
+            self.retries.inc((endpoint or 'other',))
+
+    def count_cache_hit(self, cache: str, name: str):
+        with self.lock:
+            self.cache_hits.inc((cache, name or 'other'))
+
+    def endpoint_calls(self) -> dict:
+        '''
+        Returns the number of API calls sent to each endpoint, whatever their status
+        '''
+        calls = {}
+        with self.lock:
+            for (endpoint, status), count in self.requests.values.items():
+                calls[endpoint] = calls.get(endpoint, 0) + count
+        return calls
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self.lock:
+            self.stage_duration.observe((stage,), seconds)
+
+    @contextmanager
+    def stage(self, stage: str):
+        '''
+        Times the enclosed block as one run of the stage
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    def exposition(self) -> str:
+        with self.lock:
+            lines = [line for metric in self.metrics for line in metric.exposition()]
+        return '\n'.join(lines + ['# EOF']) + '\n'
+
+    def write(self, file_path: str):
+        '''
+        Atomically writes the current values to an OpenMetrics text file, e.g. for a node exporter textfile collector
+        '''
+        folder_path = os.path.dirname(file_path)
+        if folder_path and not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+
+        temp_path = file_path + '.tmp'
+        with open(temp_path, 'w') as metrics_file:
+            metrics_file.write(self.exposition())
+        os.replace(temp_path, file_path)
+
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        '''
+        Serves the current values at http://host:port/metrics from a daemon thread
+        '''
+        registry = self
+
+        class handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address[1]
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,351 @@
+import logging
+
+from .derived import DERIVED_COLUMNS, derive_columns, derived_inputs
+from .pr_rows import (COMMIT_TOTAL_COLUMNS, FILE_TOTAL_COLUMNS, PR_LIST_FIELDS, adds_tests, commit_totals, file_totals,
+                      is_revert, participant_count, review_comment_count)
+
+logger = logging.getLogger(__name__)
+
+
+# Per-PR endpoints, in the order they are fetched
+PR_ENDPOINTS = [
+    'pull_list',
+    'pull_detail',
+    'pull_reviews',
+    'pull_comments',
+    'pull_files',
+    'pull_commits',
+    'commit_detail',
+    'issue_timeline'
+]
+
+# Repository level endpoints and the (memoized) extractor that serves each of them
+REPO_ENDPOINTS = {
+    'issues': 'extract_issue_tracking_data',
+    'branches': 'extract_branch_data',
+    'git_history': 'extract_commit_and_contributor_data'
+}
+
+# Endpoints that can only be fetched once another one has been fetched
+ENDPOINT_DEPENDENCIES = {
+    'pull_detail': ['pull_list'],
+    'pull_reviews': ['pull_list'],
+    'pull_comments': ['pull_list'],
+    'pull_files': ['pull_list'],
+    'pull_commits': ['pull_list'],
+    'commit_detail': ['pull_commits'],
+    'issue_timeline': ['pull_list']
+}
+
+
+class metricSpec:
+    def __init__(self, column: str, endpoints: list, compute=None):
+        '''
+        Declares an output column, the endpoints it needs and how to compute it.
+        compute receives a prContext for per-PR columns. Columns in DERIVED_COLUMNS are computed for a page of PRs
+        at once from their inputs instead, and repository level columns are read from their extractor
+        '''
+        self.column = column
+        self.endpoints = endpoints
+        self.compute = compute
+
+    @property
+    def is_repo_level(self) -> bool:
+        return all(endpoint in REPO_ENDPOINTS for endpoint in self.endpoints)
+
+
+class prContext:
+    def __init__(self, pr: dict, extraction):
+        '''
+        Holds every payload fetched for a single PR, so each endpoint is requested once no matter how many columns use it
+        '''
+        self.pr = pr
+        self.extraction = extraction
+        self.detail = None
+        self.reviews = None
+        self.comments = None
+        self.files = None
+        self.commits = None
+        self.commit_details = None
+        self.linked_issue = None
+        self._file_totals = None
+        self._commit_totals = None
+
+    def file_total(self, column: str):
+        '''
+        Summarises the PR files once for all the file columns
+        '''
+        if self._file_totals is None:
+            self._file_totals = file_totals(self.files or [])
+        return self._file_totals[FILE_TOTAL_COLUMNS.index(column)]
+
+    def commit_total(self, column: str):
+        '''
+        Summarises the PR commits and their details once for all the commit columns
+        '''
+        if self._commit_totals is None:
+            self._commit_totals = commit_totals(self.commits or [], self.commit_details or [])
+        return self._commit_totals[COMMIT_TOTAL_COLUMNS.index(column)]
+
+
+# Inputs of derived columns that are not output columns themselves
+DERIVED_INPUT_VALUES = {
+    'additions': lambda ctx: ctx.detail.get('additions', 0) if ctx.detail else 0,
+    'deletions': lambda ctx: ctx.detail.get('deletions', 0) if ctx.detail else 0
+}
+
+
+# Output columns use the same names as the CSVs written by the entry points.
+# Where the commit and file extractors share a column name, the commit based value is used, as in the PR CSV
+METRIC_REGISTRY = {spec.column: spec for spec in [
+    # PR list
+    *[metricSpec(column, ['pull_list'], lambda ctx, read=read: read(ctx.pr)) for column, read in PR_LIST_FIELDS.items()],
+    metricSpec('PR age', ['pull_list']),
+
+    # PR commits
+    metricSpec('Total Commits', ['pull_commits'], lambda ctx: ctx.commit_total('Total Commits')),
+    metricSpec('Total Contributors', ['pull_commits'], lambda ctx: ctx.commit_total('Total Contributors')),
+    metricSpec('Total Comment Count', ['pull_commits'], lambda ctx: ctx.commit_total('Total Comment Count')),
+    metricSpec('Total Lines Changed', ['commit_detail'], lambda ctx: ctx.commit_total('Total Lines Changed')),
+    metricSpec('Total Lines Added', ['commit_detail'], lambda ctx: ctx.commit_total('Total Lines Added')),
+    metricSpec('Total Lines Deleted', ['commit_detail'], lambda ctx: ctx.commit_total('Total Lines Deleted')),
+    metricSpec('Total Files Changed', ['commit_detail'], lambda ctx: ctx.commit_total('Total Files Changed')),
+    metricSpec('Rate of Commits', ['commit_detail']),
+    metricSpec('Rate of Lines Changes', ['commit_detail']),
+    metricSpec('Rate of Contributors', ['commit_detail']),
+    metricSpec('Rate of Comment Count', ['commit_detail']),
+
+    # PR files
+    metricSpec('Total Changes', ['pull_files'], lambda ctx: ctx.file_total('Total Changes')),
+    metricSpec('Total Added Files', ['pull_files'], lambda ctx: ctx.file_total('Total Added Files')),
+    metricSpec('Total Modified Files', ['pull_files'], lambda ctx: ctx.file_total('Total Modified Files')),
+    metricSpec('Total Removed Files', ['pull_files'], lambda ctx: ctx.file_total('Total Removed Files')),
+    metricSpec('Total Renamed Files', ['pull_files'], lambda ctx: ctx.file_total('Total Renamed Files')),
+    metricSpec('Total Copied Files', ['pull_files'], lambda ctx: ctx.file_total('Total Copied Files')),
+    metricSpec('Test Coverage Additions', ['pull_files'], lambda ctx: adds_tests(ctx.files or [])),
+
+    # PR quality
+    metricSpec('Total Reviews', ['pull_reviews'], lambda ctx: len(ctx.reviews or [])),
+    metricSpec('Total Review Comments', ['pull_reviews'], lambda ctx: review_comment_count(ctx.reviews or [])),
+    metricSpec('Merge Time (seconds)', ['pull_list']),
+    metricSpec('Long-Open PR', ['pull_list']),
+    metricSpec('Participants', ['pull_comments'], lambda ctx: participant_count(ctx.comments or [])),
+    metricSpec('Reverted PR', ['pull_list'], lambda ctx: is_revert(ctx.pr)),
+    metricSpec('Code Churn', ['pull_detail']),
+
+    # Linked issues
+    metricSpec('Linked Issue Number', ['issue_timeline'],
+               lambda ctx: ctx.linked_issue['number'] if ctx.linked_issue else None),
+    metricSpec('Linked Issue Title', ['issue_timeline'],
+               lambda ctx: ctx.linked_issue.get('title', 'No Title') if ctx.linked_issue else None),
+
+    # Repository level
+    metricSpec('Open Issues', ['issues']),
+    metricSpec('Open Issues Ratio', ['issues']),
+    metricSpec('Closed Issues Ratio', ['issues']),
+    metricSpec('Updated Issues Ratio', ['issues']),
+    metricSpec('Issue Categories', ['issues']),
+    metricSpec('Number of Current Branches', ['branches']),
+    metricSpec('Current Branch Names', ['branches']),
+    metricSpec('Project Age', ['git_history']),
+    metricSpec('Project Size', ['git_history']),
+    metricSpec('Churn Rate Over Time Based on Time', ['git_history']),
+    metricSpec('Churn Rate Over Time Based on Commits', ['git_history']),
+    metricSpec('Total Number of Commits', ['git_history']),
+    metricSpec('Commit Frequency', ['git_history']),
+    metricSpec('Average Commit Size', ['git_history']),
+    metricSpec('Average Code Complexity', ['git_history']),
+    metricSpec('Total Number of Contributors', ['git_history']),
+    metricSpec('Top Contributors', ['git_history']),
+    metricSpec('Detailed Contributor Activity', ['git_history'])
+]}
+
+
+def column_endpoints(column: str) -> set:
+    '''
+    Returns every endpoint a column needs, the ones its endpoints depend on included
+    '''
+    needed = set()
+    pending = list(METRIC_REGISTRY[column].endpoints)
+    while pending:
+        endpoint = pending.pop()
+        if endpoint not in needed:
+            needed.add(endpoint)
+            pending.extend(ENDPOINT_DEPENDENCIES.get(endpoint, []))
+    return needed
+
+
+class metricPlanner:
+    def __init__(self, extraction):
+        '''
+        Plans and runs the minimal set of endpoint fetches needed for a chosen set of output columns
+        '''
+        self.extraction = extraction
+
+    def plan(self, columns: list) -> list:
+        '''
+        Returns the endpoints needed for the columns, dependencies included, in fetch order
+        '''
+        unknown_columns = [column for column in columns if column not in METRIC_REGISTRY]
+        if unknown_columns:
+            raise ValueError(f"Unknown metric columns: {unknown_columns}")
+
+        needed = set().union(*(column_endpoints(column) for column in columns))
+        return [endpoint for endpoint in PR_ENDPOINTS + list(REPO_ENDPOINTS) if endpoint in needed]
+
+    def fetch_pages(self, url: str, headers: dict, endpoint: str) -> list:
+        '''
+        Fetches every page of a paginated endpoint, 100 items at a time
+        '''
+        items = []
+        page_no = 0
+        while True:
+            page_no += 1
+            response = self.extraction.api_get(f"{url}?per_page=100&page={page_no}", headers, endpoint)
+            if response.status_code != 200:
+                break
+
+            page = response.json()
+            if not page:
+                break
+
+            items.extend(page)
+            if len(page) < 100:
+                break
+
+        return items
+
+    def fetch_linked_issue(self, url: str, headers: dict):
+        '''
+        Walks the PR timeline until the first cross-referenced issue
+        '''
+        timeline_headers = headers.copy()
+        timeline_headers['Accept'] = 'application/vnd.github.mockingbird-preview+json'
+
+        page_no = 0
+        while True:
+            page_no += 1
+            response = self.extraction.api_get(f"{url}?per_page=100&page={page_no}", timeline_headers,
+                                                 'issue_timeline')
+            if response.status_code != 200:
+                return None
+
+            events = response.json()
+            if not events:
+                return None
+
+            for event in events:
+                if event.get('event') == 'cross-referenced':
+                    issue = event.get('source', {}).get('issue')
+                    if issue:
+                        return issue
+
+            if len(events) < 100:
+                return None
+
+    def fetch_pr_context(self, repo_info, pr: dict, endpoints: list, headers: dict) -> prContext:
+        '''
+        Fetches the planned per-PR endpoints once each
+        '''
+        context = prContext(pr, self.extraction)
+        repo_url = f"{self.extraction.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}"
+        pr_url = f"{repo_url}/pulls/{pr['number']}"
+
+        if 'pull_detail' in endpoints:
+            response = self.extraction.api_get(pr_url, headers, 'pull_detail')
+            context.detail = response.json() if response.status_code == 200 else None
+        if 'pull_reviews' in endpoints:
+            context.reviews = self.fetch_pages(f"{pr_url}/reviews", headers, 'pull_reviews')
+        if 'pull_comments' in endpoints:
+            context.comments = self.fetch_pages(f"{pr_url}/comments", headers, 'pull_comments')
+        if 'pull_files' in endpoints:
+            context.files = self.fetch_pages(f"{pr_url}/files", headers, 'pull_files')
+        if 'pull_commits' in endpoints:
+            context.commits = self.fetch_pages(f"{pr_url}/commits", headers, 'pull_commits')
+        if 'commit_detail' in endpoints:
+            context.commit_details = []
+            for commit in context.commits:
+                response = self.extraction.api_get(f"{repo_url}/commits/{commit['sha']}", headers, 'commit_detail')
+                if response.status_code == 200:
+                    context.commit_details.append(response.json())
+        if 'issue_timeline' in endpoints:
+            context.linked_issue = self.fetch_linked_issue(f"{repo_url}/issues/{pr['number']}/timeline", headers)
+
+        return context
+
+    def input_value(self, context: prContext, column: str):
+        # Inputs of derived columns are output columns themselves, or values of DERIVED_INPUT_VALUES
+        if column in DERIVED_INPUT_VALUES:
+            return DERIVED_INPUT_VALUES[column](context)
+        return METRIC_REGISTRY[column].compute(context)
+
+    def run(self, repo_info, columns: list) -> list:
+        '''
+        Computes the requested columns for a repository, fetching each planned endpoint once.
+        Returns the header row followed by one row per PR, or a single row when only repository level columns are asked for
+        '''
+        endpoints = self.plan(columns)
+        pr_columns = [column for column in columns if not METRIC_REGISTRY[column].is_repo_level]
+        derived_columns = [column for column in pr_columns if column in DERIVED_COLUMNS]
+        input_columns = derived_inputs(derived_columns)
+        repo_columns = [column for column in columns if METRIC_REGISTRY[column].is_repo_level]
+
+        # Repository level values come from the memoized extractors
+        repo_values = []
+        for column in repo_columns:
+            extractor_name = REPO_ENDPOINTS[METRIC_REGISTRY[column].endpoints[0]]
+            param_names, extracted_data = getattr(self.extraction, extractor_name)(repo_info)[:2]
+            repo_values.append(extracted_data[param_names.index(column)] if column in param_names else None)
+
+        if not pr_columns:
+            return [repo_columns, repo_values]
+
+        headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
+        headers['Accept'] = 'application/vnd.github.v3+json'
+
+        all_rows = [['PR Number'] + pr_columns + repo_columns]
+        list_url = f"{self.extraction.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls"
+
+        page_no = 0
+        while True:
+            page_no += 1
+            response = self.extraction.api_get(
+                f"{list_url}?state=all&sort=created&direction=asc&per_page=100&page={page_no}", headers, 'pull_list')
+            if response.status_code != 200:
+                logger.warning(f"Failed to fetch PRs. Status code: {response.status_code}")
+                break
+
+            prs = response.json()
+            if not prs:
+                break
+            self.extraction.progress.observe_page(repo_info, 'extract_metrics', response, page_no, len(prs))
+
+            contexts = []
+            input_rows = []
+            for pr in prs:
+                try:
+                    self.extraction.progress.advance(repo_info, 'extract_metrics', pr['number'])
+                    context = self.fetch_pr_context(repo_info, pr, endpoints, headers)
+                    input_rows.append([self.input_value(context, column) for column in input_columns])
+                    contexts.append(context)
+
+                except Exception as e:
+                    logger.warning(f"Error computing metrics for PR {pr['number']}: {e}")
+
+            # Derived columns are computed for the whole page at once
+            derived = derive_columns(input_columns, input_rows, derived_columns)
+            for index, context in enumerate(contexts):
+                try:
+                    row = [context.pr['number']] + [derived[column][index] if column in derived
+                                                    else METRIC_REGISTRY[column].compute(context)
+                                                    for column in pr_columns]
+                    all_rows.append(row + repo_values)
+
+                except Exception as e:
+                    logger.warning(f"Error computing metrics for PR {context.pr['number']}: {e}")
+
+            if len(prs) < 100:
+                break
+
+        self.extraction.progress.finish(repo_info, 'extract_metrics', len(all_rows) - 1)
+        return all_rows
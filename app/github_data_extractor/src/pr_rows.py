@@ -0,0 +1,104 @@
+from .records import intern_text
+
+
+def _milestone_field(pr: dict, field: str):
+    return pr['milestone'][field] if pr['milestone'] else 0
+
+
+# Values read straight from a PR list item, in the order of the PR CSV. PR age is derived from created_at
+PR_LIST_FIELDS = {
+    'PR State': lambda pr: intern_text(pr['state']),
+    'created_at': lambda pr: pr['created_at'],
+    'updated_at': lambda pr: pr['updated_at'],
+    'closed_at': lambda pr: pr['closed_at'],
+    'merged_at': lambda pr: pr['merged_at'],
+    'Number of Labels': lambda pr: len(pr['labels']),
+    'Label Names': lambda pr: intern_text(",".join(label['name'] for label in pr['labels'])),
+    'Milestone Open Issues': lambda pr: _milestone_field(pr, 'open_issues'),
+    'Milestone Closed Issues': lambda pr: _milestone_field(pr, 'closed_issues'),
+    'Head Repo Open Issues Count': lambda pr: pr['head']['repo']['open_issues_count'],
+    'Head Repo Open Issues': lambda pr: pr['head']['repo']['open_issues'],
+    'Base Repo Open Issues Count': lambda pr: pr['base']['repo']['open_issues_count'],
+    'Base Repo Open Issues': lambda pr: pr['base']['repo']['open_issues'],
+    'Number of Assignees': lambda pr: len(pr['assignees']),
+    'Number of Requested Reviewers': lambda pr: len(pr['requested_reviewers']),
+    'Number of Requested Teams': lambda pr: len(pr['requested_teams'])
+}
+
+# Totals of a PR's commits, in the order of the commit CSV. The rates are derived from them
+COMMIT_TOTAL_COLUMNS = [
+    'Total Commits',
+    'Total Lines Changed',
+    'Total Lines Added',
+    'Total Lines Deleted',
+    'Total Contributors',
+    'Total Comment Count',
+    'Total Files Changed'
+]
+
+# Totals of a PR's files, in the order of the file CSV
+FILE_TOTAL_COLUMNS = [
+    'Total Files Changed',
+    'Total Lines Added',
+    'Total Lines Deleted',
+    'Total Changes',
+    'Total Added Files',
+    'Total Modified Files',
+    'Total Removed Files',
+    'Total Renamed Files',
+    'Total Copied Files'
+]
+
+FILE_STATUSES = ['added', 'modified', 'removed', 'renamed', 'copied']
+
+
+def pr_list_values(pr: dict) -> list:
+    return [read(pr) for read in PR_LIST_FIELDS.values()]
+
+
+def commit_totals(commits: list, commit_details: list) -> list:
+    '''
+    Sums a PR's commits in COMMIT_TOTAL_COLUMNS order. Line and file counts come from commit_details,
+    which holds the details of the commits that could be fetched
+    '''
+    contributors = set(commit['author']['login'] for commit in commits
+                       if commit.get('author') and 'login' in commit['author'])
+    comment_count = sum(commit['commit'].get('comment_count', 0) for commit in commits)
+
+    lines_changed = lines_added = lines_deleted = files_changed = 0
+    for details in commit_details:
+        stats = details.get('stats', {})
+        lines_changed += stats.get('total', 0)
+        lines_added += stats.get('additions', 0)
+        lines_deleted += stats.get('deletions', 0)
+        files_changed += len(details.get('files', []))
+
+    return [len(commits), lines_changed, lines_added, lines_deleted, len(contributors), comment_count, files_changed]
+
+
+def file_totals(files: list) -> list:
+    '''
+    Sums a PR's files in FILE_TOTAL_COLUMNS order
+    '''
+    statuses = dict.fromkeys(FILE_STATUSES, 0)
+    for file in files:
+        if file['status'] in statuses:
+            statuses[file['status']] += 1
+    return [len(files), sum(file['additions'] for file in files), sum(file['deletions'] for file in files),
+            sum(file['changes'] for file in files)] + list(statuses.values())
+
+
+def review_comment_count(reviews: list) -> int:
+    return sum(review['body'].count('\n') for review in reviews if 'body' in review)
+
+
+def participant_count(comments: list) -> int:
+    return len(set(comment['user']['login'] for comment in comments if 'user' in comment))
+
+
+def is_revert(pr: dict) -> int:
+    return int(pr['title'].lower().startswith('revert'))
+
+
+def adds_tests(files: list) -> int:
+    return int(any('test' in file['filename'].lower() for file in files))
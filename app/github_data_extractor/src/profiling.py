@@ -0,0 +1,159 @@
+from collections import Counter
+import cProfile
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'sampling')
+
+# Frames kept per traced allocation, more frames cost more memory and time
+TRACEMALLOC_FRAMES = 10
+
+
+class stackSampler:
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        '''
+        Samples the stack of one thread every interval seconds from a daemon thread. The profiled code is not
+        instrumented, so the overhead stays low whatever it calls. Stacks are kept in the folded format
+        flame graph tools read: one line per distinct stack, outermost frame first, with its sample count
+        '''
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self, file_path: str):
+        with open(file_path, 'w') as folded_file:
+            for stack, count in self.stacks.most_common():
+                folded_file.write(f"{stack} {count}\n")
+
+
+class extractorProfiler:
+    def __init__(self, profile_dir: str, profiler: str = 'cprofile', sample_interval: float = 0.005,
+                 trace_memory: bool = True):
+        '''
+        Profiles calls of the wrapped extractors. Each call writes {owner}_{repo}_{extractor}_{run} files to
+        profile_dir: a .prof pstats file with 'cprofile' or a .folded stack sample file with 'sampling',
+        and with trace_memory a .tracemalloc snapshot of the memory still allocated when the call returns.
+        Both profilers follow the calling thread only, an extractor profiled inside another one is
+        covered by the outer profile
+        '''
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profiler}. Choose one of {list(PROFILERS)}")
+
+        self.profile_dir = profile_dir
+        self.profiler = profiler
+        self.sample_interval = sample_interval
+        self.trace_memory = trace_memory
+        self.lock = threading.Lock()
+        self.runs = Counter()
+        self.tracing = 0
+        self.owns_tracing = False
+        self.active = threading.local()
+
+    def wrap(self, name: str, method):
+        '''
+        Returns method profiled on every call
+        '''
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if getattr(self.active, 'name', None) is not None:
+                return method(*args, **kwargs)
+            return self.profile_call(name, method, args, kwargs)
+
+        return wrapper
+
+    def profile_call(self, name: str, method, args: tuple, kwargs: dict):
+        repo_info = args[0] if args and hasattr(args[0], 'repo_owner') else None
+        label = f"{repo_info.repo_owner}_{repo_info.repo_name}_{name}" if repo_info is not None else name
+        with self.lock:
+            self.runs[label] += 1
+            file_stem = os.path.join(self.profile_dir, f"{label}_{self.runs[label]}")
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+        self.start_tracing()
+        self.active.name = name
+        profiler = cProfile.Profile() if self.profiler == 'cprofile' else stackSampler(threading.get_ident(),
+                                                                                      self.sample_interval)
+        start = time.perf_counter()
+        if self.profiler == 'cprofile':
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Python 3.12+ allows one cProfile at a time, extractors running concurrently go unprofiled
+                logger.warning(f"Could not profile {name}: {e}")
+                self.active.name = None
+                self.stop_tracing(None)
+                return method(*args, **kwargs)
+        else:
+            profiler.start()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if self.profiler == 'cprofile':
+                profiler.disable()
+                profiler.dump_stats(f"{file_stem}.prof")
+            else:
+                profiler.stop()
+                profiler.write(f"{file_stem}.folded")
+            wall_seconds = time.perf_counter() - start
+            self.active.name = None
+            peak_mb = self.stop_tracing(f"{file_stem}.tracemalloc")
+
+            peak = f", peak traced memory {peak_mb:.1f} MB" if peak_mb is not None else ''
+            logger.info(f"Profiled {name} in {wall_seconds:.2f} seconds{peak}: {file_stem}.*")
+
+    def start_tracing(self):
+        if not self.trace_memory:
+            return
+        with self.lock:
+            # Concurrent profiled extractors share one tracemalloc session, started by the first of them
+            if self.tracing == 0:
+                # Tracing the application started itself is left running
+                self.owns_tracing = not tracemalloc.is_tracing()
+                if self.owns_tracing:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+                tracemalloc.reset_peak()
+            self.tracing += 1
+
+    def stop_tracing(self, file_path: str) -> float or None:
+        '''
+        Writes a snapshot of the traced allocations, unless file_path is None, and returns the peak traced memory
+        in MB. The last profiled extractor to finish stops tracing
+        '''
+        if not self.trace_memory:
+            return None
+        with self.lock:
+            if file_path is not None:
+                tracemalloc.take_snapshot().dump(file_path)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            self.tracing -= 1
+            if self.tracing == 0 and self.owns_tracing:
+                tracemalloc.stop()
+        return peak_mb
@@ -0,0 +1,161 @@
+import json
+import logging
+import threading
+import time
+
+from .cassette import redact_authorization
+from .cost_model import count_from_link
+
+logger = logging.getLogger('github_data_extractor.progress')
+
+# The stderr handler configure_logging added, if any
+default_handler = None
+
+# How much is logged: 'quiet' only warnings, 'progress' a throttled update per extractor, 'debug' every PR too
+VERBOSITY_LEVELS = {
+    'quiet': logging.WARNING,
+    'progress': logging.INFO,
+    'debug': logging.DEBUG
+}
+
+
+class jsonLogFormatter(logging.Formatter):
+    '''
+    Formats each record as one JSON object, with the fields of progress events at the top level
+    '''
+    def format(self, record: logging.LogRecord) -> str:
+        event = {'time': round(record.created, 3), 'level': record.levelname, 'message': record.getMessage()}
+        event.update(getattr(record, 'progress', {}))
+        return json.dumps(event)
+
+
+def configure_logging(verbosity: str = 'progress', json_format: bool = False):
+    '''
+    Sets the level of the extractor's loggers. A stderr handler is added unless the application
+    has configured logging itself. Only called when dataExtraction is given verbosity or json_logs,
+    and calling it again only changes the level and format, it never adds a second handler
+    '''
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown verbosity: {verbosity}. Choose one of {list(VERBOSITY_LEVELS)}")
+
+    global default_handler
+    package_logger = logging.getLogger('github_data_extractor')
+    package_logger.setLevel(VERBOSITY_LEVELS[verbosity])
+    if default_handler is None and not package_logger.hasHandlers():
+        default_handler = logging.StreamHandler()
+        package_logger.addHandler(default_handler)
+    if default_handler is not None:
+        default_handler.setFormatter(jsonLogFormatter() if json_format else
+                                     logging.Formatter('%(asctime)s %(message)s'))
+
+
+class stageProgress:
+    def __init__(self, owner: str, repo: str, stage: str, token: str):
+        self.owner = owner
+        self.repo = repo
+        self.stage = stage
+        self.token = token
+        self.total = None
+        self.done = 0
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+
+class progressReporter:
+    def __init__(self, request_coalescer, interval: float = 5.0):
+        '''
+        Tracks the PRs each extractor has processed per repository and logs at most one update per stage
+        every interval seconds: PRs/s, requests/s, the remaining quota of the repository's token and an ETA.
+        PR totals are read from the Link header of the PR list pages, so tracking makes no extra calls
+        '''
+        self.request_coalescer = request_coalescer
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.last_requests = (time.monotonic(), 0)
+
+    def get_stage(self, repo_info, stage: str) -> stageProgress:
+        # Called with the lock held
+        key = (repo_info.repo_owner, repo_info.repo_name, stage)
+        progress = self.stages.get(key)
+        if progress is None:
+            token = redact_authorization(f"token {repo_info.repo_token}") if repo_info.repo_token else 'anonymous'
+            progress = self.stages[key] = stageProgress(repo_info.repo_owner, repo_info.repo_name, stage, token)
+        return progress
+
+    def observe_page(self, repo_info, stage: str, response, page_no: int, items: int):
+        '''
+        Reads the PR total from the first list page fetched: its last page link times the page size,
+        or all the pages so far when there is no last page
+        '''
+        with self.lock:
+            progress = self.get_stage(repo_info, stage)
+            if progress.total is None and items:
+                link = response.headers.get('Link')
+                progress.total = (count_from_link(link, items, per_page=items) if 'rel="last"' in (link or '')
+                                  else (page_no - 1) * items + items)
+
+    def advance(self, repo_info, stage: str, pr_number: int, count: int = 1):
+        '''
+        Counts processed PRs and logs an update once the interval has passed since the last one
+        '''
+        now = time.monotonic()
+        with self.lock:
+            progress = self.get_stage(repo_info, stage)
+            progress.done += count
+            due = now - progress.last_report >= self.interval
+            if due:
+                progress.last_report = now
+                event = self.event(progress, now)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{progress.owner}/{progress.repo} {stage}: PR #{pr_number}",
+                         extra={'progress': {'event': 'pr', 'owner': progress.owner, 'repo': progress.repo,
+                                             'stage': stage, 'pr': pr_number}})
+        if due:
+            self.log(logging.INFO, event)
+
+    def finish(self, repo_info, stage: str, rows: int):
+        '''
+        Logs the totals of a stage once it has processed every PR
+        '''
+        now = time.monotonic()
+        with self.lock:
+            progress = self.get_stage(repo_info, stage)
+            progress.total = progress.done
+            # A later run of the same stage starts counting again
+            del self.stages[(progress.owner, progress.repo, stage)]
+            event = self.event(progress, now)
+        event.update({'event': 'finished', 'rows': rows, 'eta_seconds': 0})
+        self.log(logging.INFO, event)
+
+    def event(self, progress: stageProgress, now: float) -> dict:
+        # Called with the lock held. Requests per second are over all repositories, since the previous event
+        elapsed = max(now - progress.started, 1e-9)
+        prs_per_second = progress.done / elapsed
+        requests = self.request_coalescer.network_calls
+        since, previous_requests = self.last_requests
+        requests_per_second = (requests - previous_requests) / (now - since) if now > since else 0.0
+        self.last_requests = (now, requests)
+
+        quota = self.request_coalescer.token_quota.get(progress.token, {})
+        eta = None
+        if progress.total is not None and prs_per_second > 0:
+            eta = round(max(progress.total - progress.done, 0) / prs_per_second, 1)
+        return {
+            'event': 'progress', 'owner': progress.owner, 'repo': progress.repo, 'stage': progress.stage,
+            'prs_done': progress.done, 'prs_total': progress.total, 'prs_per_second': round(prs_per_second, 2),
+            'requests_per_second': round(requests_per_second, 2), 'quota_remaining': quota.get('Remaining'),
+            'eta_seconds': eta, 'elapsed_seconds': round(elapsed, 1)
+        }
+
+    def log(self, level: int, event: dict):
+        if not logger.isEnabledFor(level):
+            return
+        total = f"/{event['prs_total']}" if event['prs_total'] is not None else ''
+        eta = f", ETA {event['eta_seconds']:.0f}s" if event['eta_seconds'] else ''
+        rows = f", {event['rows']} rows" if 'rows' in event else ''
+        logger.log(level, f"{event['owner']}/{event['repo']} {event['stage']} {event['event']}: "
+                          f"{event['prs_done']}{total} PRs, {event['prs_per_second']} PRs/s, "
+                          f"{event['requests_per_second']} requests/s, quota {event['quota_remaining']}{eta}{rows}",
+                   extra={'progress': event})
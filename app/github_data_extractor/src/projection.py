@@ -0,0 +1,60 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, install with the "fast-json" extra
+    orjson = None
+
+
+# Fields read from each endpoint's payload, everything else is dropped right after parsing.
+# A nested dict projects an object, or every object of a list. An empty dict keeps only the list length
+ENDPOINT_FIELDS = {
+    'rate_limit': {'rate': {'remaining': None, 'reset': None}},
+    'pull_list': {
+        'number': None, 'state': None, 'title': None,
+        'created_at': None, 'updated_at': None, 'closed_at': None, 'merged_at': None,
+        'labels': {'name': None},
+        'milestone': {'open_issues': None, 'closed_issues': None},
+        'head': {'repo': {'open_issues_count': None, 'open_issues': None}},
+        'base': {'repo': {'open_issues_count': None, 'open_issues': None}},
+        'assignees': {}, 'requested_reviewers': {}, 'requested_teams': {}
+    },
+    'pull_detail': {'title': None, 'created_at': None, 'merged_at': None, 'additions': None, 'deletions': None},
+    'pull_reviews': {'body': None},
+    'pull_comments': {'user': {'login': None}},
+    'pull_files': {'filename': None, 'status': None, 'additions': None, 'deletions': None, 'changes': None},
+    'pull_commits': {'sha': None, 'author': {'login': None}, 'commit': {'comment_count': None}},
+    'commit_detail': {'files': {}, 'stats': {'total': None, 'additions': None, 'deletions': None}},
+    'issue_timeline': {'event': None, 'source': {'issue': {'number': None, 'title': None}}},
+    'issues': {'state': None, 'created_at': None, 'updated_at': None, 'labels': {'name': None}},
+    'branches': {'name': None}
+}
+
+
+def loads(content: bytes):
+    '''
+    Parses a JSON body with orjson when it is installed, and the standard library otherwise
+    '''
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def project(value, fields: dict):
+    '''
+    Keeps only the declared fields of a parsed payload. Missing fields stay missing, so lookups fail as before
+    '''
+    if fields is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    projected = {}
+    for name, nested in fields.items():
+        if name in value:
+            item = value[name]
+            # Plain values are copied without a recursive call, most fields are leaves
+            projected[name] = item if nested is None or item is None else project(item, nested)
+    return projected
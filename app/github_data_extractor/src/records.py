@@ -0,0 +1,106 @@
+import sys
+
+
+def intern_text(value):
+    '''
+    Interns logins, labels and states so the many PRs sharing them reference one string
+    '''
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class slottedRecord:
+    '''
+    Compact row with one slot per column. It still behaves like the list rows the extractors used to return:
+    it can be indexed, sliced, iterated, concatenated with lists and compared with lists
+    '''
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def values(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.values()[index]
+        return getattr(self, self.__slots__[index])
+
+    def __add__(self, other):
+        return self.values() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.values()
+
+    def __eq__(self, other):
+        if isinstance(other, (slottedRecord, list, tuple)):
+            return self.values() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.values())
+
+
+class commitStatsRecord(slottedRecord):
+    __slots__ = (
+        'pr_number', 'total_commits', 'total_lines_changed', 'total_lines_added', 'total_lines_deleted',
+        'total_contributors', 'total_comment_count', 'total_files_changed', 'rate_of_commits',
+        'rate_of_lines_changed', 'rate_of_contributors', 'rate_of_comment_count'
+    )
+
+
+class fileStatsRecord(slottedRecord):
+    __slots__ = (
+        'pr_number', 'total_files_changed', 'total_lines_added', 'total_lines_deleted', 'total_changes',
+        'total_added_files', 'total_modified_files', 'total_removed_files', 'total_renamed_files',
+        'total_copied_files'
+    )
+
+
+class prRecord(slottedRecord):
+    '''
+    PR row that references the PR's commit and file stats records instead of copying their values.
+    file_indices (shared by all rows) selects the file stats columns that are not already in the commit stats
+    '''
+    __slots__ = (
+        'pr_number', 'state', 'created_at', 'updated_at', 'closed_at', 'merged_at', 'pr_age', 'number_of_labels',
+        'label_names', 'milestone_open_issues', 'milestone_closed_issues', 'head_repo_open_issues_count',
+        'head_repo_open_issues', 'base_repo_open_issues_count', 'base_repo_open_issues', 'number_of_assignees',
+        'number_of_requested_reviewers', 'number_of_requested_teams', 'commit_stats', 'file_stats',
+        'commit_width', 'file_indices'
+    )
+    own_fields = 18
+
+    def values(self) -> list:
+        values = [getattr(self, name) for name in self.__slots__[:self.own_fields]]
+        values += self.commit_stats[1:] if self.commit_stats is not None else [''] * self.commit_width
+        if self.file_stats is not None:
+            values += [self.file_stats[i] for i in self.file_indices]
+        else:
+            values += [''] * len(self.file_indices)
+        return values
+
+    def __len__(self):
+        return self.own_fields + self.commit_width + len(self.file_indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.values()[index]
+        if index < 0:
+            index += len(self)
+        if index < self.own_fields:
+            return getattr(self, self.__slots__[index])
+
+        index -= self.own_fields
+        if index < self.commit_width:
+            return self.commit_stats[index + 1] if self.commit_stats is not None else ''
+        index -= self.commit_width
+        file_index = self.file_indices[index]
+        return self.file_stats[file_index] if self.file_stats is not None else ''
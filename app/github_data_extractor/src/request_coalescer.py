@@ -0,0 +1,205 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import threading
+import time
+import requests
+
+from .cassette import httpCassette, redact_authorization
+from .instrumentation import metricsRegistry
+from .projection import ENDPOINT_FIELDS, loads, project
+
+
+class fetchedResponse:
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes, fields: dict = None):
+        '''
+        A GitHub API response shared by every caller that asked for the same URL at the same time.
+        The body is parsed once, on the first call to json(), and only the given fields of a successful response are kept
+        '''
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.fields = fields
+        self._json = None
+        self._parsed = False
+        self._parse_lock = threading.Lock()
+
+    def json(self):
+        with self._parse_lock:
+            if not self._parsed:
+                payload = loads(self.content)
+                self._json = project(payload, self.fields) if self.status_code == 200 else payload
+                self._parsed = True
+                # The raw body is no longer needed once the projected payload is kept
+                self.content = None
+        return self._json
+
+    def has_next_page(self) -> bool:
+        '''
+        Whether the Link header points at another page, so paginated loops stop without fetching an empty page
+        '''
+        return 'rel="next"' in self.headers.get('Link', '')
+
+
+class inFlightRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class requestCoalescer:
+    def __init__(self, max_retries: int = 3, cassette: httpCassette = None, metrics: metricsRegistry = None):
+        '''
+        Single-flight GET requests: concurrent requests for the same URL and auth scope share one network call.
+        Requests hitting a secondary rate limit are retried up to max_retries times after the advised wait.
+        A cassette in 'record' mode keeps every response, in 'replay' mode it answers instead of the network.
+        metrics, when given, counts every call by endpoint and status with its size and latency
+        '''
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.sessions = threading.local()
+        self.max_retries = max_retries
+        self.cassette = cassette
+        self.metrics = metrics
+        # Requests sent and the last seen rate limit window of each token, keyed by the token's digest
+        self.token_quota = {}
+
+        self.total_requests = 0
+        self.network_calls = 0
+        # Requests answered by a replayed cassette, which never reach the network
+        self.replayed_responses = 0
+        self.coalesced_requests = 0
+        self.retried_calls = 0
+
+    def get_session(self) -> requests.Session:
+        # One pooled session per thread, requests does not guarantee Session is thread safe
+        if not hasattr(self.sessions, 'session'):
+            self.sessions.session = requests.Session()
+        return self.sessions.session
+
+    def canonical_url(self, url: str) -> str:
+        '''
+        Normalises a URL so that equivalent requests match, e.g. /files and /files?page=1
+        '''
+        parts = urlsplit(url)
+        query = sorted((name, value) for name, value in parse_qsl(parts.query) if (name, value) != ('page', '1'))
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+    def request_key(self, url: str, headers: dict, endpoint: str = None) -> tuple:
+        # The token decides what the caller may see and Accept changes the payload, both are part of the key.
+        # So is the endpoint, as it decides which fields of the payload are kept
+        return (self.canonical_url(url), headers.get('Authorization'), headers.get('Accept'), endpoint)
+
+    def get(self, url: str, headers: dict, endpoint: str = None) -> fetchedResponse:
+        '''
+        Returns the response for url, joining an identical request already in flight when there is one.
+        endpoint names an entry of ENDPOINT_FIELDS, the response then keeps only those fields
+        '''
+        key = self.request_key(url, headers, endpoint)
+
+        with self.lock:
+            self.total_requests += 1
+            request = self.in_flight.get(key)
+            is_leader = request is None
+            if is_leader:
+                request = inFlightRequest()
+                self.in_flight[key] = request
+                if self.cassette is not None and self.cassette.mode == 'replay':
+                    self.replayed_responses += 1
+                else:
+                    self.network_calls += 1
+            else:
+                self.coalesced_requests += 1
+
+        if not is_leader:
+            if self.metrics is not None:
+                self.metrics.count_cache_hit('coalesced', endpoint)
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+            return request.response
+
+        start = time.perf_counter()
+        try:
+            response = self.send(url, headers, endpoint)
+            request.response = fetchedResponse(url, response.status_code, response.headers, response.content,
+                                               ENDPOINT_FIELDS.get(endpoint))
+            if self.metrics is not None:
+                self.metrics.observe_request(endpoint, response.status_code, len(response.content or b''),
+                                             time.perf_counter() - start)
+            self.record_quota(headers, response.headers)
+        except Exception as e:
+            request.error = e
+            if self.metrics is not None:
+                self.metrics.observe_request(endpoint, 'error', 0, time.perf_counter() - start)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            request.done.set()
+
+        return request.response
+
+    def record_quota(self, request_headers: dict, response_headers):
+        '''
+        Keeps the remaining quota of the token from the X-RateLimit headers. Of concurrent responses the one
+        from the latest window, and within a window the lowest remaining count, wins
+        '''
+        token = redact_authorization(request_headers.get('Authorization')) or 'anonymous'
+        remaining = response_headers.get('X-RateLimit-Remaining')
+        reset = response_headers.get('X-RateLimit-Reset')
+
+        with self.lock:
+            quota = self.token_quota.setdefault(token, {'Requests': 0, 'Remaining': None, 'Limit': None,
+                                                        'Reset': None})
+            quota['Requests'] += 1
+            if remaining is None or reset is None:
+                return
+            remaining, reset = int(remaining), int(reset)
+            if quota['Reset'] is None or reset > quota['Reset'] or (reset == quota['Reset'] and
+                                                                    remaining < quota['Remaining']):
+                quota['Remaining'] = remaining
+                quota['Reset'] = reset
+                quota['Limit'] = int(response_headers.get('X-RateLimit-Limit', 0)) or None
+
+    def send(self, url: str, headers: dict, endpoint: str = None):
+        '''
+        Sends one GET request. Secondary rate limits are answered with 403 or 429 and a Retry-After header,
+        those requests are sent again once the wait is over
+        '''
+        if self.cassette is not None and self.cassette.mode == 'replay':
+            return self.cassette.play(self.canonical_url(url), headers)
+
+        attempt = 0
+        while True:
+            response = self.get_session().get(url, headers=headers)
+            retry_after = response.headers.get('Retry-After')
+            if response.status_code not in (403, 429) or retry_after is None or attempt == self.max_retries:
+                # Only the final response is recorded, so replays do not wait out the retries again
+                if self.cassette is not None:
+                    self.cassette.record(self.canonical_url(url), headers, response)
+                return response
+
+            attempt += 1
+            with self.lock:
+                self.retried_calls += 1
+            if self.metrics is not None:
+                self.metrics.count_retry(endpoint)
+            try:
+                time.sleep(float(retry_after))
+            except ValueError:  # An HTTP date instead of seconds
+                time.sleep(60)
+
+    def stats(self) -> dict:
+        '''
+        Returns how many requests were made, how many reached the network or were replayed from the cassette,
+        and how many calls were saved
+        '''
+        with self.lock:
+            return {
+                'Total Requests': self.total_requests,
+                'Network Calls': self.network_calls,
+                'Replayed Responses': self.replayed_responses,
+                'Saved Calls': self.coalesced_requests,
+                'Retried Calls': self.retried_calls
+            }
@@ -0,0 +1,173 @@
+import json
+import queue
+import re
+import sqlite3
+import threading
+
+from .columnar import FLOAT_COLUMNS
+
+try:
+    import duckdb
+except ImportError:  # DuckDB is optional, install with the "duckdb" extra
+    duckdb = None
+
+
+# Primary key of every table, rows are upserted on it
+TABLE_KEYS = {
+    'prs': ['owner', 'repo', 'pr_number'],
+    'pr_commits': ['owner', 'repo', 'pr_number'],
+    'pr_files': ['owner', 'repo', 'pr_number'],
+    'pr_quality': ['owner', 'repo', 'pr_number'],
+    'linked_issues': ['owner', 'repo', 'pr_number'],
+    'issues': ['owner', 'repo'],
+    'branches': ['owner', 'repo', 'branch_name'],
+    'commit_rollups': ['owner', 'repo', 'period', 'period_start']
+}
+
+
+def column_name(header: str) -> str:
+    '''
+    Turns an output header such as 'Merge Time (seconds)' into a SQL column name such as merge_time_seconds
+    '''
+    return re.sub(r'[^a-z0-9]+', '_', str(header).lower()).strip('_')
+
+
+def column_type(name: str, values: list) -> str:
+    if name in FLOAT_COLUMNS:
+        return 'DOUBLE'
+    present = [value for value in values if value is not None and value != '']
+    if present and all(isinstance(value, int) for value in present):
+        return 'BIGINT'
+    if present and all(isinstance(value, (int, float)) for value in present):
+        return 'DOUBLE'
+    return 'VARCHAR'
+
+
+def sql_value(value):
+    if isinstance(value, (set, frozenset)):
+        return json.dumps(sorted(value, key=str), default=str)
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, default=str)
+    if isinstance(value, bool):
+        return int(value)
+    if value == '':
+        return None
+    return value
+
+
+class resultStore:
+    def __init__(self, path: str, backend: str = 'sqlite'):
+        '''
+        Embedded database for extraction results. Rows are upserted by (owner, repo, pr_number), and every write
+        goes through a single writer thread that applies each batch in one transaction
+        '''
+        if backend not in ('sqlite', 'duckdb'):
+            raise ValueError(f"Unknown store backend: {backend}. Choose 'sqlite' or 'duckdb'")
+        if backend == 'duckdb' and duckdb is None:
+            raise ImportError("The duckdb backend needs duckdb. Install it with: pip install github_data_extractor[duckdb]")
+
+        self.path = path
+        self.backend = backend
+        self.columns = {}
+        self.error = None
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self.run_writer, name='result-store-writer', daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        if self.backend == 'duckdb':
+            return duckdb.connect(self.path)
+        # Autocommit mode, transactions are opened explicitly per batch
+        return sqlite3.connect(self.path, isolation_level=None)
+
+    def run_writer(self):
+        connection = self.connect()
+        try:
+            while True:
+                write = self.writes.get()
+                try:
+                    if write is None:
+                        return
+                    if self.error is None:
+                        self.apply(connection, *write)
+                except Exception as e:
+                    self.error = e
+                finally:
+                    self.writes.task_done()
+        finally:
+            connection.close()
+
+    def upsert(self, table: str, owner: str, repo: str, header: list, rows: list):
+        '''
+        Queues rows for upsert into table, the first header column is the rest of the key (e.g. 'PR Number')
+        '''
+        if rows:
+            self.writes.put((table, owner, repo, header, rows, False))
+
+    def replace_repo_rows(self, table: str, owner: str, repo: str, header: list, rows: list):
+        '''
+        Queues rows that replace everything the table holds for the repository, e.g. its current branches
+        '''
+        self.writes.put((table, owner, repo, header, rows, True))
+
+    def flush(self):
+        '''
+        Waits for every queued write to be committed, raising the first error the writer hit
+        '''
+        self.writes.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.writes.put(None)
+        self.writer.join()
+        if self.error is not None:
+            raise self.error
+
+    def ensure_table(self, connection, table: str, columns: list, rows: list):
+        keys = TABLE_KEYS[table]
+        known_columns = self.columns.get(table)
+
+        if known_columns is None:
+            types = {name: column_type(name, [row[i] for row in rows]) for i, name in enumerate(columns)}
+            types.update({'owner': 'VARCHAR', 'repo': 'VARCHAR'})
+            definitions = ', '.join(f'"{column_name(name)}" {types.get(name, "VARCHAR")}'
+                                    for name in ['owner', 'repo'] + [name for name in columns
+                                                                     if column_name(name) not in ('owner', 'repo')])
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({definitions}, PRIMARY KEY ({", ".join(keys)}))')
+            known_columns = set(self.table_columns(connection, table))
+            self.columns[table] = known_columns
+
+        # Columns added to an extractor later are added to its table
+        for i, name in enumerate(columns):
+            sql_name = column_name(name)
+            if sql_name not in known_columns:
+                connection.execute(f'ALTER TABLE {table} ADD COLUMN "{sql_name}" {column_type(name, [row[i] for row in rows])}')
+                known_columns.add(sql_name)
+
+    def table_columns(self, connection, table: str) -> list:
+        if self.backend == 'duckdb':
+            return [row[0] for row in connection.execute(f"DESCRIBE {table}").fetchall()]
+        return [row[1] for row in connection.execute(f"PRAGMA table_info({table})").fetchall()]
+
+    def apply(self, connection, table: str, owner: str, repo: str, header: list, rows: list, replace: bool):
+        self.ensure_table(connection, table, header, rows)
+
+        sql_columns = ['owner', 'repo'] + [column_name(name) for name in header]
+        keys = TABLE_KEYS[table]
+        placeholders = ', '.join('?' for _ in sql_columns)
+        updates = ', '.join(f'"{name}" = excluded."{name}"' for name in sql_columns if name not in keys)
+        conflict = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+        quoted_columns = ', '.join(f'"{name}"' for name in sql_columns)
+        statement = (f'INSERT INTO {table} ({quoted_columns}) '
+                     f'VALUES ({placeholders}) ON CONFLICT ({", ".join(keys)}) {conflict}')
+
+        connection.execute('BEGIN')
+        try:
+            if replace:
+                connection.execute(f'DELETE FROM {table} WHERE owner = ? AND repo = ?', [owner, repo])
+            connection.executemany(statement, [[owner, repo] + [sql_value(value) for value in row] for row in rows])
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
@@ -0,0 +1,129 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+ROLLUP_PERIODS = ('day', 'week')
+
+ROLLUP_HEADER = ['Period Start', 'Commits', 'Lines Changed', 'Net Size', 'Active Contributors']
+
+
+def period_start(committer_date: datetime, period: str) -> str:
+    '''
+    Start of the UTC day, or of the ISO week (Monday), a commit falls in
+    '''
+    day = committer_date.astimezone(timezone.utc).date()
+    if period == 'week':
+        day -= timedelta(days=day.weekday())
+    return day.isoformat()
+
+
+class commitRollups:
+    def __init__(self, folder_path: str, rollup_name: str):
+        '''
+        Whole-history totals and per-day / per-week rollups of a repository's commits, kept under {folder_path}/.rollups.
+        The state remembers the last traversed head, so later runs only add the commits made since
+        '''
+        rollup_dir = os.path.join(folder_path, '.rollups')
+        if not os.path.exists(rollup_dir):
+            os.makedirs(rollup_dir)
+
+        self.state_path = os.path.join(rollup_dir, rollup_name + '.json')
+        self.reset()
+
+    def reset(self):
+        self.head = None
+        self.commits = 0
+        self.lines = 0
+        self.size = 0
+        self.complexity = 0
+        self.first_commit_date = None
+        self.last_commit_date = None
+        self.contributors = Counter()
+        # {period: {period start: {'commits', 'lines', 'net_size', 'contributors'}}}
+        self.buckets = {period: {} for period in ROLLUP_PERIODS}
+
+    def load(self):
+        if not os.path.exists(self.state_path):
+            return
+
+        with open(self.state_path, 'r') as state_file:
+            state = json.load(state_file)
+
+        self.head = state['head']
+        self.commits = state['commits']
+        self.lines = state['lines']
+        self.size = state['size']
+        self.complexity = state['complexity']
+        self.first_commit_date = state['first_commit_date'] and datetime.fromisoformat(state['first_commit_date'])
+        self.last_commit_date = state['last_commit_date'] and datetime.fromisoformat(state['last_commit_date'])
+        self.contributors = Counter(state['contributors'])
+        self.buckets = {
+            period: {start: dict(bucket, contributors=set(bucket['contributors']))
+                     for start, bucket in state['buckets'][period].items()}
+            for period in ROLLUP_PERIODS
+        }
+
+    def add_commit(self, commit):
+        '''
+        Adds one pydriller commit to the totals and to its day and week
+        '''
+        committer_date = commit.committer_date
+        self.commits += 1
+        self.lines += commit.lines
+        self.size += commit.insertions - commit.deletions
+        self.complexity += commit.dmm_unit_complexity if commit.dmm_unit_complexity is not None else 0
+        self.first_commit_date = min(self.first_commit_date or committer_date, committer_date)
+        self.last_commit_date = max(self.last_commit_date or committer_date, committer_date)
+        self.contributors[commit.author.name] += 1
+
+        for period in ROLLUP_PERIODS:
+            bucket = self.buckets[period].setdefault(
+                period_start(committer_date, period),
+                {'commits': 0, 'lines': 0, 'net_size': 0, 'contributors': set()}
+            )
+            bucket['commits'] += 1
+            bucket['lines'] += commit.lines
+            bucket['net_size'] += commit.insertions - commit.deletions
+            bucket['contributors'].add(commit.author.name)
+
+    def rows(self, period: str) -> list:
+        '''
+        Returns the header followed by one row per day or week with commits, oldest first
+        '''
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Unknown rollup period: {period}. Choose one of {list(ROLLUP_PERIODS)}")
+
+        return [ROLLUP_HEADER] + [
+            [start, bucket['commits'], bucket['lines'], bucket['net_size'], len(bucket['contributors'])]
+            for start, bucket in sorted(self.buckets[period].items())
+        ]
+
+    def save(self, head: str):
+        '''
+        Atomically writes the state, recording head as the last traversed commit
+        '''
+        self.head = head
+        state = {
+            'head': head,
+            'commits': self.commits,
+            'lines': self.lines,
+            'size': self.size,
+            'complexity': self.complexity,
+            'first_commit_date': self.first_commit_date and self.first_commit_date.isoformat(),
+            'last_commit_date': self.last_commit_date and self.last_commit_date.isoformat(),
+            'contributors': dict(self.contributors),
+            'buckets': {
+                period: {start: dict(bucket, contributors=sorted(bucket['contributors']))
+                         for start, bucket in buckets.items()}
+                for period, buckets in self.buckets.items()
+            }
+        }
+
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w') as state_file:
+            json.dump(state, state_file)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+
+        os.replace(temp_path, self.state_path)
@@ -0,0 +1,532 @@
+from datetime import datetime, timezone
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import threading
+import uuid
+
+from .columnar import build_record_batch, require_pyarrow, writable_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Columnar output is optional, install with the "columnar" extra
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional, install with the "zstd" extra
+    zstandard = None
+
+# File name suffix added by each compression of text outputs
+COMPRESSIONS = {
+    None: '',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+# Parquet codec used for each compression, Parquet files are always compressed internally
+PARQUET_CODECS = {
+    None: 'snappy',
+    'gzip': 'gzip',
+    'zstd': 'zstd'
+}
+
+
+MANIFEST_SUFFIX = '.manifest.json'
+STAGING_SUFFIX = '.partial'
+
+
+def staging_path(file_path: str, resumable: bool = False) -> str:
+    '''
+    Path an output is written to before it is published. Resumable outputs always use the same staging file so a
+    later run can append to it, the others get a new file created under a unique name, so writers of the same
+    output never share a staging file
+    '''
+    if resumable:
+        return file_path + STAGING_SUFFIX
+    while True:
+        path = f"{file_path}.{uuid.uuid4().hex[:12]}{STAGING_SUFFIX}"
+        try:
+            # Created exclusively, and unlike mkstemp with the umask's mode, which the published file keeps
+            open(path, 'x').close()
+            return path
+        except FileExistsError:
+            continue
+
+
+def sync_and_checksum(file_path: str) -> str:
+    '''
+    fsyncs a closed file and returns its sha256
+    '''
+    checksum = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            checksum.update(block)
+        os.fsync(file.fileno())
+    return checksum.hexdigest()
+
+
+def sync_directory(folder_path: str):
+    # Makes a rename durable, not every platform can open a directory
+    try:
+        descriptor = os.open(folder_path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def read_output_manifest(file_path: str) -> dict or None:
+    '''
+    Returns the sidecar manifest of a published output, with its row count and checksum, or None when it has none
+    '''
+    manifest_path = file_path + MANIFEST_SUFFIX
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as manifest_file:
+        return json.load(manifest_file)
+
+
+def verify_output(file_path: str) -> bool:
+    '''
+    Checks a published output against its sidecar manifest, so loaders can reject a file that does not match it
+    '''
+    manifest = read_output_manifest(file_path)
+    if manifest is None or not os.path.exists(file_path):
+        return False
+    return os.path.getsize(file_path) == manifest['bytes'] and sync_and_checksum(file_path) == manifest['sha256']
+
+
+def open_text_output(file_path: str, compression: str = None, append: bool = False):
+    '''
+    Opens a text file for writing, streaming it through the gzip or zstd compressor when one is given
+    '''
+    if compression is None:
+        return open(file_path, 'a' if append else 'w', newline='')
+    if compression == 'gzip':
+        return gzip.open(file_path, 'wt', newline='')
+    if zstandard is None:
+        raise ImportError("zstd compression needs zstandard. Install it with: pip install github_data_extractor[zstd]")
+    compressor = zstandard.ZstdCompressor(level=3)
+    return io.TextIOWrapper(compressor.stream_writer(open(file_path, 'wb')), newline='')
+
+
+class outputSink:
+    extension = ''
+    supports_append = False
+    staged = True
+
+    def __init__(self, file_path: str, append: bool = False, resumable: bool = False):
+        '''
+        Writes a header and rows of extractor values to a file. Sinks are used as context managers.
+        Rows go to a staging file that is fsynced and renamed to file_path on close, next to a sidecar manifest
+        with the row count and checksum. A failed write never replaces the published file.
+        resumable outputs keep a fixed staging file that an interrupted run leaves behind for the next one to
+        append to, the staging files of other outputs are unique and removed when writing fails
+        '''
+        self.file_path = file_path
+        self.resumable = resumable and self.supports_append
+        self.append = append and self.resumable
+        self.rows_written = 0
+        self.write_path = staging_path(file_path, self.resumable) if self.staged and file_path else file_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        '''
+        Called instead of close when writing fails part way. The staging file is kept only if a resumed run can append to it
+        '''
+        self.finish()
+        if self.staged and not self.resumable and self.write_path and os.path.exists(self.write_path):
+            os.remove(self.write_path)
+
+    def write_header(self, header: list):
+        raise NotImplementedError
+
+    def write_rows(self, rows: list):
+        raise NotImplementedError
+
+    def sync(self) -> int or None:
+        '''
+        Makes the rows written so far durable. Returns the file size when the file can be appended to at that point
+        '''
+        return None
+
+    def finish(self):
+        '''
+        Closes the file being written
+        '''
+        raise NotImplementedError
+
+    def close(self):
+        self.finish()
+        self.publish_file()
+
+    def publish_file(self):
+        '''
+        Moves the finished staging file over the published output and writes its sidecar manifest
+        '''
+        if not self.staged:
+            return
+        if not os.path.exists(self.write_path):
+            raise FileNotFoundError(f"Staging file {self.write_path} of {self.file_path} is missing, "
+                                    f"it was published or removed by another writer")
+
+        manifest = {
+            'file': os.path.basename(self.file_path),
+            'rows': self.rows_written,
+            'bytes': os.path.getsize(self.write_path),
+            'sha256': sync_and_checksum(self.write_path),
+            'written_at': datetime.now(timezone.utc).isoformat()
+        }
+        os.replace(self.write_path, self.file_path)
+
+        manifest_path = self.file_path + MANIFEST_SUFFIX
+        with open(manifest_path + '.tmp', 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(manifest_path + '.tmp', manifest_path)
+        sync_directory(os.path.dirname(self.file_path))
+
+
+class csvSink(outputSink):
+    extension = '.csv'
+    supports_append = True
+
+    def __init__(self, file_path: str, append: bool = False, compression: str = None, resumable: bool = False):
+        # A compressed stream cannot be cut back to a page boundary and appended to
+        self.supports_append = compression is None
+        super().__init__(file_path, append, resumable)
+        self.compression = compression
+        self.file = open_text_output(self.write_path, compression, self.append)
+        self.writer = csv.writer(self.file)
+
+    def write_header(self, header: list):
+        self.writer.writerow(header)
+
+    def write_rows(self, rows: list):
+        self.writer.writerows(rows)
+        self.rows_written += len(rows)
+
+    def sync(self) -> int or None:
+        if self.compression is not None:
+            return None  # Flushing a compressed stream mid-way would only cost compression ratio
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+    def finish(self):
+        self.file.close()
+
+
+class columnarSink(outputSink):
+    def __init__(self, file_path: str, append: bool = False, compression: str = None, row_group_size: int = 10000,
+                 resumable: bool = False):
+        '''
+        Buffers rows and writes them as typed record batches of row_group_size rows.
+        The schema is fixed by the first batch, nested values are stored as Arrow lists and structs
+        '''
+        require_pyarrow()
+        super().__init__(file_path, append, resumable)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.header = None
+        self.schema = None
+        self.buffer = []
+        self.writer = None
+
+    def write_header(self, header: list):
+        self.header = header
+
+    def write_rows(self, rows: list):
+        self.buffer.extend(rows)
+        while len(self.buffer) >= self.row_group_size:
+            self.write_batch(self.buffer[:self.row_group_size])
+            self.buffer = self.buffer[self.row_group_size:]
+
+    def write_batch(self, rows: list):
+        if self.schema is None:
+            self.schema = writable_schema(build_record_batch(self.header, rows).schema)
+            self.writer = self.open_writer()
+
+        self.writer.write_batch(build_record_batch(self.header, rows, self.schema))
+        self.rows_written += len(rows)
+
+    def open_writer(self):
+        raise NotImplementedError
+
+    def finish(self):
+        if self.header is None:
+            return  # Nothing was ever written
+        if self.buffer or self.schema is None:
+            self.write_batch(self.buffer)
+            self.buffer = []
+        self.writer.close()
+
+    def close(self):
+        if self.header is None:
+            # Nothing was ever written, so there is no file to publish
+            self.abort()
+            return
+        super().close()
+
+
+class parquetSink(columnarSink):
+    extension = '.parquet'
+
+    def open_writer(self):
+        return pq.ParquetWriter(self.write_path, self.schema, compression=PARQUET_CODECS[self.compression])
+
+
+class arrowSink(columnarSink):
+    extension = '.arrow'
+
+    def open_writer(self):
+        # Arrow IPC buffers can only be compressed with zstd or lz4
+        options = pa.ipc.IpcWriteOptions(compression='zstd' if self.compression else None)
+        return pa.ipc.new_file(self.write_path, self.schema, options=options)
+
+
+class batchCollector:
+    def __init__(self):
+        self.batches = []
+
+    def write_batch(self, batch):
+        self.batches.append(batch)
+
+    def close(self):
+        pass
+
+
+class tableSink(columnarSink):
+    staged = False
+    def __init__(self, row_group_size: int = 10000):
+        '''
+        Builds an in-memory Arrow table from typed record batches, without writing any file
+        '''
+        super().__init__(None, row_group_size=row_group_size)
+
+    def open_writer(self):
+        return batchCollector()
+
+    def to_table(self):
+        '''
+        Returns the rows written so far as an Arrow table. Call after close
+        '''
+        if self.writer is None:
+            return pa.table({})
+        return pa.Table.from_batches(self.writer.batches, schema=self.schema)
+
+
+class backgroundSink(outputSink):
+    staged = False
+    def __init__(self, sink: outputSink, max_pending: int = 8):
+        '''
+        Hands writes to another sink on a writer thread, so compressing and writing never block fetching.
+        At most max_pending writes are queued, after that the caller waits for the writer
+        '''
+        self.sink = sink
+        self.supports_append = sink.supports_append
+        self.error = None
+        self.writes = queue.Queue(max_pending)
+        self.writer = threading.Thread(target=self.run_writer, name='output-writer', daemon=True)
+        self.writer.start()
+
+    @property
+    def file_path(self):
+        return self.sink.file_path
+
+    @property
+    def rows_written(self):
+        return self.sink.rows_written
+
+    def run_writer(self):
+        while True:
+            write = self.writes.get()
+            try:
+                if write is None:
+                    return
+                if self.error is None:
+                    method, values = write
+                    method(values)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.writes.task_done()
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def write_header(self, header: list):
+        self.raise_error()
+        self.writes.put((self.sink.write_header, header))
+
+    def write_rows(self, rows: list):
+        self.raise_error()
+        self.writes.put((self.sink.write_rows, rows))
+
+    def sync(self) -> int or None:
+        self.raise_error()
+        if not self.supports_append:
+            return None  # Nothing to record, so the writer is not waited for
+        self.writes.join()
+        self.raise_error()
+        return self.sink.sync()
+
+    def stop(self):
+        self.writes.put(None)
+        self.writer.join()
+
+    def close(self):
+        self.stop()
+        if self.error is not None:
+            self.sink.abort()
+            raise self.error
+        self.sink.close()
+
+    def abort(self):
+        self.stop()
+        self.sink.abort()
+
+
+class rotatingSink(outputSink):
+    staged = False
+    def __init__(self, open_part, base_path: str, extension: str, rotate_rows: int = None, rotate_bytes: int = None):
+        '''
+        Splits the output into numbered parts, base_path-00001{extension} and so on, each starting with the header.
+        A new part is started after rotate_rows rows, or once the part file reaches rotate_bytes on disk
+        (checked after each write, so parts may run over by one write).
+        Finished parts stay in staging until close, so a failed run publishes none of them
+        '''
+        super().__init__(base_path + extension)
+        self.open_part = open_part
+        self.base_path = base_path
+        self.extension = extension
+        self.rotate_rows = rotate_rows
+        self.rotate_bytes = rotate_bytes
+        self.header = None
+        self.part = None
+        self.part_rows = 0
+        self.part_paths = []
+        self.finished_parts = []
+
+    def start_part(self):
+        if self.part is not None:
+            self.part.finish()
+            self.finished_parts.append(self.part)
+        self.file_path = f"{self.base_path}-{len(self.part_paths) + 1:05d}{self.extension}"
+        self.part_paths.append(self.file_path)
+        self.part = self.open_part(self.file_path)
+        self.part_rows = 0
+        if self.header is not None:
+            self.part.write_header(self.header)
+
+    def part_full(self) -> bool:
+        if self.rotate_rows is not None and self.part_rows >= self.rotate_rows:
+            return True
+        # Compressed and columnar parts only reach the disk in blocks, so this tracks the size with some lag
+        return self.rotate_bytes is not None and os.path.getsize(self.part.write_path) >= self.rotate_bytes
+
+    def write_header(self, header: list):
+        self.header = header
+        self.start_part()
+
+    def write_rows(self, rows: list):
+        while rows:
+            if self.part is None or self.part_full():
+                self.start_part()
+            count = len(rows)
+            if self.rotate_rows is not None:
+                count = min(count, self.rotate_rows - self.part_rows)
+            self.part.write_rows(rows[:count])
+            self.part_rows += count
+            self.rows_written += count
+            rows = rows[count:]
+
+    def close(self):
+        if self.part is not None:
+            self.part.finish()
+            self.finished_parts.append(self.part)
+            self.part = None
+        for part in self.finished_parts:
+            part.publish_file()
+
+    def abort(self):
+        if self.part is not None:
+            self.part.abort()
+            self.part = None
+        for part in self.finished_parts:
+            if os.path.exists(part.write_path):
+                os.remove(part.write_path)
+
+
+OUTPUT_SINKS = {
+    'csv': csvSink,
+    'parquet': parquetSink,
+    'arrow': arrowSink
+}
+
+
+def open_sink(output_format: str, folder_path: str, file_name: str, append: bool = False, compression: str = None,
+              rotate_rows: int = None, rotate_bytes: int = None, resumable: bool = False) -> outputSink:
+    '''
+    Opens the sink for output_format in folder_path. The extension of file_name is replaced by the sink's own.
+    Compressed or rotating outputs are written by a background thread. resumable keeps the staging file of an
+    uncompressed, unrotated CSV output at a fixed path so an interrupted run can be appended to
+    '''
+    if output_format not in OUTPUT_SINKS:
+        raise ValueError(f"Unknown output format: {output_format}. Choose one of {list(OUTPUT_SINKS)}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Choose one of {list(COMPRESSIONS)}")
+
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    sink_class = OUTPUT_SINKS[output_format]
+    base_path = os.path.join(folder_path, os.path.splitext(file_name)[0])
+    extension = output_extension(output_format, compression)
+
+    if rotate_rows is None and rotate_bytes is None:
+        sink = sink_class(base_path + extension, append, compression, resumable=resumable)
+        if compression is None:
+            return sink
+    else:
+        sink = rotatingSink(lambda part_path: sink_class(part_path, compression=compression),
+                            base_path, extension, rotate_rows, rotate_bytes)
+
+    return backgroundSink(sink)
+
+
+def output_extension(output_format: str, compression: str = None) -> str:
+    '''
+    Returns the file extension of an output, e.g. .csv.zst for zstd compressed CSV
+    '''
+    if output_format == 'csv':
+        return OUTPUT_SINKS[output_format].extension + COMPRESSIONS[compression]
+    return OUTPUT_SINKS[output_format].extension
+
+
+def output_path(output_format: str, folder_path: str, file_name: str, compression: str = None) -> str:
+    '''
+    Returns the path open_sink would write file_name to, when the output is not rotated
+    '''
+    return os.path.join(folder_path, os.path.splitext(file_name)[0] + output_extension(output_format, compression))
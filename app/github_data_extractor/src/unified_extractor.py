@@ -1,14 +1,82 @@
 from pydriller import Repository
-from collections import Counter
 from itertools import zip_longest
 from github import Github, PullRequest, PaginatedList, TimelineEvent, Issue, Auth
 from datetime import datetime
-import requests
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import functools
+import logging
+import threading
+import subprocess
 import time
 import csv
 import os
+import shutil
 from github.GithubException import UnknownObjectException
+from .cassette import httpCassette
+from .checkpoint import extractionCheckpoint
+from .instrumentation import ENDPOINT_STAGES, metricsRegistry
+from .metric_planner import METRIC_REGISTRY, REPO_ENDPOINTS, column_endpoints, metricPlanner
+from .cost_report import column_costs, overhead_calls, quota_rows
+from .progress import configure_logging, progressReporter
+from .profiling import extractorProfiler
+from .cost_model import (DEFAULT_LATENCY, ENTRY_POINT_EXTRACTORS, ESTIMATE_HEADER, count_from_link, entry_point_calls,
+                         estimate_duration, git_commits, repoSize, suggest_resources)
+from .request_coalescer import requestCoalescer, fetchedResponse
+from .derived import derive_columns
+from .rollups import commitRollups
+from .records import commitStatsRecord, fileStatsRecord, prRecord
+from .pr_rows import (COMMIT_TOTAL_COLUMNS, FILE_TOTAL_COLUMNS, PR_LIST_FIELDS, adds_tests, commit_totals, file_totals,
+                      is_revert, participant_count, pr_list_values, review_comment_count)
+from .result_store import resultStore
+from .dataset import datasetPartitionSink
+from .sinks import COMPRESSIONS, OUTPUT_SINKS, outputSink, open_sink, output_path, staging_path, tableSink
+from .columnar import concat_tables, pa
+
+logger = logging.getLogger(__name__)
+
+
+def memoize_extractor(extractor):
+    '''
+    Caches the result of an extractor per repository, so each extraction runs at most once per dataExtraction object
+    '''
+    @functools.wraps(extractor)
+    def wrapper(self, repo_info, *args, **kwargs):
+        key = (repo_info.repo_owner, repo_info.repo_name, extractor.__name__)
+        with self.extractor_cache_lock:
+            key_lock = self.extractor_locks.setdefault(key, threading.Lock())
+
+        # Concurrent callers of the same extractor wait for the first one instead of extracting again
+        with key_lock:
+            if key not in self.extractor_cache:
+                self.extractor_cache[key] = extractor(self, repo_info, *args, **kwargs)
+                # Extractors may be called directly, their recorded responses must not wait for a public method
+                self.flush_cassette()
+            else:
+                self.metrics.count_cache_hit('extractor', extractor.__name__)
+            return self.extractor_cache[key]
+
+    return wrapper
+
 
+# Values calculate_pr_quality collects for each PR before deriving the rest of its columns
+QUALITY_COUNT_COLUMNS = [
+    'PR Number', 'Total Reviews', 'Total Review Comments', 'Participants', 'Reverted PR', 'Test Coverage Additions',
+    'created_at', 'merged_at', 'additions', 'deletions'
+]
+
+# Extractors that extract_table can return as a columnar table
+TABLE_EXTRACTORS = [
+    'extract_commit_and_contributor_data',
+    'extract_commit_rollups',
+    'extract_commit_data_per_pr',
+    'extract_file_data_per_pr',
+    'calculate_pr_quality',
+    'extract_issue_tracking_data',
+    'extract_pull_request_data',
+    'extract_branch_data',
+    'get_linked_issue_from_pr'
+]
 
 
 class repoInfo:
@@ -19,9 +87,39 @@ class repoInfo:
         self.token_index = 0
 
 class dataExtraction:
-    def __init__(self, repo_names: list, repo_owners: list, repo_tokens: list = []):
+    def __init__(self, repo_names: list, repo_owners: list, repo_tokens: list = [], mirror_dir: str = None,
+                 resume: bool = False, max_workers: int = 1, output_format: str = 'csv', output_layout: str = 'files',
+                 dataset_root: str = os.path.join('ExtractedData', 'dataset'), store_path: str = None,
+                 store_backend: str = 'sqlite', compression: str = None, rotate_rows: int = None,
+                 rotate_bytes: int = None, api_base_url: str = 'https://api.github.com',
+                 git_base_url: str = 'https://github.com', cassette: str = None, cassette_mode: str = 'replay',
+                 metrics_path: str = None, metrics_port: int = None, verbosity: str = None,
+                 progress_interval: float = 5.0, json_logs: bool = False, profile_extractors: list = None,
+                 profiler: str = 'cprofile', profile_dir: str = os.path.join('ExtractedData', 'profiles'),
+                 trace_memory: bool = True, cost_report_dir: str = None, keep_clones: bool = True):
         '''
-        Initializes the repo_info list with the repo names, owners and tokens
+        Initializes the repo_info list with the repo names, owners and tokens.
+        mirror_dir optionally points at a folder of local mirrors laid out as {owner}/{repo}.git.
+        Without one, commit histories are mirror-cloned under ExtractedData/.clones and kept so later runs only fetch,
+        keep_clones=False removes each clone once its history has been traversed.
+        resume continues PR extractions from their last checkpoint instead of starting over.
+        max_workers above 1 runs the extractors of each entry point concurrently.
+        output_format is 'csv', or 'parquet' / 'arrow' for typed columnar files (needs pyarrow).
+        output_layout 'dataset' writes one Parquet dataset under dataset_root, partitioned by owner/repo/metric family.
+        It needs output_format 'parquet'.
+        store_path additionally upserts every result into an embedded 'sqlite' or 'duckdb' database.
+        compression 'gzip' or 'zstd' compresses the output files, rotate_rows / rotate_bytes split them into numbered parts.
+        api_base_url and git_base_url point the extractors at another server, e.g. GitHub Enterprise or a local mock.
+        cassette is a .jsonl.gz file of API responses, cassette_mode 'record' writes every response of the run to it
+        and 'replay' serves the run from it without the network.
+        metrics_path is an OpenMetrics text file of request and stage metrics, rewritten as each public method ends.
+        metrics_port serves the same metrics for scraping at http://127.0.0.1:{metrics_port}/metrics
+        verbosity is 'quiet', 'progress' or 'debug' for the progress log: nothing but warnings, an update per
+        extractor at most every progress_interval seconds, or every PR too. json_logs logs one JSON object per event.
+        Logging is left to the application unless verbosity or json_logs is given.
+        profile_extractors names methods to profile on every call with profiler 'cprofile' or 'sampling'.
+        Their profiles, and with trace_memory tracemalloc snapshots, are written to profile_dir.
+        cost_report_dir, if set, receives the full API cost and quota reports as each public method ends
         '''
         zipped_data = zip_longest(repo_names, repo_owners, repo_tokens, fillvalue=None)
         self.repo_infos = [repoInfo(url, owner, token) for url, owner, token in zipped_data]
@@ -29,8 +127,132 @@ class dataExtraction:
         self.tokens = repo_tokens
         self.token_index = 0
 
+        # GitHub API and git hosts, repositories are cloned from {git_base_url}/{owner}/{repo}.git
+        self.api_base_url = api_base_url.rstrip('/')
+        self.git_base_url = git_base_url.rstrip('/')
+
         # GitHub Rate Limit URL
-        self.rate_limit_url = "https://api.github.com/rate_limit"
+        self.rate_limit_url = f"{self.api_base_url}/rate_limit"
+
+        # Local git mirrors used for branch listing
+        self.mirror_dir = mirror_dir
+        self.keep_clones = keep_clones
+
+        # Extractor results keyed by (owner, repo, extractor name)
+        self.extractor_cache = {}
+        self.extractor_locks = {}
+        self.extractor_cache_lock = threading.Lock()
+
+        # Continue from checkpoints under ExtractedData/.checkpoints. The checkpoints of finished extractions are
+        # removed once their outputs are published, so only an interrupted run is ever resumed
+        self.resume = resume
+        self.checkpoints = []
+        self.checkpoints_lock = threading.Lock()
+
+        # Commit history rollups of each repository, filled by extract_commit_and_contributor_data
+        self.commit_rollups = {}
+
+        # Request, cache and stage metrics of the run, and the columns written, for the API cost report
+        self.metrics = metricsRegistry()
+        self.output_columns = set()
+        self.metrics_path = metrics_path
+        self.cost_report_dir = cost_report_dir
+        if metrics_port is not None:
+            self.metrics.serve(metrics_port)
+
+        # Fetch layer shared by all extractors, optionally recording to or replaying from a cassette
+        self.cassette = httpCassette(cassette, cassette_mode) if cassette is not None else None
+        self.request_coalescer = requestCoalescer(cassette=self.cassette, metrics=self.metrics)
+
+        # Throttled progress log of each extractor: PRs/s, requests/s, remaining quota and ETA
+        if verbosity is not None or json_logs:
+            configure_logging(verbosity or 'progress', json_logs)
+        self.progress = progressReporter(self.request_coalescer, progress_interval)
+        self.max_workers = max_workers
+
+        # Format of the files written under ExtractedData
+        if output_format not in OUTPUT_SINKS:
+            raise ValueError(f"Unknown output format: {output_format}. Choose one of {list(OUTPUT_SINKS)}")
+        self.output_format = output_format
+
+        if output_layout not in ('files', 'dataset'):
+            raise ValueError(f"Unknown output layout: {output_layout}. Choose 'files' or 'dataset'")
+        if output_layout == 'dataset' and output_format != 'parquet':
+            raise ValueError(f"The dataset layout is written as Parquet, pass output_format='parquet' "
+                             f"instead of {output_format!r}")
+        self.output_layout = output_layout
+        self.dataset_root = dataset_root
+
+        # Compression and rotation of the files written under ExtractedData
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}. Choose one of {list(COMPRESSIONS)}")
+        self.compression = compression
+        self.rotate_rows = rotate_rows
+        self.rotate_bytes = rotate_bytes
+
+        # Embedded result database, written by its own thread
+        self.result_store = resultStore(store_path, store_backend) if store_path is not None else None
+
+        # Profiled methods shadow the class ones, so internal and run_extractors calls are profiled too
+        self.profiler = None
+        if profile_extractors:
+            self.profiler = extractorProfiler(profile_dir, profiler, trace_memory=trace_memory)
+            for name in profile_extractors:
+                method = getattr(self, name, None)
+                if name.startswith('_') or not callable(method):
+                    raise ValueError(f"Unknown extractor: {name}")
+                setattr(self, name, self.profiler.wrap(name, method))
+
+    def clear_extractor_cache(self):
+        '''
+        Drops all memoized extractor results, their per-key locks and the commit rollups built alongside them,
+        so the next call fetches fresh data
+        '''
+        with self.extractor_cache_lock:
+            self.extractor_cache = {}
+            self.extractor_locks = {}
+            self.commit_rollups = {}
+
+    def open_checkpoint(self, repo_info, extractor_name: str, output_name: str = None) -> extractionCheckpoint:
+        '''
+        Opens the checkpoint of an extractor, loading its progress when resuming and starting fresh otherwise.
+        Extractors that write an output file are checkpointed per output_name
+        '''
+        checkpoint_name = (os.path.splitext(output_name)[0] if output_name is not None
+                           else f"{repo_info.repo_owner}_{repo_info.repo_name}_{extractor_name}")
+        checkpoint = extractionCheckpoint('ExtractedData', checkpoint_name)
+
+        if self.resume:
+            checkpoint.load()
+        else:
+            checkpoint.reset()
+
+        with self.checkpoints_lock:
+            self.checkpoints.append(checkpoint)
+        return checkpoint
+
+    def retire_checkpoints(self):
+        '''
+        Removes the checkpoints of the extractions that finished, once their results have been published.
+        Unfinished ones are kept for a resumed run
+        '''
+        with self.checkpoints_lock:
+            finished = [checkpoint for checkpoint in self.checkpoints if checkpoint.finished]
+            self.checkpoints = [checkpoint for checkpoint in self.checkpoints if not checkpoint.finished]
+        for checkpoint in finished:
+            checkpoint.reset()
+
+    def run_extractors(self, repo_info, extractor_names: list) -> list:
+        '''
+        Runs the named extractors on a repository, concurrently when max_workers allows it, and returns their results in order
+        '''
+        extractors = [getattr(self, name) for name in extractor_names]
+        if self.max_workers <= 1:
+            return [extractor(repo_info) for extractor in extractors]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(extractor, repo_info) for extractor in extractors]
+            return [future.result() for future in futures]
 
     def write_to_csv_and_save(self, data: list, file_name: str, folder_path: str):
         '''
@@ -42,35 +264,264 @@ class dataExtraction:
 
         file_path = os.path.join(folder_path, file_name)
 
-        with open(file_path, 'w', newline='') as csv_file:
+        with self.metrics.stage('write'), open(file_path, 'w', newline='') as csv_file:
             csv_writer = csv.writer(csv_file)
             csv_writer.writerows(data)
 
-        print(f'Data written to {file_path} successfully.')
+        logger.info(f'Data written to {file_path} successfully.')
 
-    def extract_commit_and_contributor_data(self, repo_info) -> list:   
+    def store_rows(self, repo_info, table: str, header: list, rows: list):
         '''
-        Extracts commit and contributor data from the repository using pydriller to loop over the commits
+        Queues rows for the result store, if one is configured. Branches replace the repository's previous branches
         '''
-        
-        repo_url = f"https://github.com/{repo_info.repo_owner}/{repo_info.repo_name}"
-        total_number_of_commits = 0
-        total_lines_changed = 0
-        first_commit_date = None
-        last_commit_date = None
-        project_size = 0
-        code_complexity = 0
-        contributors = Counter()
-
-        for commit in Repository(repo_url).traverse_commits():
-            total_number_of_commits += 1
-            total_lines_changed += commit.lines
-            first_commit_date = min(first_commit_date if first_commit_date is not None else commit.committer_date, commit.committer_date)
-            last_commit_date = max(last_commit_date if last_commit_date is not None else commit.committer_date, commit.committer_date)
-            project_size += commit.insertions - commit.deletions
-            code_complexity += commit.dmm_unit_complexity if commit.dmm_unit_complexity is not None else 0
-            contributors[commit.author.name] = contributors.get(commit.author.name, 0) + 1
+        if self.result_store is None:
+            return
+
+        if table == 'branches':
+            self.result_store.replace_repo_rows(table, repo_info.repo_owner, repo_info.repo_name, header, rows)
+        else:
+            self.result_store.upsert(table, repo_info.repo_owner, repo_info.repo_name, header, rows)
+
+    def flush_store(self):
+        '''
+        Waits until every queued result has been committed to the result store
+        '''
+        if self.result_store is not None:
+            self.result_store.flush()
+
+    def flush_cassette(self):
+        '''
+        Writes the responses recorded so far to the cassette file
+        '''
+        if self.cassette is not None and self.cassette.mode == 'record':
+            self.cassette.flush()
+
+    def write_metrics(self):
+        '''
+        Rewrites the OpenMetrics file with the metrics collected so far, if metrics_path is set
+        '''
+        if self.metrics_path is not None:
+            self.metrics.write(self.metrics_path)
+
+    def cost_report_columns(self, endpoint_calls: dict) -> list:
+        # The metric columns written, before any output is written the columns of every endpoint that was called
+        columns = [column for column in METRIC_REGISTRY if column in self.output_columns]
+        if not columns:
+            columns = [column for column in METRIC_REGISTRY
+                       if column_endpoints(column) & set(endpoint_calls) and
+                       all(endpoint in endpoint_calls for endpoint in column_endpoints(column)
+                           if endpoint not in REPO_ENDPOINTS)]
+        return columns
+
+    def get_cost_report(self) -> list:
+        '''
+        Attributes the API calls made so far to the metric columns written, see column_costs
+        '''
+        endpoint_calls = self.metrics.endpoint_calls()
+        return column_costs(endpoint_calls, self.cost_report_columns(endpoint_calls))
+
+    def get_overhead_calls(self) -> dict:
+        '''
+        Returns the API calls made so far that no metric column written needed, e.g. rate limit checks, by endpoint
+        '''
+        endpoint_calls = self.metrics.endpoint_calls()
+        return overhead_calls(endpoint_calls, self.cost_report_columns(endpoint_calls))
+
+    def get_quota_report(self) -> list:
+        '''
+        Returns the requests sent with each token and the quota it had left, tokens are shown as digests
+        '''
+        return quota_rows(self.request_coalescer.token_quota)
+
+    def write_cost_report(self, folder_path: str = None):
+        '''
+        Logs the most expensive columns and the quota of each token. The per-column cost report and the per-token
+        quota report are written in full to folder_path, cost_report_dir by default, if either is set
+        '''
+        endpoint_calls = self.metrics.endpoint_calls()
+        if not endpoint_calls:
+            return
+
+        folder_path = folder_path if folder_path is not None else self.cost_report_dir
+        if folder_path is None and not logger.isEnabledFor(logging.INFO):
+            return
+
+        cost_report = self.get_cost_report()
+        quota_report = self.get_quota_report()
+        if folder_path is not None:
+            self.write_output(cost_report, 'api_cost_by_column.csv', folder_path)
+            self.write_output(quota_report, 'api_quota_by_token.csv', folder_path)
+
+        logger.info(f"API calls by column ({sum(endpoint_calls.values())} in total):")
+        for column, endpoints, calls_needed, attributed_calls, marginal_calls in cost_report[1:11]:
+            logger.info(f"  {column}: {attributed_calls} attributed, {marginal_calls} saved if dropped ({endpoints})")
+        overhead = self.get_overhead_calls()
+        if overhead:
+            logger.info("  Not needed by any column: " +
+                        ', '.join(f"{endpoint} {calls}" for endpoint, calls in overhead.items()))
+        for token, requests, remaining, limit, resets_at in quota_report[1:]:
+            logger.info(f"  {token}: {requests} requests, {remaining}/{limit} remaining until {resets_at}")
+
+    def finish_entry_point(self):
+        '''
+        Called as each public method ends: commits queued results, writes recorded responses, removes the
+        checkpoints of finished extractions, exports metrics and reports the API cost of the run so far
+        '''
+        self.flush_store()
+        self.flush_cassette()
+        self.retire_checkpoints()
+        self.write_metrics()
+        self.write_cost_report()
+
+    def close_store(self):
+        '''
+        Commits the remaining results and stops the result store writer
+        '''
+        if self.result_store is not None:
+            self.result_store.close()
+            self.result_store = None
+
+    def open_output(self, file_name: str, folder_path: str, repo_info=None, append: bool = False,
+                    resumable: bool = False) -> outputSink:
+        '''
+        Opens the sink for an output file: a file in folder_path, or the repository's partition of the dataset.
+        resumable outputs keep their staging file when writing fails, for a resumed run to append to
+        '''
+        if self.output_layout == 'dataset' and repo_info is not None:
+            # File names are {owner}_{repo}_{family}.csv, the family names the partition
+            prefix = f"{repo_info.repo_owner}_{repo_info.repo_name}_"
+            family = os.path.splitext(file_name)[0][len(prefix):].lower()
+            return datasetPartitionSink(self.dataset_root, repo_info.repo_owner, repo_info.repo_name, family,
+                                        self.compression)
+
+        return open_sink(self.output_format, folder_path, file_name, append, self.compression,
+                         self.rotate_rows, self.rotate_bytes, resumable)
+
+    def write_output(self, data: list, file_name: str, folder_path: str, repo_info=None):
+        '''
+        Writes a header row followed by data rows in the configured output format and layout
+        '''
+        self.output_columns.update(column for column in data[0] if isinstance(column, str))
+        with self.metrics.stage('write'), self.open_output(file_name, folder_path, repo_info) as sink:
+            sink.write_header(data[0])
+            sink.write_rows(data[1:])
+
+        logger.info(f'Data written to {sink.file_path} successfully.')
 
+    def git_env(self, repo_info=None) -> dict:
+        '''
+        Returns the environment of git commands, which never prompt for credentials. With the repository's token,
+        git authenticates to an https git host with a header set through the environment, so the token never
+        appears in a command line, a remote URL or git's messages
+        '''
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        if repo_info is not None and repo_info.repo_token and self.git_base_url.startswith('https://'):
+            credentials = base64.b64encode(f"x-access-token:{repo_info.repo_token}".encode()).decode()
+            # Added after any configuration the environment already passes to git
+            index = int(env.get('GIT_CONFIG_COUNT', 0))
+            env.update({
+                'GIT_CONFIG_COUNT': str(index + 1),
+                f'GIT_CONFIG_KEY_{index}': f"http.{self.git_base_url}/.extraheader",
+                f'GIT_CONFIG_VALUE_{index}': f"Authorization: Basic {credentials}"
+            })
+        return env
+
+    def run_git(self, command: list, timeout: int = None, repo_info=None):
+        '''
+        Runs a git command, authenticated with the token of repo_info if given. Returns None if git could not be run
+        '''
+        env = self.git_env(repo_info)
+        try:
+            return subprocess.run(['git'] + command, capture_output=True, text=True, timeout=timeout, env=env)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"git unavailable: {e}")
+            return None
+
+    def update_history_repository(self, repo_info) -> str or None:
+        '''
+        Returns a local repository holding the commit history: the cached mirror when there is one, otherwise a
+        mirror clone under ExtractedData/.clones that later runs only fetch into. Returns None if git fails
+        '''
+        mirror_path = self.get_local_mirror_path(repo_info)
+        if mirror_path is not None:
+            return mirror_path
+
+        clone_path = os.path.join('ExtractedData', '.clones', repo_info.repo_owner, f"{repo_info.repo_name}.git")
+        if os.path.isdir(clone_path):
+            result = self.run_git(['--git-dir', clone_path, 'remote', 'update', '--prune'], repo_info=repo_info)
+        else:
+            repo_url = f"{self.git_base_url}/{repo_info.repo_owner}/{repo_info.repo_name}.git"
+            result = self.run_git(['clone', '--mirror', '--quiet', repo_url, clone_path], repo_info=repo_info)
+
+        if result is None or result.returncode != 0:
+            logger.warning(f"Could not update the local history of {repo_info.repo_name}. Traversing the remote instead")
+            return None
+        return clone_path
+
+    def list_new_commits(self, history_path: str, previous_head: str, head: str) -> list or None:
+        '''
+        Returns the commits reachable from head but not from previous_head, merged side branches included.
+        Returns None when the whole history has to be traversed, e.g. after a force push
+        '''
+        if previous_head is None:
+            return None
+        if previous_head == head:
+            return []
+
+        is_ancestor = self.run_git(['--git-dir', history_path, 'merge-base', '--is-ancestor', previous_head, head])
+        if is_ancestor is None or is_ancestor.returncode != 0:
+            return None
+
+        result = self.run_git(['--git-dir', history_path, 'rev-list', head, f'^{previous_head}'])
+        if result is None or result.returncode != 0:
+            return None
+        return result.stdout.split()
+
+    @memoize_extractor
+    def extract_commit_and_contributor_data(self, repo_info) -> list:   
+        '''
+        Extracts commit and contributor data from the repository using pydriller to loop over the commits.
+        Daily and weekly rollups are collected in the same traversal, and later runs only traverse the new commits
+        '''
+        rollups = commitRollups('ExtractedData', f"{repo_info.repo_owner}_{repo_info.repo_name}")
+        rollups.load()
+
+        history_path = self.update_history_repository(repo_info)
+        head = None
+        if history_path is None:
+            rollups.reset()
+            repository = Repository(f"{self.git_base_url}/{repo_info.repo_owner}/{repo_info.repo_name}")
+        else:
+            rev_parse = self.run_git(['--git-dir', history_path, 'rev-parse', 'HEAD'])
+            head = rev_parse.stdout.strip() if rev_parse is not None and rev_parse.returncode == 0 else None
+            new_commits = self.list_new_commits(history_path, rollups.head, head) if head is not None else None
+
+            if new_commits is None:
+                rollups.reset()
+                repository = Repository(history_path)
+            elif new_commits:
+                repository = Repository(history_path, only_commits=new_commits)
+            else:
+                repository = None  # Nothing was committed since the last run
+
+        if repository is not None:
+            with self.metrics.stage('pydriller_traversal'):
+                for commit in repository.traverse_commits():
+                    rollups.add_commit(commit)
+
+        if head is not None:
+            rollups.save(head)
+        if history_path is not None and not self.keep_clones and history_path != self.get_local_mirror_path(repo_info):
+            shutil.rmtree(history_path, ignore_errors=True)
+        self.commit_rollups[(repo_info.repo_owner, repo_info.repo_name)] = rollups
+
+        total_number_of_commits = rollups.commits
+        total_lines_changed = rollups.lines
+        first_commit_date = rollups.first_commit_date
+        last_commit_date = rollups.last_commit_date
+        project_size = rollups.size
+        code_complexity = rollups.complexity
+        contributors = rollups.contributors
 
         project_age = (last_commit_date - first_commit_date).days
         commit_frequency = total_number_of_commits / (project_age + 1) 
@@ -88,7 +539,7 @@ class dataExtraction:
         extracted_data = [
             project_age,
             project_size,
-            project_size/project_age,
+            project_size / project_age if project_age else 0,  # 0 when every commit was made on the same day
             project_size/total_number_of_commits,
             total_number_of_commits,
             commit_frequency,
@@ -115,6 +566,13 @@ class dataExtraction:
         
         return [param_names, extracted_data]
 
+    def extract_commit_rollups(self, repo_info, period: str = 'day') -> list:
+        '''
+        Returns the per-day or per-week commits, lines changed, net size and active contributors of the repository
+        '''
+        self.extract_commit_and_contributor_data(repo_info)
+        return self.commit_rollups[(repo_info.repo_owner, repo_info.repo_name)].rows(period)
+
     def get_headers(self):
         token = self.tokens[self.token_index]
         return {
@@ -122,6 +580,21 @@ class dataExtraction:
             'Accept': 'application/vnd.github.v3+json'
         }
 
+    def api_get(self, url: str, headers: dict, endpoint: str = None) -> fetchedResponse:
+        '''
+        Sends a GET request to the GitHub API. Identical requests in flight at the same time share one network call.
+        endpoint names the payload (e.g. 'pull_list'), only the fields the extractors read from it are kept
+        '''
+        with self.metrics.stage(ENDPOINT_STAGES.get(endpoint, endpoint or 'other')):
+            return self.request_coalescer.get(url, headers, endpoint)
+
+    def get_request_stats(self) -> dict:
+        '''
+        Returns the request counters of the fetch layer, including how many calls were saved by coalescing.
+        Responses served by a replayed cassette are counted as 'Replayed Responses', not as 'Network Calls'
+        '''
+        return self.request_coalescer.stats()
+
     def switch_token(self):
         self.token_index = (self.token_index + 1) % len(self.tokens)
 
@@ -129,7 +602,7 @@ class dataExtraction:
         '''Handles API rate limits with backoff and token switching.'''
         while True:
             headers = self.get_headers()
-            response = requests.get(self.rate_limit_url, headers=headers)
+            response = self.api_get(self.rate_limit_url, headers, 'rate_limit')
 
             if response.status_code == 200:
                 rate_limit = response.json()
@@ -140,184 +613,157 @@ class dataExtraction:
                     break
                 else:
                     wait_time = reset_time - time.time()
-                    print(f"Rate limit exceeded. Waiting {wait_time:.2f} seconds...")
+                    logger.warning(f"Rate limit exceeded. Waiting {wait_time:.2f} seconds...")
                     time.sleep(wait_time + 1)
                     self.switch_token()
             else:
-                print("Error fetching rate limit. Retrying...")
+                logger.warning("Error fetching rate limit. Retrying...")
                 time.sleep(10)
 
+    @memoize_extractor
     def extract_commit_data_per_pr(self, repo_info) -> list:
         """
         Extracts commit data for all pull requests in the repository using the GitHub API.
         """
         all_data = [[
             'PR Number',
-            'Total Commits',
-            'Total Lines Changed',
-            'Total Lines Added',
-            'Total Lines Deleted',
-            'Total Contributors',
-            'Total Comment Count',
-            'Total Files Changed',
+            *COMMIT_TOTAL_COLUMNS,
             'Rate of Commits',
             'Rate of Lines Changes',
             'Rate of Contributors',
             'Rate of Comment Count'
         ]]
 
+        checkpoint = self.open_checkpoint(repo_info, 'extract_commit_data_per_pr')
+        all_data.extend(checkpoint.rows)
+        if checkpoint.finished:
+            return all_data
+
         page_no = 0
         headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
         headers['Accept'] = 'application/vnd.github.v3+json'
 
         while True:
             page_no += 1
-            base_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
-            response = requests.get(base_url, headers=headers)
+            if page_no in checkpoint.completed_pages:
+                continue
+
+            base_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
+            response = self.api_get(base_url, headers, 'pull_list')
 
             if response.status_code != 200:
-                print(f"Failed to fetch PRs. Status: {response.status_code}")
+                logger.warning(f"Failed to fetch PRs. Status: {response.status_code}")
                 break
 
             prs = response.json()
+            self.progress.observe_page(repo_info, 'extract_commit_data_per_pr', response, page_no, len(prs))
             if not prs:  # No more PRs
+                checkpoint.mark_finished()
                 break
 
+            page_totals = []
+
             for pr in prs:
                 try:
                     pr_number = pr['number']
-                    print(f"Processing PR #{pr_number}...")
+                    self.progress.advance(repo_info, 'extract_commit_data_per_pr', pr_number)
 
-                    # Initialize counters
-                    total_commits = 0
-                    total_lines_changed = 0
-                    total_lines_added = 0
-                    total_lines_deleted = 0
-                    total_contributors = set()
-                    total_comment_count = 0
-                    total_files_changed = 0
+                    pr_commits = []
+                    commit_details = []
 
                     # Fetch commit data for the PR
                     commit_page_no = 0
                     while True:
                         commit_page_no += 1
-                        commit_url = f"https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls/{pr_number}/commits?page={commit_page_no}"
-                        commit_response = requests.get(commit_url, headers=headers)
+                        commit_url = f"{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls/{pr_number}/commits?page={commit_page_no}"
+                        commit_response = self.api_get(commit_url, headers, 'pull_commits')
 
                         if commit_response.status_code != 200:
-                            print(f"Failed to fetch commits for PR #{pr_number}. Status: {commit_response.status_code}")
+                            logger.warning(f"Failed to fetch commits for PR #{pr_number}. Status: {commit_response.status_code}")
                             break
 
                         commits = commit_response.json()
                         if not commits:
                             break
 
-                        total_commits += len(commits)
+                        pr_commits.extend(commits)
 
                         for commit in commits:
                             # Fetch commit details
                             commit_sha = commit['sha']
-                            details_url = f"https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/commits/{commit_sha}"
-                            details_response = requests.get(details_url, headers=headers)
+                            details_url = f"{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/commits/{commit_sha}"
+                            details_response = self.api_get(details_url, headers, 'commit_detail')
 
                             if details_response.status_code == 200:
-                                details = details_response.json()
-                                total_files_changed += len(details.get('files', []))
-
-                                stats = details.get('stats', {})
-                                total_lines_changed += stats.get('total', 0)
-                                total_lines_added += stats.get('additions', 0)
-                                total_lines_deleted += stats.get('deletions', 0)
+                                commit_details.append(details_response.json())
 
-                                author = commit.get('author')
-                                if author and 'login' in author:
-                                    total_contributors.add(author['login'])
+                        if not commit_response.has_next_page():
+                            break
 
-                                total_comment_count += commit['commit'].get('comment_count', 0)
+                    # Append totals, the rates are derived for the whole page at once
+                    page_totals.append([pr_number] + commit_totals(pr_commits, commit_details))
 
-                    # Calculate rates
-                    rate_of_commits = total_commits / total_files_changed if total_files_changed > 0 else 0
-                    rate_of_lines_changed = total_lines_changed / total_files_changed if total_files_changed > 0 else 0
-                    rate_of_contributors = len(total_contributors) / total_files_changed if total_files_changed > 0 else 0
-                    rate_of_comment_count = total_comment_count / total_files_changed if total_files_changed > 0 else 0
+                except Exception as e:
+                    logger.warning(f"Error processing PR {pr['number']}: {e}")
 
-                    # Append data row
-                    all_data.append([
-                        pr_number,
-                        total_commits,
-                        total_lines_changed,
-                        total_lines_added,
-                        total_lines_deleted,
-                        len(total_contributors),
-                        total_comment_count,
-                        total_files_changed,
-                        rate_of_commits,
-                        rate_of_lines_changed,
-                        rate_of_contributors,
-                        rate_of_comment_count
-                    ])
+            rates = derive_columns(all_data[0], page_totals, all_data[0][8:])
+            page_rows = [commitStatsRecord(*totals, *page_rates)
+                         for totals, page_rates in zip(page_totals, zip(*rates.values()))]
 
-                except Exception as e:
-                    print(f"Error processing PR {pr['number']}: {e}")
+            all_data.extend(page_rows)
+            checkpoint.record_page(page_no, page_rows)
+            self.store_rows(repo_info, 'pr_commits', all_data[0], page_rows)
 
+        self.progress.finish(repo_info, 'extract_commit_data_per_pr', len(all_data) - 1)
         return all_data
 
 
+    @memoize_extractor
     def extract_file_data_per_pr(self, repo_info) -> list:
         '''
         Extracts file data for all pull requests using the GitHub API.
         '''
         # Add headers
-        all_file_data = [[
-            'PR Number',
-            'Total Files Changed',
-            'Total Lines Added',
-            'Total Lines Deleted',
-            'Total Changes',
-            'Total Added Files',
-            'Total Modified Files',
-            'Total Removed Files',
-            'Total Renamed Files',
-            'Total Copied Files'
-        ]]
+        all_file_data = [['PR Number'] + FILE_TOTAL_COLUMNS]
+
+        checkpoint = self.open_checkpoint(repo_info, 'extract_file_data_per_pr')
+        all_file_data.extend(checkpoint.rows)
+        if checkpoint.finished:
+            return all_file_data
 
         page_no = 0
         while True:
             page_no += 1
-            base_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
+            if page_no in checkpoint.completed_pages:
+                continue
+
+            base_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
             headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
             headers['Accept'] = 'application/vnd.github.v3+json'
 
-            response = requests.get(base_url, headers=headers)
+            response = self.api_get(base_url, headers, 'pull_list')
             if response.status_code != 200:
-                print(f"Failed to fetch PRs. Status code: {response.status_code}")
+                logger.warning(f"Failed to fetch PRs. Status code: {response.status_code}")
                 break
 
             prs = response.json()
+            self.progress.observe_page(repo_info, 'extract_file_data_per_pr', response, page_no, len(prs))
             if not prs:
+                checkpoint.mark_finished()
                 break
 
+            page_rows = []
             for pr in prs:
                 try:
                     pr_number = pr['number']
-                    print(f"Processing files for PR: {pr_number}")
-
-                    # Initialize counters
-                    total_files_changed = 0
-                    total_lines_added = 0
-                    total_lines_deleted = 0
-                    total_changes = 0
-                    total_added_files = 0
-                    total_modified_files = 0
-                    total_removed_files = 0
-                    total_renamed_files = 0
-                    total_copied_files = 0
+                    self.progress.advance(repo_info, 'extract_file_data_per_pr', pr_number)
 
+                    pr_files = []
                     file_page_no = 0
                     while True:
                         file_page_no += 1
-                        file_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls/{pr_number}/files?page={file_page_no}'
-                        file_response = requests.get(file_url, headers=headers)
+                        file_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls/{pr_number}/files?page={file_page_no}'
+                        file_response = self.api_get(file_url, headers, 'pull_files')
 
                         if file_response.status_code != 200:
                             break
@@ -326,34 +772,21 @@ class dataExtraction:
                         if not files:
                             break
 
-                        total_files_changed += len(files)
-                        for file in files:
-                            total_lines_added += file['additions']
-                            total_lines_deleted += file['deletions']
-                            total_changes += file['changes']
-                            total_added_files += int(file['status'] == 'added')
-                            total_modified_files += int(file['status'] == 'modified')
-                            total_removed_files += int(file['status'] == 'removed')
-                            total_renamed_files += int(file['status'] == 'renamed')
-                            total_copied_files += int(file['status'] == 'copied')
+                        pr_files.extend(files)
+                        if not file_response.has_next_page():
+                            break
 
                     # Append row data
-                    all_file_data.append([
-                        pr_number,
-                        total_files_changed,
-                        total_lines_added,
-                        total_lines_deleted,
-                        total_changes,
-                        total_added_files,
-                        total_modified_files,
-                        total_removed_files,
-                        total_renamed_files,
-                        total_copied_files
-                    ])
+                    page_rows.append(fileStatsRecord(pr_number, *file_totals(pr_files)))
 
                 except Exception as e:
-                    print(f"Error processing files for PR {pr_number}: {e}")
+                    logger.warning(f"Error processing files for PR {pr_number}: {e}")
+
+            all_file_data.extend(page_rows)
+            checkpoint.record_page(page_no, page_rows)
+            self.store_rows(repo_info, 'pr_files', all_file_data[0], page_rows)
 
+        self.progress.finish(repo_info, 'extract_file_data_per_pr', len(all_file_data) - 1)
         return all_file_data
 
     def calculate_age(self, created_at):
@@ -362,6 +795,7 @@ class dataExtraction:
         age = now - created_at
         return age.total_seconds() / 3600
 
+    @memoize_extractor
     def calculate_pr_quality(self, repo_info) -> list:
         """
         Calculates PR quality for all pull requests using the GitHub API.
@@ -379,101 +813,112 @@ class dataExtraction:
             "Code Churn"
         ]]
 
+        checkpoint = self.open_checkpoint(repo_info, 'calculate_pr_quality')
+        all_pr_quality_data.extend(checkpoint.rows)
+        if checkpoint.finished:
+            return all_pr_quality_data
+
         page_no = 0
         while True:
             page_no += 1
-            base_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
+            if page_no in checkpoint.completed_pages:
+                continue
+
+            base_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
             headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
             headers['Accept'] = 'application/vnd.github.v3+json'
 
-            response = requests.get(base_url, headers=headers)
+            response = self.api_get(base_url, headers, 'pull_list')
             if response.status_code != 200:
-                print(f"Failed to fetch PRs. Status code: {response.status_code}")
+                logger.warning(f"Failed to fetch PRs. Status code: {response.status_code}")
                 break
 
             prs = response.json()
+            self.progress.observe_page(repo_info, 'calculate_pr_quality', response, page_no, len(prs))
             if not prs:
+                checkpoint.mark_finished()
                 break
 
+            page_counts = []
             for pr in prs:
                 try:
                     pr_number = pr['number']
-                    print(f"Processing quality metrics for PR: {pr_number}")
+                    self.progress.advance(repo_info, 'calculate_pr_quality', pr_number)
 
                     # Initialize counters
                     total_reviews = 0
                     total_review_comments = 0
-                    merge_time = 0
-                    long_open_pr = 0
                     participants = 0
                     reverted_pr = 0
                     test_coverage_added = 0
-                    churn = 0
 
                     # Fetch detailed PR data
-                    pr_url = f"https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls/{pr_number}"
-                    pr_response = requests.get(pr_url, headers=headers)
+                    pr_url = f"{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls/{pr_number}"
+                    pr_response = self.api_get(pr_url, headers, 'pull_detail')
                     if pr_response.status_code != 200:
-                        print(f"Failed to fetch details for PR {pr_number}. Skipping.")
+                        logger.warning(f"Failed to fetch details for PR {pr_number}. Skipping.")
                         continue
                     pr_details = pr_response.json()
 
                     # Reviews
                     reviews_url = f"{pr_url}/reviews"
-                    reviews_response = requests.get(reviews_url, headers=headers)
+                    reviews_response = self.api_get(reviews_url, headers, 'pull_reviews')
                     if reviews_response.status_code == 200:
                         reviews = reviews_response.json()
                         total_reviews += len(reviews)
-                        total_review_comments += sum(review['body'].count('\n') for review in reviews if 'body' in review)
-
-                    # Merge Time
-                    if pr_details.get('merged_at') and pr_details.get('created_at'):
-                        created_at = datetime.strptime(pr_details['created_at'], '%Y-%m-%dT%H:%M:%SZ')
-                        merged_at = datetime.strptime(pr_details['merged_at'], '%Y-%m-%dT%H:%M:%SZ')
-                        merge_time = (merged_at - created_at).total_seconds()
-                        if merge_time > 30 * 24 * 3600:  # PR open for over 30 days
-                            long_open_pr += 1
+                        total_review_comments += review_comment_count(reviews)
 
                     # Participants
                     comments_url = f"{pr_url}/comments"
-                    comments_response = requests.get(comments_url, headers=headers)
+                    comments_response = self.api_get(comments_url, headers, 'pull_comments')
                     if comments_response.status_code == 200:
                         comments = comments_response.json()
-                        participants = len(set(comment['user']['login'] for comment in comments if 'user' in comment))
+                        participants = participant_count(comments)
 
                     # Reverted PR
-                    if pr_details['title'].lower().startswith('revert'):
-                        reverted_pr += 1
+                    reverted_pr += is_revert(pr_details)
 
                     # Test Coverage Additions
                     files_url = f"{pr_url}/files"
-                    files_response = requests.get(files_url, headers=headers)
+                    files_response = self.api_get(files_url, headers, 'pull_files')
                     if files_response.status_code == 200:
                         files = files_response.json()
-                        if any('test' in file['filename'].lower() for file in files):
-                            test_coverage_added += 1
+                        test_coverage_added += adds_tests(files)
 
-                    # Code Churn
-                    churn = pr_details.get('additions', 0) + pr_details.get('deletions', 0)
-                    # Append row data
-                    all_pr_quality_data.append([
+                    # Append counts, merge time, long-open PRs and churn are derived for the whole page at once
+                    page_counts.append([
                         pr_number,
                         total_reviews,
                         total_review_comments,
-                        merge_time,
-                        long_open_pr,
                         participants,
                         reverted_pr,
                         test_coverage_added,
-                        churn
+                        pr_details.get('created_at'),
+                        pr_details.get('merged_at'),
+                        pr_details.get('additions', 0),
+                        pr_details.get('deletions', 0)
                     ])
 
                 except Exception as e:
-                    print(f"Error processing quality metrics for PR {pr_number}: {e}")
+                    logger.warning(f"Error processing quality metrics for PR {pr_number}: {e}")
+
+            derived = derive_columns(QUALITY_COUNT_COLUMNS, page_counts,
+                                     ['Merge Time (seconds)', 'Long-Open PR', 'Code Churn'])
+            page_rows = [
+                counts[:3] + [merge_time, long_open_pr] + counts[3:6] + [churn]
+                for counts, merge_time, long_open_pr, churn in zip(
+                    page_counts, derived['Merge Time (seconds)'], derived['Long-Open PR'], derived['Code Churn'])
+            ]
+
+            all_pr_quality_data.extend(page_rows)
+            checkpoint.record_page(page_no, page_rows)
+            self.store_rows(repo_info, 'pr_quality', all_pr_quality_data[0], page_rows)
 
+        self.progress.finish(repo_info, 'calculate_pr_quality', len(all_pr_quality_data) - 1)
         return all_pr_quality_data
 
 
+    @memoize_extractor
     def extract_issue_tracking_data(self, repo_info) -> list:
         '''
         Extracts issue tracking data from the repository using the GitHub API
@@ -486,7 +931,7 @@ class dataExtraction:
         issue_categories = set()
 
         while True:
-            base_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/issues?state=all&sort=created&direction=asc&page={page_no}'
+            base_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/issues?state=all&sort=created&direction=asc&page={page_no}'
             page_no += 1
 
             #headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token is not None else {}
@@ -495,7 +940,7 @@ class dataExtraction:
                 'Accept': 'application/vnd.github.v3+json'
             }
 
-            response = requests.get(base_url, headers=headers)
+            response = self.api_get(base_url, headers, 'issues')
 
             if response.status_code == 200:
                 issues = response.json()
@@ -517,7 +962,7 @@ class dataExtraction:
                     issue_categories.update(label['name'] for label in issue['labels'])
                 
             else:
-                print(f"Failed to fetch issues on page: {page_no}. Status code: {response.status_code}. Repo: {repo_info.repo_name}")
+                logger.warning(f"Failed to fetch issues on page: {page_no}. Status code: {response.status_code}. Repo: {repo_info.repo_name}")
                 break
  
         if total_issues == 0:
@@ -539,28 +984,43 @@ class dataExtraction:
             'Issue Categories'
         ]
 
+        self.store_rows(repo_info, 'issues', param_names, [extracted_data])
+
         return [param_names, extracted_data]
      
-    def extract_pull_request_data(self, repo_info, csv_filename: str, to_return: bool) -> list or None:
+    def extract_pull_request_data(self, repo_info, csv_filename: str, to_return: bool,
+                                  sink: outputSink = None) -> list or None:
         '''
-        Extracts pull request data from the repository using the GitHub API
+        Extracts pull request data from the repository using the GitHub API.
+        Rows go to the output file csv_filename, or to sink when one is given
         '''
         if not os.path.exists('ExtractedData'):
             os.makedirs('ExtractedData')
 
-        file_path = os.path.join('ExtractedData', csv_filename)
         aggregated_results = []
 
-        with open(file_path, 'w', newline='') as csv_file:
-            csv_writer = csv.writer(csv_file)
-
-            pr_headers = [
-                'PR Number', 'PR State', 'created_at', 'updated_at', 'closed_at', 'merged_at',
-                'PR age', 'Number of Labels', 'Label Names', 'Milestone Open Issues',
-                'Milestone Closed Issues', 'Head Repo Open Issues Count', 'Head Repo Open Issues',
-                'Base Repo Open Issues Count', 'Base Repo Open Issues', 'Number of Assignees',
-                'Number of Requested Reviewers', 'Number of Requested Teams'
-            ]
+        # Resuming appends to the staging file of the interrupted run, cut back to the end of the last recorded page.
+        # Outputs that cannot be appended to are rewritten from the checkpointed rows instead
+        checkpoint = self.open_checkpoint(repo_info, 'extract_pull_request_data', csv_filename)
+        appending = False
+        if sink is None:
+            file_path = staging_path(output_path(self.output_format, 'ExtractedData', csv_filename, self.compression),
+                                     resumable=True)
+            appending = (self.resume and self.output_layout == 'files' and
+                         OUTPUT_SINKS[self.output_format].supports_append and
+                         self.compression is None and self.rotate_rows is None and self.rotate_bytes is None and
+                         checkpoint.output_size is not None and os.path.exists(file_path))
+            if appending:
+                os.truncate(file_path, checkpoint.output_size)
+            sink = self.open_output(csv_filename, 'ExtractedData', repo_info, appending, resumable=self.resume)
+            if appending:
+                sink.rows_written = len(checkpoint.rows)  # Counted in the published manifest
+
+        with sink:
+
+            # PR age follows the timestamps it is derived from
+            list_fields = list(PR_LIST_FIELDS)
+            pr_headers = ['PR Number'] + list_fields[:5] + ['PR age'] + list_fields[5:]
 
             commit_data = self.extract_commit_data_per_pr(repo_info)
             file_data = self.extract_file_data_per_pr(repo_info)
@@ -572,64 +1032,79 @@ class dataExtraction:
 
             filtered_file_indices = [i for i, h in enumerate(file_headers) if h not in duplicate_fields or i == 0]
             filtered_file_headers = [file_headers[i] for i in filtered_file_indices]
-            filtered_file_rows = [[row[i] for i in filtered_file_indices] for row in file_rows]
+
+            # PR rows reference these stats records instead of copying them
+            join_start = time.perf_counter()
+            commit_rows_by_pr = {row[0]: row for row in commit_rows}
+            file_rows_by_pr = {row[0]: row for row in file_rows}
+            file_indices = tuple(filtered_file_indices[1:])
+            self.metrics.observe_stage('join', time.perf_counter() - join_start)
 
             combined_headers = pr_headers + commit_headers[1:] + filtered_file_headers[1:]
-            csv_writer.writerow(combined_headers)
+            self.output_columns.update(combined_headers)
+            if not appending:
+                sink.write_header(combined_headers)
+                sink.write_rows(checkpoint.rows)
             aggregated_results.append(combined_headers)
+            aggregated_results.extend(checkpoint.rows)
 
             page_no = 0
-            while True:
+            while not checkpoint.finished:
                 page_no += 1
-                base_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
+                if page_no in checkpoint.completed_pages:
+                    continue
+
+                base_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
                 headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
                 headers['Accept'] = 'application/vnd.github.v3+json'
-                response = requests.get(base_url, headers=headers)
+                response = self.api_get(base_url, headers, 'pull_list')
 
                 if response.status_code == 200:
                     prs = response.json()
+                    self.progress.observe_page(repo_info, 'extract_pull_request_data', response, page_no, len(prs))
                     if not prs:
+                        checkpoint.mark_finished()
                         break
 
-                    for pr in prs:
-                        try:
-                            print(f"Extracting data for PR: {pr['number']}")
-                            pr_age = self.calculate_age(pr['created_at'])
-                            label_names = ",".join(label['name'] for label in pr['labels'])
+                    # Ages of the whole page are derived at once
+                    pr_ages = derive_columns(['created_at'], [[pr.get('created_at')] for pr in prs], ['PR age'])['PR age']
 
-                            commit_row = next((row for row in commit_rows if row[0] == pr['number']), None)
-                            file_row = next((row for row in file_rows if row[0] == pr['number']), None)
+                    page_rows = []
+                    join_start = time.perf_counter()
+                    for pr, pr_age in zip(prs, pr_ages):
+                        try:
+                            self.progress.advance(repo_info, 'extract_pull_request_data', pr['number'])
+                            list_values = pr_list_values(pr)
 
-                            commit_row = commit_row[1:] if commit_row else [''] * (len(commit_headers) - 1)
-                            filtered_file_row = (
-                                [file_row[i] for i in filtered_file_indices[1:]] if file_row
-                                else [''] * (len(filtered_file_headers) - 1)
+                            current_results = prRecord(
+                                pr['number'], *list_values[:5], pr_age, *list_values[5:],
+                                commit_rows_by_pr.get(pr['number']), file_rows_by_pr.get(pr['number']),
+                                len(commit_headers) - 1, file_indices
                             )
 
-                            current_results = [
-                                pr['number'], pr['state'], pr['created_at'], pr['updated_at'],
-                                pr['closed_at'], pr['merged_at'], pr_age, len(pr['labels']),
-                                label_names, pr['milestone']['open_issues'] if pr['milestone'] else 0,
-                                pr['milestone']['closed_issues'] if pr['milestone'] else 0,
-                                pr['head']['repo']['open_issues_count'], pr['head']['repo']['open_issues'],
-                                pr['base']['repo']['open_issues_count'], pr['base']['repo']['open_issues'],
-                                len(pr['assignees']), len(pr['requested_reviewers']), len(pr['requested_teams'])
-                            ] + commit_row + filtered_file_row
-
-                            aggregated_results.append(current_results)
-                            csv_writer.writerow(current_results)
+                            page_rows.append(current_results)
 
                         except Exception as e:
-                            print(f"Error processing PR {pr['number']}: {e}")
+                            logger.warning(f"Error processing PR {pr['number']}: {e}")
                             continue
 
+                    self.metrics.observe_stage('join', time.perf_counter() - join_start)
+
+                    # Rows reach the output one page at a time and are synced before the page is checkpointed
+                    with self.metrics.stage('write'):
+                        sink.write_rows(page_rows)
+                        output_size = sink.sync()
+                    aggregated_results.extend(page_rows)
+                    checkpoint.record_page(page_no, page_rows, output_size)
+                    self.store_rows(repo_info, 'prs', combined_headers, page_rows)
+
                 else:
-                    print(f"Failed to fetch Pull Requests on page: {page_no}. Status code: {response.status_code}. Repo: {repo_info.repo_name}")
-                    print("Stopping Pull Request data extraction")
+                    logger.warning(f"Failed to fetch Pull Requests on page: {page_no}. Status code: {response.status_code}. Repo: {repo_info.repo_name}")
+                    logger.warning("Stopping Pull Request data extraction")
                     break
 
-        print("Successfully extracted pull request data.")
-        print(f"Final aggregated results: {aggregated_results}")
+        self.progress.finish(repo_info, 'extract_pull_request_data', len(aggregated_results) - 1)
+        self.flush_cassette()
 
         if to_return:
             return aggregated_results
@@ -637,31 +1112,100 @@ class dataExtraction:
 
 
 
+    def get_local_mirror_path(self, repo_info) -> str or None:
+        '''
+        Returns the path of the cached local mirror for the repository, if one exists
+        '''
+        if self.mirror_dir is None:
+            return None
+
+        mirror_path = os.path.join(self.mirror_dir, repo_info.repo_owner, f"{repo_info.repo_name}.git")
+        return mirror_path if os.path.isdir(mirror_path) else None
+
+    def list_branches_with_git(self, repo_info) -> list or None:
+        '''
+        Lists branch names with a single git call: for-each-ref on the local mirror when one is cached,
+        otherwise one `git ls-remote --heads` round-trip. Returns None if git is unavailable or the call fails
+        '''
+        mirror_path = self.get_local_mirror_path(repo_info)
+        if mirror_path is not None:
+            command = ['--git-dir', mirror_path, 'for-each-ref', '--format=%(refname)', 'refs/heads']
+        else:
+            remote_url = f"{self.git_base_url}/{repo_info.repo_owner}/{repo_info.repo_name}.git"
+            command = ['ls-remote', '--heads', remote_url]
+
+        # A failure just falls back to the API
+        result = self.run_git(command, timeout=300, repo_info=repo_info)
+        if result is None or result.returncode != 0:
+            logger.warning(f"git branch listing failed for {repo_info.repo_name}. Falling back to the API")
+            return None
+
+        branch_names = []
+        for line in result.stdout.splitlines():
+            # ls-remote prints "<sha>\trefs/heads/<name>", for-each-ref prints "refs/heads/<name>"
+            ref = line.split('\t')[-1].strip()
+            if ref.startswith('refs/heads/'):
+                branch_names.append(ref[len('refs/heads/'):])
+
+        return branch_names
+
+    def list_branches_with_api(self, repo_info):
+        '''
+        Lists branch names page by page through the fetch layer, which records them to or replays them from the
+        cassette. Returns None when a page cannot be fetched. A request missing from a replayed cassette raises,
+        so a replay never silently drops the branch columns
+        '''
+        headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
+        headers['Accept'] = 'application/vnd.github.v3+json'
+
+        branch_names = []
+        page_no = 0
+        while True:
+            page_no += 1
+            branches_url = f"{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/branches?per_page=100&page={page_no}"
+            response = self.api_get(branches_url, headers, 'branches')
+            if response.status_code != 200:
+                logger.warning(f"Failed to list the branches of {repo_info.repo_name}. "
+                               f"Status code: {response.status_code}")
+                return None
+
+            branch_names.extend(branch['name'] for branch in response.json())
+            if not response.has_next_page():
+                return branch_names
+
+    @memoize_extractor
     def extract_branch_data(self, repo_info) -> list:
         '''
-        Extracts branch data from the repository using PyGithub
+        Extracts branch data from the repository with git, using PyGithub as a fallback.
+        With a cassette and no local mirror, branches are listed through the API so they are recorded and replayed
         '''
-        try:
-            github_object = Github() if repo_info.repo_token is None else Github(auth=Auth.Token(repo_info.repo_token))
-            repo = github_object.get_repo(f"{repo_info.repo_owner}/{repo_info.repo_name}")
-            branches = list(repo.get_branches())
+        param_names = [
+            'Number of Current Branches',
+            'Current Branch Names'
+        ]
 
-            extracted_data = [
-                len(branches),
-                [branch.name for branch in branches]
-            ]
+        if self.cassette is not None and self.get_local_mirror_path(repo_info) is None:
+            branch_names = self.list_branches_with_api(repo_info)
+            if branch_names is None:
+                return [[], []]
+        else:
+            branch_names = self.list_branches_with_git(repo_info)
+        if branch_names is None:
+            try:
+                auth = None if repo_info.repo_token is None else Auth.Token(repo_info.repo_token)
+                github_object = Github(auth=auth, base_url=self.api_base_url)
+                repo = github_object.get_repo(f"{repo_info.repo_owner}/{repo_info.repo_name}")
+                branch_names = [branch.name for branch in repo.get_branches()]
 
-            param_names = [
-                'Number of Current Branches',
-                'Current Branch Names'
-            ]
+            except Exception as e:
+                logger.warning(f"Failed to fetch branch data: {e}")
+                return [[], []]
 
-            return [param_names, extracted_data]
+        self.store_rows(repo_info, 'branches', ['Branch Name'], [[name] for name in branch_names])
 
-        except Exception as e:
-            print(f"Failed to fetch branch data: {e}")
-            return [[], []]
+        return [param_names, [len(branch_names), branch_names]]
     
+    @memoize_extractor
     def get_linked_issue_from_pr(self, repo_info) -> list:
         """
         Extracts linked issue data for all pull requests in the repository using the GitHub API.
@@ -673,37 +1217,47 @@ class dataExtraction:
             'Linked Issue Title'
         ]]
 
+        checkpoint = self.open_checkpoint(repo_info, 'get_linked_issue_from_pr')
+        all_linked_issues.extend(checkpoint.rows)
+        if checkpoint.finished:
+            return all_linked_issues
+
         page_no = 0
         while True:
-            print(repo_info.repo_owner, repo_info.repo_name)
             page_no += 1
-            base_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
+            if page_no in checkpoint.completed_pages:
+                continue
+
+            base_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/pulls?state=all&sort=created&direction=asc&page={page_no}'
             headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
             headers['Accept'] = 'application/vnd.github.v3+json'
 
-            response = requests.get(base_url, headers=headers)
+            response = self.api_get(base_url, headers, 'pull_list')
             if response.status_code != 200:
-                print(f"Failed to fetch PRs. Status code: {response.status_code}")
+                logger.warning(f"Failed to fetch PRs. Status code: {response.status_code}")
                 break
 
             prs = response.json()
+            self.progress.observe_page(repo_info, 'get_linked_issue_from_pr', response, page_no, len(prs))
             if not prs:
+                checkpoint.mark_finished()
                 break
 
+            page_rows = []
             for pr in prs:
                 try:
                     pr_number = pr['number']
-                    print(f"Processing linked issues for PR: {pr_number}")
+                    self.progress.advance(repo_info, 'get_linked_issue_from_pr', pr_number)
 
                     timeline_page_no = 0
                     linked_issue = None
                     while True:
                         timeline_page_no += 1
-                        timeline_url = f'https://api.github.com/repos/{repo_info.repo_owner}/{repo_info.repo_name}/issues/{pr_number}/timeline?page={timeline_page_no}'
+                        timeline_url = f'{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}/issues/{pr_number}/timeline?page={timeline_page_no}'
                         timeline_headers = headers.copy()
                         timeline_headers['Accept'] = 'application/vnd.github.mockingbird-preview+json'
 
-                        timeline_response = requests.get(timeline_url, headers=timeline_headers)
+                        timeline_response = self.api_get(timeline_url, timeline_headers, 'issue_timeline')
                         if timeline_response.status_code != 200:
                             break
 
@@ -718,25 +1272,30 @@ class dataExtraction:
                                 if issue:
                                     linked_issue = issue
                                     break
-                        if linked_issue:
+                        if linked_issue or not timeline_response.has_next_page():
                             break
 
                     if linked_issue:
-                        all_linked_issues.append([
+                        page_rows.append([
                             pr_number,
                             linked_issue['number'],
                             linked_issue.get('title', 'No Title')
                         ])
                     else:
-                        all_linked_issues.append([
+                        page_rows.append([
                             pr_number,
                             None,
                             None
                         ])
 
                 except Exception as e:
-                    print(f"Error processing linked issues for PR {pr_number}: {e}")
+                    logger.warning(f"Error processing linked issues for PR {pr_number}: {e}")
+
+            all_linked_issues.extend(page_rows)
+            checkpoint.record_page(page_no, page_rows)
+            self.store_rows(repo_info, 'linked_issues', all_linked_issues[0], page_rows)
 
+        self.progress.finish(repo_info, 'get_linked_issue_from_pr', len(all_linked_issues) - 1)
         return all_linked_issues
 
     
@@ -759,7 +1318,17 @@ class dataExtraction:
             extracted_data = commit_and_contributor_data[1]
 
             # Write to CSV
-            self.write_to_csv_and_save([param_names, extracted_data], csv_filename, 'ExtractedData')
+            self.write_output([param_names, extracted_data], csv_filename, 'ExtractedData', repo_info)
+
+            # Daily and weekly rollups from the same traversal
+            for period, label in (('day', 'daily'), ('week', 'weekly')):
+                rollup_rows = self.extract_commit_rollups(repo_info, period)
+                self.write_output(rollup_rows, f"{repo_info.repo_owner}_{repo_info.repo_name}_{label}_rollup.csv",
+                                  'ExtractedData', repo_info)
+                self.store_rows(repo_info, 'commit_rollups', ['Period'] + rollup_rows[0],
+                                [[period] + row for row in rollup_rows[1:]])
+
+        self.finish_entry_point()
 
     def extract_general_overview(self):
         '''
@@ -770,17 +1339,21 @@ class dataExtraction:
             csv_filename = f"{repo_info.repo_owner}_{repo_info.repo_name}_general.csv"
             try:
                 # Get data
-                file_data = self.extract_file_data_per_pr(repo_info)[1:]  # Skip headers
-                linked_issues = self.get_linked_issue_from_pr(repo_info)[1:]  # Skip headers
-                issue_data = self.extract_issue_tracking_data(repo_info)
-                branch_data = self.extract_branch_data(repo_info)
+                file_results, linked_results, issue_data, branch_data = self.run_extractors(repo_info, [
+                    'extract_file_data_per_pr',
+                    'get_linked_issue_from_pr',
+                    'extract_issue_tracking_data',
+                    'extract_branch_data'
+                ])
+                file_headers, file_data = file_results[0], file_results[1:]
+                linked_issues = linked_results[1:]  # Skip headers
 
                 # Build a dictionary for linked issue lookup by PR number
                 linked_dict = {row[0]: row[1:] for row in linked_issues}
 
                 # Combine column headers
                 param_names = (
-                    self.extract_file_data_per_pr(repo_info)[0] +
+                    file_headers +
                     ['Linked Issue Number', 'Linked Issue Title'] +
                     issue_data[0] +
                     branch_data[0]
@@ -800,13 +1373,14 @@ class dataExtraction:
                     )
                     all_data.append([val if val is not None else "" for val in merged_row])
 
-                self.write_to_csv_and_save([param_names] + all_data, csv_filename, 'ExtractedData')
+                self.write_output([param_names] + all_data, csv_filename, 'ExtractedData', repo_info)
 
             except Exception as e:
-                print(f"An error occurred while processing repo {repo_info.repo_name}: {e}")
+                logger.warning(f"An error occurred while processing repo {repo_info.repo_name}: {e}")
                 continue
 
-        print("General overview extraction completed.")
+        self.finish_entry_point()
+        logger.info("General overview extraction completed.")
 
 
     def extract_data_pr(self):
@@ -814,15 +1388,74 @@ class dataExtraction:
         Extracts PR data from all repository using Github API and pydriller
         '''
         for repo_info in self.repo_infos:
-            print(f"Extracting data for repo: {repo_info.repo_name}")
+            logger.info(f"Extracting data for repo: {repo_info.repo_name}")
             csv_filename = repo_info.repo_owner + '_' + repo_info.repo_name + '_PR.csv'
-            print(f"PR data is stored in the following file: {csv_filename}")
-            print("Extracting pull request data...")
+            logger.info(f"PR data is stored in the following file: {csv_filename}")
+            logger.info("Extracting pull request data...")
             self.extract_pull_request_data(repo_info, csv_filename, False)
-            print("")
 
-            print("Extraction Complete.")
-            print("")
+            logger.info("Extraction Complete.")
+
+        self.finish_entry_point()
+
+    def extract_table(self, extractor_name: str, repo_info=None, backend: str = 'arrow', batch_size: int = 10000):
+        '''
+        Runs an extractor and returns its results as a typed in-memory table instead of writing a file.
+        backend is 'arrow' for a pyarrow Table or 'pandas' for a DataFrame. The table covers the given repository,
+        or all the repositories with 'Owner' and 'Repo' columns first
+        '''
+        if extractor_name not in TABLE_EXTRACTORS:
+            raise ValueError(f"Unknown extractor: {extractor_name}. Choose one of {TABLE_EXTRACTORS}")
+        if backend not in ('arrow', 'pandas'):
+            raise ValueError(f"Unknown table backend: {backend}. Choose 'arrow' or 'pandas'")
+
+        tables = []
+        for info in [repo_info] if repo_info is not None else self.repo_infos:
+            sink = tableSink(batch_size)
+            if extractor_name == 'extract_pull_request_data':
+                self.extract_pull_request_data(info, None, False, sink)
+            else:
+                results = getattr(self, extractor_name)(info)
+                with sink:
+                    sink.write_header(results[0])
+                    sink.write_rows(results[1:])
+
+            table = sink.to_table()
+            if repo_info is None:
+                table = table.add_column(0, 'Owner', pa.array([info.repo_owner] * table.num_rows, pa.string()))
+                table = table.add_column(1, 'Repo', pa.array([info.repo_name] * table.num_rows, pa.string()))
+            tables.append(table)
+
+        self.flush_cassette()
+        self.retire_checkpoints()
+        table = tables[0] if len(tables) == 1 else concat_tables(tables)
+        return table.to_pandas() if backend == 'pandas' else table
+
+    def plan_metrics(self, columns: list) -> list:
+        '''
+        Returns the endpoints that extract_metrics would fetch for the given columns
+        '''
+        return metricPlanner(self).plan(columns)
+
+    def extract_metrics(self, columns: list, file_suffix: str = 'metrics'):
+        '''
+        Extracts only the requested columns from all the repositories, fetching each endpoint they need exactly once
+        '''
+        planner = metricPlanner(self)
+        planner.plan(columns)  # Fail on unknown columns before any request is made
+
+        for repo_info in self.repo_infos:
+            csv_filename = f"{repo_info.repo_owner}_{repo_info.repo_name}_{file_suffix}.csv"
+            try:
+                metric_data = planner.run(repo_info, columns)
+                self.write_output(metric_data, csv_filename, 'ExtractedData', repo_info)
+
+            except Exception as e:
+                logger.warning(f"An error occurred while processing repo {repo_info.repo_name}: {e}")
+                continue
+
+        self.finish_entry_point()
+        logger.info("Metric extraction completed.")
 
     def extract_aggregate_metrics(self):
         """
@@ -833,28 +1466,105 @@ class dataExtraction:
                 # Prepare CSV file name
             csv_filename = f"{repo_info.repo_owner}_{repo_info.repo_name}_aggregate.csv"
             try:
-                # Extract commit data
-                commit_data = self.extract_commit_data_per_pr(repo_info)
+                # Extract commit, file and PR quality data, these all request the same PR endpoints
+                # so running them together lets identical requests share one call
+                commit_data, file_data, pr_quality_data = self.run_extractors(repo_info, [
+                    'extract_commit_data_per_pr',
+                    'extract_file_data_per_pr',
+                    'calculate_pr_quality'
+                ])
                 if not commit_data[1]:
-                    print(f"No commit data found for PR. Skipping.")
+                    logger.warning(f"No commit data found for PR. Skipping.")
 
-                # Extract file data
-                file_data = self.extract_file_data_per_pr(repo_info)
                 if not file_data[1]:
-                    print(f"No file data found for PR. Skipping.")
+                    logger.warning(f"No file data found for PR. Skipping.")
 
                 # Extract pull request data
                 pr_data = self.extract_pull_request_data(repo_info, csv_filename, True)
                 if not pr_data[0]:
-                    print(f"No PR data found for PR. Skipping.")
+                    logger.warning(f"No PR data found for PR. Skipping.")
 
                 # Process PR quality metrics for all PRs
-                pr_quality_data = self.calculate_pr_quality(repo_info)
                 if not pr_quality_data[1]:
-                    print(f"No PR Quality data found for PR. Skipping.")
+                    logger.warning(f"No PR Quality data found for PR. Skipping.")
 
             except Exception as e:
-                print(f"An error occurred while processing repo {repo_info.repo_name}: {e}")
+                logger.warning(f"An error occurred while processing repo {repo_info.repo_name}: {e}")
                 continue
 
-        print("Aggregate metrics extraction completed.")
+        self.finish_entry_point()
+        logger.info("Aggregate metrics extraction completed.")
+
+    def probe_repository(self, repo_info, commits_per_pr: float = None) -> repoSize:
+        '''
+        Sizes a repository with four cheap calls: the PR, commit, branch and issue lists are requested one item
+        per page and counted from the page number of their last page
+        '''
+        headers = {'Authorization': f'token {repo_info.repo_token}'} if repo_info.repo_token else {}
+        headers['Accept'] = 'application/vnd.github.v3+json'
+        repo_url = f"{self.api_base_url}/repos/{repo_info.repo_owner}/{repo_info.repo_name}"
+
+        counts = {}
+        for name, path in (('prs', '/pulls?state=all'), ('commits', '/commits?'), ('branches', '/branches?'),
+                           ('issues', '/issues?state=all')):
+            separator = '' if path.endswith('?') else '&'
+            response = self.api_get(f"{repo_url}{path}{separator}per_page=1", headers, 'probe')
+            if response.status_code == 200:
+                counts[name] = count_from_link(response.headers.get('Link'), len(response.json()))
+            else:
+                # An empty repository answers 409 on its commit list
+                logger.warning(f"Could not count the {name} of {repo_info.repo_name}. Status code: {response.status_code}")
+                counts[name] = 0
+
+        return repoSize(repo_info.repo_owner, repo_info.repo_name, commits_per_pr=commits_per_pr, **counts)
+
+    def estimate_extraction(self, entry_point: str = 'extract_aggregate_metrics', latency: float = DEFAULT_LATENCY,
+                            target_hours: float = None, commits_per_pr: float = None) -> dict:
+        '''
+        Dry run of a public method: probes each repository and estimates the API calls, quota windows and hours
+        the method would take with the tokens and max_workers of this object, without extracting anything.
+        latency is the expected seconds per API call. With target_hours, also suggests the tokens and
+        max_workers that would finish within it. Returns the per-repository rows and the estimate
+        '''
+        if entry_point not in ENTRY_POINT_EXTRACTORS:
+            raise ValueError(f"Unknown entry point: {entry_point}. Choose one of {list(ENTRY_POINT_EXTRACTORS)}")
+
+        rows = [ESTIMATE_HEADER]
+        total_calls = 0
+        total_commits = 0
+        for repo_info in self.repo_infos:
+            size = self.probe_repository(repo_info, commits_per_pr)
+            calls = sum(entry_point_calls(entry_point, size).values())
+            commits = git_commits(entry_point, size)
+            rows.append([size.owner, size.name, size.prs, size.commits, size.branches, size.issues, calls, commits])
+            total_calls += calls
+            total_commits += commits
+
+        # Extractors send requests with their repository's token, and the probes saw how much quota each has left
+        tokens = len(set(repo_info.repo_token for repo_info in self.repo_infos if repo_info.repo_token))
+        remaining = [quota['Remaining'] for quota in self.request_coalescer.token_quota.values()
+                     if quota['Remaining'] is not None]
+        concurrency = min(self.max_workers, len(ENTRY_POINT_EXTRACTORS[entry_point]))
+        estimate = estimate_duration(total_calls, total_commits, tokens, concurrency, latency,
+                                     sum(remaining) if remaining else None)
+
+        logger.info(f"Estimate for {entry_point} over {len(self.repo_infos)} repositories with {tokens} token(s) "
+                    f"and {concurrency} concurrent extractor(s):")
+        for row in sorted(rows[1:], key=lambda row: -row[6])[:10]:
+            logger.info(f"  {row[0]}/{row[1]}: {row[2]} PRs, {row[3]} commits, {row[6]} API calls")
+        logger.info(f"  {estimate['API Calls']} API calls over {estimate['Quota Windows']} quota window(s), "
+                    f"about {estimate['Total Hours']} hours ({estimate['Bound By']} bound)")
+
+        if target_hours is not None:
+            suggestion = suggest_resources(total_calls, total_commits, target_hours,
+                                           len(ENTRY_POINT_EXTRACTORS[entry_point]), latency)
+            estimate['Suggested Tokens'] = suggestion['Tokens']
+            estimate['Suggested Max Workers'] = suggestion['Concurrency']
+            if suggestion['Tokens'] is None:
+                logger.info(f"  The git traversal alone takes longer than {target_hours} hours")
+            else:
+                workers = suggestion['Concurrency'] or f"above {len(ENTRY_POINT_EXTRACTORS[entry_point])}, " \
+                                                       f"more than the extractors can use"
+                logger.info(f"  To finish within {target_hours} hours: {suggestion['Tokens']} token(s), max_workers {workers}")
+
+        return {'Repositories': rows, 'Estimate': estimate}
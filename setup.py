@@ -17,15 +17,23 @@ setup(
     license="MIT",
     classifiers=[
         "License :: OSI Approved :: MIT License",
-        "Programming Language :: Python :: 3.5",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "Operating System :: OS Independent",
     ],
     install_requires=[
+        "numpy>=1.20",
         "pydriller>=1.9",
         "PyGithub>=1.54",
         "requests>=2.20.0"],
     extras_require={
         "dev": ["pytest>=7.0", "twine>=4.0.2", "python-dotenv>=1.0.0", "wheel>=0.37.0"],
+        "columnar": ["pyarrow>=10.0"],
+        "duckdb": ["duckdb>=0.9"],
+        "fast-json": ["orjson>=3.0"],
+        "zstd": ["zstandard>=0.15"],
     },
-    python_requires=">=3.5",
+    python_requires=">=3.9",
 )
\ No newline at end of file